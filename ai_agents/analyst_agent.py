@@ -1,7 +1,11 @@
+import re
 import json
 import logging
 from typing import Dict, Any, Optional
 from langchain_ollama import ChatOllama
+from core import telemetry, fast_json
+from core.config import Config
+from core.response_cache import ResponseCache
 
 # Set up logging for production architecture
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -11,7 +15,7 @@ def _construct_data_scientist_prompt(payload: Dict[str, Any]) -> str:
     Constructs an advanced, zero-shot prompt with strict analytical rubrics
     to force the LLM into a Data Scientist persona and prevent generic hallucinated advice.
     """
-    json_string = json.dumps(payload, indent=2)
+    json_string = fast_json.dumps_str(payload, indent=True)
     
     prompt = f"""
 You are an elite Revenue Operations Analyst reporting to the CEO. You translate raw CRM data into sharp, highly actionable business intelligence. 
@@ -25,10 +29,12 @@ Analyze the data snapshot below. Pay CRITICAL attention to the `anomalies_detect
 STRICT RULES:
 1. ZERO HALLUCINATION: Only use provided names, sources, numbers, and currency (₹).
 2. NO GENERIC FLUFF: Do not invent generic problems. If `anomalies_detected_by_math` highlights an overloaded rep or a toxic channel, you MUST make that the centerpiece of your recommended actions.
-3. FOCUS ON DAILY CHANGES: For the WhatsApp report, only talk about what happened *yesterday* and what needs to be fixed *today*.
+3. FOCUS ON DAILY CHANGES: Lead with what happened *yesterday* and what needs to be fixed *today*.
+4. FORECASTS ARE RANGES: If `revenue_forecast` is present, quote it as the P10–P90 range with P50 as the likely outcome. Never present it as a commitment.
+5. SCORES ARE PREDICTIONS: `likely_junk_leads` comes from a model score, not a rep's verdict. Call these leads "likely junk", never "junk".
 
 OUTPUT FORMAT:
-Always output exactly two sections clearly delimited by <DASHBOARD_REPORT> and <WHATSAPP_REPORT> tags. Do not output any text outside of these tags.
+Output exactly one section delimited by <DASHBOARD_REPORT> tags. Do not output any text outside of these tags.
 
 <DASHBOARD_REPORT>
 ### 1. The Daily Pulse
@@ -39,50 +45,171 @@ Always output exactly two sections clearly delimited by <DASHBOARD_REPORT> and <
 - Give 1-2 sharp, realistic actions based entirely on fixing the identified bottlenecks.
 </DASHBOARD_REPORT>
 
-<WHATSAPP_REPORT>
-Generate a hard-hitting executive summary carefully formatted for WhatsApp.
-CRITICAL ENFORCEMENT RULES:
-1. DO NOT use markdown headers (`###`) or bolding (`**` or `*`).
-2. YOU MUST format the output EXACTLY like the template below, using the same emojis and bullet points:
-
-📊 Daily CRM Summary – [Month Day]
-• New Leads: [X] ([+/-X%] vs avg)
-• Pipeline Generated: ₹[X]
-• Deals Closed: ₹[X]
-
-⚠️ Signals:
-– [Write 1 concise bullet about overloaded rep/toxic channel anomaly with exact numbers]
-– [Write 1 concise bullet about any other anomaly or pacing drop]
-
-👉 Focus:
-– [Write 1 actionable step based on the data]
-– [Write 1 actionable step based on the data]
-</WHATSAPP_REPORT>
-
 DATA:
 {json_string}
 """
     return prompt
 
-def get_executive_summary(payload: Dict[str, Any], model_name: str = "llama3.2", temperature: float = 0.3) -> Optional[str]:
+def _construct_whatsapp_narrative_prompt(payload: Dict[str, Any]) -> str:
+    """
+    Asks only for the WhatsApp "Signals" and "Focus" lines. The numeric header is rendered
+    from the payload (ai_agents/whatsapp_report.py), so the model sees just the daily
+    metrics and the pre-computed anomalies — a far smaller prompt than the dashboard one.
+    """
+    data = {
+        "daily_metrics": payload.get("daily_metrics", {}),
+        "anomalies_detected_by_math": payload.get("anomalies_detected_by_math", []),
+    }
+    return f"""
+You are a Revenue Operations Analyst writing a WhatsApp alert for the CEO.
+Using ONLY the names, sources and numbers in DATA, write exactly four lines and nothing else:
+SIGNAL: <the most serious overloaded rep or toxic channel anomaly, with exact numbers>
+SIGNAL: <another anomaly, or the lead pacing vs the 7-day average>
+FOCUS: <one action for today>
+FOCUS: <one more action for today>
+Each line under 25 words. No markdown, no emojis, no extra text.
+
+DATA:
+{json.dumps(data, ensure_ascii=False)}
+"""
+
+def get_executive_summary(payload: Dict[str, Any], model_name: str = "llama3.2", temperature: float = 0.3,
+                          cache: Optional[ResponseCache] = None) -> Optional[str]:
     """
     Invokes the local LLM using a strict prompt engineering framework.
     Returns the string text of the report or None if execution fails.
+    With a `cache`, an identical earlier prompt is answered from disk without calling the model.
     """
     if not payload:
         logging.error("Empty payload provided to AI Agent.")
         return None
-        
+
     prompt = _construct_data_scientist_prompt(payload)
-    
+    cache_key = ResponseCache.key(model_name, temperature, prompt) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     # Temperature 0.0 enforces consistency and mathematical grounding over creativity
     try:
         logging.info(f"Invoking {model_name} (Temp: {temperature})...")
-        llm = ChatOllama(model=model_name, temperature=temperature)
+        llm = _get_llm(model_name, temperature)
         response = llm.invoke(prompt)
+        _record_llm_spans(model_name, prompt, response)
+        if cache and response.content:
+            cache.put(cache_key, response.content)
         return response.content
         
     except Exception as e:
         logging.critical(f"LLM Invocation Failed: {e}")
+        telemetry.record("llm_generate", model_name, status="ERROR", error=str(e)[:500])
+        return None
+
+def extract_dashboard_report(summary: str) -> str:
+    """Returns the text inside <DASHBOARD_REPORT> tags, tolerating a missing closing tag or no tags at all."""
+    match = re.search(r'<DASHBOARD_REPORT>\s*(.*?)\s*(?:</DASHBOARD_REPORT>|$)', summary, re.DOTALL | re.IGNORECASE)
+    report = match.group(1) if match else summary
+    return re.sub(r'</?DASHBOARD_REPORT>', '', report, flags=re.IGNORECASE).strip()
+
+# Four one-line bullets need ~120 tokens; the cap bounds generation time and output length
+NARRATIVE_NUM_PREDICT = 160
+
+def get_whatsapp_narrative(payload: Dict[str, Any], model_name: str = "llama3.2", temperature: float = 0.3) -> Optional[Dict[str, list]]:
+    """
+    Generates only the WhatsApp "Signals" and "Focus" bullets under a tight token budget.
+    Returns {"signals": [...], "focus": [...]} or None if the LLM fails or returns nothing usable.
+    """
+    if not payload:
+        return None
+    prompt = _construct_whatsapp_narrative_prompt(payload)
+    try:
+        logging.info(f"Invoking {model_name} for WhatsApp narrative (num_predict={NARRATIVE_NUM_PREDICT})...")
+        response = _get_llm(model_name, temperature, NARRATIVE_NUM_PREDICT).invoke(prompt)
+        _record_llm_spans(f"{model_name} whatsapp", prompt, response)
+    except Exception as e:
+        logging.error(f"WhatsApp narrative generation failed: {e}")
+        telemetry.record("llm_generate", f"{model_name} whatsapp", status="ERROR", error=str(e)[:500])
+        return None
+
+    narrative = _parse_labelled_lines(response.content)
+    return narrative if narrative["signals"] or narrative["focus"] else None
+
+def _parse_labelled_lines(text: str) -> Dict[str, list]:
+    """Collects `SIGNAL: ...` / `FOCUS: ...` lines, tolerating bullets and stray markdown."""
+    parsed = {"signals": [], "focus": []}
+    for line in (text or "").splitlines():
+        match = re.match(r'^[\s\-–•*>]*(SIGNALS?|FOCUS)\s*[:\-–]\s*(.+)$', line.strip(), re.IGNORECASE)
+        if match:
+            cleaned = re.sub(r'[*_`#]+', '', match.group(2)).strip()
+            parsed["signals" if match.group(1).upper().startswith("SIGNAL") else "focus"].append(cleaned)
+    return parsed
+
+def construct_rep_system_prompt(team_context: Dict[str, Any]) -> str:
+    """
+    Rubric + team-wide numbers shared by every rep's request. It is sent as the system
+    message, ahead of the rep-specific data, so consecutive requests share an identical
+    prompt prefix and Ollama reuses its KV cache instead of re-evaluating the rubric.
+    """
+    return f"""
+You are a sales manager writing a private WhatsApp nudge to ONE sales rep about their own pipeline.
+Using ONLY the numbers in TEAM and in the rep's data, write exactly two lines and nothing else:
+FOCUS: <the single most valuable action for this rep today, with their exact numbers>
+FOCUS: <one more concrete action for today>
+Each line under 20 words. Address the rep as "you". No markdown, no emojis, no extra text.
+
+TEAM:
+{json.dumps(team_context, ensure_ascii=False)}
+"""
+
+# Two short bullets; the cap keeps 50+ reps inside the daily window
+REP_NUM_PREDICT = 96
+
+def get_rep_focus(system_prompt: str, rep_slice: Dict[str, Any], model_name: str = "llama3.2",
+                  temperature: float = 0.3) -> Optional[list]:
+    """Generates one rep's two Focus bullets. Returns None if the LLM fails or returns nothing usable."""
+    rep_prompt = f"REP DATA:\n{json.dumps(rep_slice, ensure_ascii=False)}"
+    try:
+        response = _get_llm(model_name, temperature, REP_NUM_PREDICT).invoke([("system", system_prompt), ("human", rep_prompt)])
+        _record_llm_spans(f"{model_name} rep", system_prompt + rep_prompt, response)
+    except Exception as e:
+        logging.error(f"Rep briefing generation failed for {rep_slice.get('rep')}: {e}")
+        telemetry.record("llm_generate", f"{model_name} rep", status="ERROR", error=str(e)[:500])
         return None
+    return _parse_labelled_lines(response.content)["focus"] or None
+
+# Reused across calls in long-running processes; keep_alive stops Ollama unloading the model between cycles
+_llms = {}
+
+def _get_llm(model_name: str, temperature: float, num_predict: int = None) -> ChatOllama:
+    key = (model_name, temperature, num_predict)
+    if key not in _llms:
+        _llms[key] = ChatOllama(model=model_name, temperature=temperature, num_predict=num_predict,
+                                keep_alive=Config.OLLAMA_KEEP_ALIVE)
+    return _llms[key]
+
+def warm_up(model_name: str = "llama3.2") -> bool:
+    """Loads the model into Ollama's memory ahead of the first real briefing. Returns False if Ollama is unreachable."""
+    try:
+        ChatOllama(model=model_name, num_predict=1, keep_alive=Config.OLLAMA_KEEP_ALIVE).invoke("ok")
+        logging.info(f"🔥 {model_name} loaded and kept alive for {Config.OLLAMA_KEEP_ALIVE}.")
+        return True
+    except Exception as e:
+        logging.warning(f"Could not warm up {model_name}: {e}")
+        return False
+
+def _record_llm_spans(model_name: str, prompt: str, response) -> None:
+    """
+    Splits Ollama's own timings into a prefill span (prompt evaluation) and a generation span.
+    Durations are reported by Ollama in nanoseconds; `records` holds token counts.
+    """
+    meta = getattr(response, "response_metadata", None) or {}
+    telemetry.record("llm_prefill", model_name,
+                     duration_ms=meta.get("prompt_eval_duration", 0) / 1e6,
+                     records=meta.get("prompt_eval_count", 0),
+                     bytes_=len(prompt.encode("utf-8")))
+    telemetry.record("llm_generate", model_name,
+                     duration_ms=meta.get("eval_duration", 0) / 1e6,
+                     records=meta.get("eval_count", 0),
+                     bytes_=len((response.content or "").encode("utf-8")))
 
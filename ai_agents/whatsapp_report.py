@@ -0,0 +1,89 @@
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# ─────────────────────────────────────────────────────────────
+# WHATSAPP BRIEFING RENDERER
+# The headline numbers come straight from the build_ai_payload dict, so they are
+# exact and render in microseconds. Only the "Signals" / "Focus" bullets are written
+# by the LLM (analyst_agent.get_whatsapp_narrative); each bullet is clipped to a
+# budget that keeps the whole message under the cap, so nothing is ever truncated.
+# ─────────────────────────────────────────────────────────────
+
+# Twilio's WhatsApp limit is 1600 characters; keep a margin
+WHATSAPP_MAX_CHARS = 1500
+LINES_PER_SECTION = 2
+
+def render_whatsapp_report(payload: Dict[str, Any], narrative: Optional[Dict[str, list]] = None) -> str:
+    """
+    Fills the WhatsApp template from the payload. Missing or short narrative sections are
+    completed from `anomalies_detected_by_math`, so the message is always complete.
+    """
+    metrics = payload.get("daily_metrics", {})
+    try:
+        day = datetime.strptime(payload.get("report_date", ""), "%Y-%m-%d").strftime("%b %d")
+    except ValueError:
+        day = datetime.now().strftime("%b %d")
+
+    header = (
+        f"📊 Daily CRM Summary – {day}\n"
+        f"• New Leads: {metrics.get('new_leads_yesterday', 0)} ({metrics.get('percent_change_leads', '0%')} vs avg)\n"
+        f"• Pipeline Generated: {metrics.get('pipeline_generated_today', '₹0')}\n"
+        f"• Deals Closed: {metrics.get('closed_won_value_total', '₹0')}"
+    )
+    fallback = fallback_narrative(payload)
+    narrative = narrative or {}
+    signals = (list(narrative.get("signals") or []) + fallback["signals"])[:LINES_PER_SECTION]
+    focus = (list(narrative.get("focus") or []) + fallback["focus"])[:LINES_PER_SECTION]
+
+    # Split whatever the header and section titles leave over evenly across the bullets
+    fixed = len(header) + len("\n\n⚠️ Signals:") + len("\n\n👉 Focus:")
+    per_line = (WHATSAPP_MAX_CHARS - fixed) // (2 * LINES_PER_SECTION) - len("\n– ")
+    body = "\n\n⚠️ Signals:" + "".join(f"\n– {_clip(s, per_line)}" for s in signals)
+    body += "\n\n👉 Focus:" + "".join(f"\n– {_clip(f, per_line)}" for f in focus)
+    return header + body
+
+def fallback_narrative(payload: Dict[str, Any]) -> Dict[str, list]:
+    """Deterministic Signals/Focus built from the pre-computed anomalies (used to fill gaps in the LLM output)."""
+    signals, focus = [], []
+    for anomaly in payload.get("anomalies_detected_by_math", []):
+        finding, sep, recommendation = anomaly.partition("Recommendation:")
+        if not sep:
+            continue
+        signals.append(finding.strip())
+        focus.append(recommendation.strip())
+
+    metrics = payload.get("daily_metrics", {})
+    signals.append(f"Lead intake {metrics.get('new_leads_yesterday', 0)} vs a 7-day average of "
+                   f"{metrics.get('seven_day_lead_average', 0)} ({metrics.get('percent_change_leads', '0%')}).")
+    focus.append(f"Work the {metrics.get('total_open_pipeline_value', '₹0')} open pipeline toward close.")
+    return {"signals": signals, "focus": focus}
+
+def _clip(text: str, limit: int) -> str:
+    """Shortens to `limit` characters at a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 1].rsplit(" ", 1)[0]
+    return cut.rstrip(",;:–-") + "…"
+
+def render_rep_report(report_date: str, rep_slice: Dict[str, Any], focus: Optional[list] = None) -> str:
+    """Per-rep WhatsApp nudge: the rep's own numbers from the shared payload plus two Focus bullets."""
+    try:
+        day = datetime.strptime(report_date, "%Y-%m-%d").strftime("%b %d")
+    except ValueError:
+        day = datetime.now().strftime("%b %d")
+
+    lines = [
+        f"📊 {rep_slice['rep']} – Daily Focus – {day}",
+        f"• Active Leads: {rep_slice['active_leads']} (team avg {rep_slice['team_avg_active_leads']})",
+        f"• Open Pipeline: ₹{rep_slice['total_pipeline_value']:,} (#{rep_slice['pipeline_rank']} of {rep_slice['team_size']})",
+    ]
+    for flag in rep_slice.get("flags", [])[:1]:
+        lines.append(f"\n⚠️ {_clip(flag.partition('Recommendation:')[0].strip(), 300)}")
+
+    fallback = [flag.partition("Recommendation:")[2].strip() for flag in rep_slice.get("flags", []) if "Recommendation:" in flag]
+    fallback.append(f"Follow up on your {rep_slice['active_leads']} active leads and move one deal a stage forward.")
+    bullets = (list(focus or []) + fallback)[:LINES_PER_SECTION]
+    lines.append("\n👉 Focus:")
+    lines.extend(f"– {_clip(b, 300)}" for b in bullets)
+    return "\n".join(lines)
@@ -3,8 +3,12 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.io as pio
-from datetime import datetime
-from services import database_client
+import os
+import json
+from datetime import datetime, date, timedelta
+from services import database_client, async_database_client
+from core import forecast
+from core.profiling import RenderProfiler, RerunProfile
 
 # ─── Page Config ─────────────────────────────────────────────────────────────
 st.set_page_config(
@@ -16,6 +20,12 @@ st.set_page_config(
 
 pio.templates.default = "plotly_dark"
 
+# ─── Optional cProfile capture of a single rerun (armed from the sidebar) ────
+rerun_profile = None
+if st.session_state.pop("cprofile_next_rerun", False):
+    rerun_profile = RerunProfile()
+    rerun_profile.start()
+
 # ─── Premium CSS ─────────────────────────────────────────────────────────────
 st.markdown("""
 <style>
@@ -140,31 +150,56 @@ with st.sidebar:
     st.divider()
     if st.button("🔄 Clear Cache & Refresh", use_container_width=True):
         st.cache_data.clear()
+        st.cache_resource.clear()
+        st.rerun()
+    st.divider()
+    st.markdown("<div class='section-label'>Diagnostics</div>", unsafe_allow_html=True)
+    profiling_on = st.toggle("⏱️ Render Profiler", value=os.environ.get("DASHBOARD_PROFILE") == "1",
+                             help="Times data loading, DataFrame and figure building per section (see System Health).")
+    if st.button("🧪 cProfile Next Rerun", use_container_width=True):
+        st.session_state["cprofile_next_rerun"] = True
         st.rerun()
 
+prof = RenderProfiler(enabled=profiling_on)
+
 # ─── Data Loader ─────────────────────────────────────────────────────────────
+@st.cache_data(ttl=60)
+def get_data_version():
+    # Date-relative sections (trend window, closing soon) roll over at midnight even without a sync
+    return f"{database_client.get_data_version()}:{date.today().isoformat()}"
+
 @st.cache_data(ttl=1800)
-def load_all_data():
-    return {
-        "kpis":           database_client.get_overview_kpis(),
-        "trend":          database_client.get_lead_volume_trend(days=30),
-        "lead_statuses":  database_client.get_lead_status_breakdown(),
-        "source_quality": database_client.get_source_quality_all_time(),
-        "owner_leads":    database_client.get_owner_lead_distribution(),
-        "deal_stages":    database_client.get_deal_stage_breakdown(),
-        "deal_by_owner":  database_client.get_deal_value_by_owner(),
-        "closing_soon":   database_client.get_deals_closing_soon(days=30),
-        "won_vs_lost":    database_client.get_won_vs_lost(),
-        "contact_owners": database_client.get_contact_owner_distribution(),
-        "industries":     database_client.get_account_industry_breakdown(),
-        "sync_history":   database_client.get_sync_history(limit=10),
-        "pipeline":       database_client.get_advanced_analytics(),
-        "ai_dates":       database_client.get_all_briefing_dates(),
-        "ai_report":      database_client.get_latest_ai_briefing(),
-        "period_stats":   database_client.get_pipeline_period_stats(),
-    }
+def load_all_data(data_version):
+    return async_database_client.fetch_dashboard_data()
+
+@st.cache_data(ttl=1800)
+def load_briefing(report_date, data_version):
+    return database_client.get_briefing_by_date(report_date)
+
+@st.cache_data(ttl=1800)
+def load_custom_breakdown(module, field, data_version):
+    return database_client.get_custom_field_breakdown(module, field)
+
+@st.cache_data(ttl=1800)
+def load_time_series(metric, start_date, end_date, group_by, data_version):
+    return database_client.get_time_series(metric, start_date, end_date, group_by)
+
+@st.cache_data(ttl=1800)
+def load_likely_junk(days, data_version):
+    return database_client.get_likely_junk_leads(date.today().isoformat(), days=days, top_n=50)
+
+@st.cache_data(ttl=1800)
+def load_lead_cohorts(weeks, source, owner, data_version):
+    return database_client.get_lead_cohorts(weeks, COHORT_MAX_WEEKS, source, owner)
 
-d = load_all_data()
+@st.cache_data(ttl=1800)
+def load_forecast(data_version):
+    return forecast.simulate(database_client.get_forecast_inputs())
+
+data_version = get_data_version()
+with prof.section("Global", "All Sections", "load") as blk:
+    d = load_all_data(data_version)
+    blk.payload = d
 k = d["kpis"]
 ps = d["period_stats"]
 
@@ -178,7 +213,8 @@ st.markdown(f"""
 
 # ─── Top KPI Strip ───────────────────────────────────────────────────────────
 c1, c2, c3, c4, c5, c6, c7 = st.columns(7)
-c1.metric("Total Leads",   f"{k.get('total_leads', 0):,}")
+c1.metric("Total Leads",   f"{k.get('total_leads', 0):,}",
+          delta=f"{k.get('unique_prospects', k.get('total_leads', 0)):,} unique prospects", delta_color="off")
 c2.metric("Total Deals",   f"{k.get('total_deals', 0):,}")
 c3.metric("Contacts",      f"{k.get('total_contacts', 0):,}")
 c4.metric("Accounts",      f"{k.get('total_accounts', 0):,}")
@@ -190,12 +226,613 @@ c7.metric("Lead Junk %",   f"{junk_pct}%",
 
 st.divider()
 
+# ─── Section Builders ────────────────────────────────────────────────────────
+# Each builder turns one section's data into (figure, extras) — extras hold the
+# insight HTML and table rows. Results are cached per data version below, so a
+# rerun with unchanged sync data does no DataFrame or figure construction.
+JUNK_STATUSES = {"Junk Lead", "Not Qualified", "Not Qualified Lead"}
+
+@st.cache_resource
+def _figure_cache():
+    """Process-wide store of serialized section specs: {(tab, section, data_version): spec}."""
+    return {}
+
+def cached_section(tab, section, builder, *args):
+    """
+    Returns (figure, spec) for a section. On a miss the builder runs and its figure is stored as
+    Plotly JSON; on a hit the JSON is rehydrated without touching pandas or plotly.express.
+    Specs from older data versions are evicted as soon as a new version is built.
+    """
+    store = _figure_cache()
+    key = (tab, section, data_version)
+    spec = store.get(key)
+    if spec is None:
+        fig, extras = builder(*args)
+        spec = {"fig": fig.to_json() if fig is not None else None, **extras}
+        for stale in [k_ for k_ in list(store) if k_[2] != data_version]:
+            store.pop(stale, None)
+        store[key] = spec
+        return fig, spec
+    with prof.section(tab, section, "cache hit") as blk:
+        fig = pio.from_json(spec["fig"]) if spec["fig"] else None
+        blk.payload = spec["fig"]
+    return fig, spec
+
+def _build_lead_trend(trend):
+    with prof.section("Executive Summary", "Lead Trend", "frame") as blk:
+        df_trend = pd.DataFrame(sorted(trend.items()), columns=["Date", "New Leads"])
+        df_trend["Date"] = pd.to_datetime(df_trend["Date"])
+        avg_leads = df_trend["New Leads"].mean()
+        blk.payload = df_trend
+    with prof.section("Executive Summary", "Lead Trend", "figure") as blk:
+        fig = px.area(
+            df_trend, x="Date", y="New Leads",
+            title="New Lead Volume — Last 30 Days",
+            line_shape="spline",
+        )
+        fig.update_traces(line_color="#6366F1", fillcolor="rgba(99,102,241,0.12)")
+        fig.add_hline(y=avg_leads, line_dash="dot", line_color="#9CA3AF",
+                      annotation_text=f"30-day avg: {avg_leads:.0f}")
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                          margin=dict(t=40, b=10))
+        blk.payload = fig
+    # Insight
+    recent_days = df_trend.tail(3)["New Leads"].mean()
+    prev_3_days = df_trend.iloc[-6:-3]["New Leads"].mean() if len(df_trend) >= 6 else avg_leads
+    momentum = "improving" if recent_days > prev_3_days else "declining"
+    trend_dir = "above" if recent_days > avg_leads else "below"
+    color_class = "success-card" if trend_dir == "above" else "warning-card"
+    insight = (
+        f"<div class='{color_class}'>The last 3 days averaged <b>{recent_days:.0f} leads/day</b> — "
+        f"<b>{abs(recent_days - avg_leads):.0f} {'more' if trend_dir=='above' else 'fewer'}</b> than the 30-day average of <b>{avg_leads:.0f}</b>. "
+        f"Momentum is <b>{momentum}</b> compared to the prior 3-day window ({prev_3_days:.0f} avg). "
+        f"{'No action needed — pipeline intake is healthy.' if trend_dir=='above' else 'Run a quick audit of active ad campaigns to identify what changed.'}"
+        f"</div>")
+    return fig, {"insight": insight}
+
+def _build_pipeline_stages(pipeline_statuses):
+    with prof.section("Executive Summary", "Pipeline Stages", "frame") as blk:
+        df_stages = (
+            pd.DataFrame(list(pipeline_statuses.items()), columns=["Stage", "Count"])
+              .sort_values("Count", ascending=True)
+        )
+        df_stages["Color"] = df_stages["Stage"].apply(
+            lambda s: "#EF553B" if s in JUNK_STATUSES else
+                      "#00CC96" if "Won" in s else "#6366F1"
+        )
+        blk.payload = df_stages
+    with prof.section("Executive Summary", "Pipeline Stages", "figure") as blk:
+        fig = px.bar(
+            df_stages, x="Count", y="Stage", orientation="h",
+            title="Pipeline Stage Breakdown",
+            color="Color", color_discrete_map="identity",
+        )
+        fig.update_layout(showlegend=False, paper_bgcolor="rgba(0,0,0,0)",
+                          plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    # Insight
+    top_stage = max(pipeline_statuses, key=pipeline_statuses.get)
+    junk_total = sum(v for k_, v in pipeline_statuses.items() if k_ in JUNK_STATUSES)
+    total_all  = sum(pipeline_statuses.values())
+    junk_share = round((junk_total / total_all) * 100) if total_all else 0
+    in_pipeline = total_all - junk_total
+    insight = (
+        f"<div class='insight-card'><b>{top_stage}</b> has the most records at <b>{pipeline_statuses[top_stage]:,}</b>. "
+        f"Across the entire funnel, <b>{in_pipeline:,}</b> leads are actively progressing "
+        f"while <b>{junk_total:,} ({junk_share}%) are junk/unqualified</b> — "
+        f"{'quality is healthy; marketing spend is translating well into qualified pipeline.' if junk_share < 20 else 'this level of junk is eroding pipeline efficiency. A source-level targeting review is recommended.'}"
+        f"</div>")
+    return fig, {"insight": insight}
+
+def _build_source_mix(src):
+    with prof.section("Executive Summary", "Source Mix", "frame") as blk:
+        df_src = pd.DataFrame(list(src.items()), columns=["Source", "Count"])
+        top_src = df_src.sort_values("Count", ascending=False).iloc[0]
+        blk.payload = df_src
+    with prof.section("Executive Summary", "Source Mix", "figure") as blk:
+        fig = px.pie(df_src, values="Count", names="Source",
+                     title="Lead Source Distribution (Today)", hole=0.45)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    total_sources = len(src)
+    second_src = df_src.sort_values("Count", ascending=False).iloc[1] if total_sources > 1 else None
+    top_share = round((top_src['Count'] / df_src['Count'].sum()) * 100)
+    insight = (
+        f"<div class='insight-card'><b>{top_src['Source']}</b> dominates today's inbound with "
+        f"<b>{top_src['Count']} leads ({top_share}% of total)</b>. "
+        f"{f'Second-place is <b>{second_src["Source"]}</b> with <b>{second_src["Count"]}</b> leads.' if second_src is not None else ''} "
+        f"Heavy reliance on a single channel creates risk — if this source underperforms tomorrow, overall volume drops sharply.</div>")
+    return fig, {"insight": insight}
+
+def _build_won_vs_lost(wl):
+    total = wl["won_count"] + wl["lost_count"]
+    win_rate = round((wl["won_count"] / total) * 100) if total else 0
+    with prof.section("Executive Summary", "Won vs Lost", "frame") as blk:
+        df_wl = pd.DataFrame([
+            {"Outcome": "Closed Won",  "Count": wl["won_count"],  "Value (₹)": wl["won_value"]},
+            {"Outcome": "Closed Lost", "Count": wl["lost_count"], "Value (₹)": wl["lost_value"]},
+        ])
+        blk.payload = df_wl
+    with prof.section("Executive Summary", "Won vs Lost", "figure") as blk:
+        fig = px.bar(df_wl, x="Outcome", y="Count", color="Outcome", text="Count",
+                     title="Won vs Lost Deals",
+                     color_discrete_map={"Closed Won": "#10B981", "Closed Lost": "#EF553B"})
+        fig.update_traces(textposition="outside")
+        fig.update_layout(showlegend=False, paper_bgcolor="rgba(0,0,0,0)",
+                          plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    color_class = "success-card" if win_rate >= 50 else "warning-card"
+    revenue_at_risk = wl['lost_value']
+    insight = (
+        f"<div class='{color_class}'>Win rate stands at <b>{win_rate}%</b> across {total} closed deals. "
+        f"The team has converted <b>₹{wl['won_value']:,}</b> in revenue, but left <b>₹{revenue_at_risk:,} on the table</b> through lost deals. "
+        f"{'Conversion is strong — focus on increasing deal volume to scale revenue.' if win_rate >= 50 else 'Win rate is below 50%. Strategy review on objection handling and deal qualification is recommended.'}"
+        f"</div>")
+    return fig, {"insight": insight}
+
+def _build_lead_status(statuses):
+    with prof.section("Lead Intelligence", "Lead Status", "frame") as blk:
+        df_st = (pd.DataFrame(list(statuses.items()), columns=["Status", "Count"])
+                   .sort_values("Count", ascending=True))
+        blk.payload = df_st
+    with prof.section("Lead Intelligence", "Lead Status", "figure") as blk:
+        fig = px.bar(df_st, x="Count", y="Status", orientation="h",
+                     title="Lead Status Breakdown (All Time)",
+                     color="Count", color_continuous_scale="Blues")
+        fig.update_coloraxes(showscale=False)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    # Insight
+    junk_count = sum(statuses.get(k_, 0) for k_ in JUNK_STATUSES)
+    total_leads = sum(statuses.values())
+    top_status = max(statuses, key=statuses.get)
+    insight = (
+        f"<div class='insight-card'><b>{top_status}</b> is the most common lead status with "
+        f"<b>{statuses[top_status]:,}</b> leads. "
+        f"<b>{junk_count:,}</b> leads ({round(junk_count/total_leads*100) if total_leads else 0}%) "
+        f"are classified as junk or unqualified — these are not converting into pipeline value.</div>")
+    return fig, {"insight": insight}
+
+def _build_rep_workload(owner_leads):
+    with prof.section("Lead Intelligence", "Rep Workload", "frame") as blk:
+        df_ow = (pd.DataFrame(list(owner_leads.items()), columns=["Sales Rep", "Leads Assigned"])
+                   .sort_values("Leads Assigned", ascending=True))
+        avg_load = df_ow["Leads Assigned"].mean()
+        df_ow["Color"] = df_ow["Leads Assigned"].apply(
+            lambda x: "#EF553B" if x > avg_load * 2 else "#6366F1"
+        )
+        blk.payload = df_ow
+    with prof.section("Lead Intelligence", "Rep Workload", "figure") as blk:
+        fig = px.bar(df_ow, x="Leads Assigned", y="Sales Rep", orientation="h",
+                     title="Sales Rep Lead Workload",
+                     color="Color", color_discrete_map="identity")
+        fig.update_layout(showlegend=False, paper_bgcolor="rgba(0,0,0,0)",
+                          plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    overloaded = df_ow[df_ow["Leads Assigned"] > avg_load * 2]["Sales Rep"].tolist()
+    if overloaded:
+        insight = (
+            f"<div class='warning-card'>⚠️ <b>{', '.join(overloaded)}</b> "
+            f"{'is' if len(overloaded) == 1 else 'are'} carrying more than 2× the average lead load "
+            f"({avg_load:.0f} avg). This risks slow follow-up and deal decay. Consider redistributing leads.</div>")
+    else:
+        insight = f"<div class='success-card'>Lead distribution is balanced across reps. Average load is <b>{avg_load:.0f} leads/rep</b>.</div>"
+    return fig, {"insight": insight}
+
+def _build_channel_quality(sq):
+    with prof.section("Lead Intelligence", "Channel Quality", "frame") as blk:
+        q_rows = []
+        for src, m in sq.items():
+            q_rows.append({"Source": src, "Status": "In Pipeline", "Count": m["in_pipeline"]})
+            q_rows.append({"Source": src, "Status": "Junk / Unqualified", "Count": m["junk_or_unqualified"]})
+        df_q = pd.DataFrame(q_rows)
+        blk.payload = df_q
+    with prof.section("Lead Intelligence", "Channel Quality", "figure") as blk:
+        fig = px.bar(df_q, x="Source", y="Count", color="Status", barmode="stack",
+                     title="Channel Quality — Junk vs Pipeline per Source",
+                     color_discrete_map={"In Pipeline": "#10B981", "Junk / Unqualified": "#EF553B"})
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    # Auto-generate insight from the source matrix
+    best_src  = max(sq, key=lambda s: sq[s].get("in_pipeline", 0))
+    worst_src = max(sq, key=lambda s: sq[s].get("junk_or_unqualified", 0))
+    insight = (
+        f"<div class='insight-card'><b>{best_src}</b> is the top-performing channel with "
+        f"<b>{sq[best_src]['in_pipeline']}</b> leads in pipeline. "
+        f"<b>{worst_src}</b> produces the most junk ({sq[worst_src]['junk_or_unqualified']} unqualified leads) "
+        f"— review this channel's targeting criteria.</div>")
+    return fig, {"insight": insight}
+
+def _build_junk_bubble(sq):
+    with prof.section("Lead Intelligence", "Volume vs Junk Bubble", "frame") as blk:
+        junk_pct = {}
+        for src, m in sq.items():
+            total = m.get("total_leads", 0)
+            junk  = m.get("junk_or_unqualified", 0)
+            junk_pct[src] = round((junk / total) * 100) if total else 0
+
+        df_bubble = pd.DataFrame([
+            {"Source": src, "Total Leads": m["total_leads"], "Junk %": junk_pct[src], "In Pipeline": m["in_pipeline"]}
+            for src, m in sq.items()
+        ])
+        blk.payload = df_bubble
+    with prof.section("Lead Intelligence", "Volume vs Junk Bubble", "figure") as blk:
+        fig = px.scatter(
+            df_bubble, x="Source", y="Junk %", size="Total Leads",
+            color="Junk %", color_continuous_scale=["#10B981", "#F59E0B", "#EF553B"],
+            hover_data=["Total Leads", "In Pipeline"],
+            title="Lead Volume vs Junk % — Bubble View",
+            size_max=60,
+        )
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    table = sorted([
+        {"Source": src, "Total Leads": m["total_leads"], "In Pipeline": m["in_pipeline"],
+         "Junk / Unqualified": m["junk_or_unqualified"], "Junk %": f"{junk_pct[src]}%"}
+        for src, m in sq.items()
+    ], key=lambda r: r["Total Leads"], reverse=True)
+    return fig, {"table": table}
+
+def _build_likely_junk(likely_junk):
+    with prof.section("Lead Intelligence", "Likely Junk", "frame") as blk:
+        df_junk = pd.DataFrame([
+            {"Source": src, "Likely Junk": n} for src, n in likely_junk["by_source"].items()
+        ]).sort_values("Likely Junk", ascending=True)
+        blk.payload = df_junk
+    with prof.section("Lead Intelligence", "Likely Junk", "figure") as blk:
+        fig = px.bar(
+            df_junk, x="Likely Junk", y="Source", orientation="h",
+            color_discrete_sequence=["#EF553B"],
+            title=f"Unworked Leads Scored ≥ {likely_junk['threshold']:.2f} by Source",
+        )
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    top_src = df_junk["Source"].iloc[-1]
+    insight = (
+        f"<div class='insight-card'><b>{likely_junk['likely_junk']}</b> of <b>{likely_junk['scored']}</b> leads "
+        f"created in the last week look like junk to the scoring model, most of them from <b>{top_src}</b>. "
+        f"Have reps verify these contacts before calling.</div>")
+    table = [
+        {"Lead": r["full_name"], "Source": r["source"], "Owner": r["owner"], "Status": r["lead_status"],
+         "Created": str(r["created_time"])[:16].replace("T", " "), "Junk Score": r["junk_score"]}
+        for r in likely_junk["leads"]
+    ]
+    return fig, {"insight": insight, "table": table}
+
+COHORT_MAX_WEEKS = 12
+
+def _build_lead_cohorts(cohorts):
+    with prof.section("Lead Intelligence", "Lead Cohorts", "frame") as blk:
+        weeks = [datetime.fromisoformat(c["week"]).strftime("%d %b %Y") for c in cohorts]
+        # Cumulative % converted n weeks after creation; weeks that haven't happened yet stay blank
+        z = [[round(100 * n / c["leads"], 1) if c["leads"] else None for n in c["converted_by_week"]]
+             + [None] * (COHORT_MAX_WEEKS + 1 - len(c["converted_by_week"]))
+             for c in cohorts]
+        blk.payload = z
+    with prof.section("Lead Intelligence", "Lead Cohorts", "figure") as blk:
+        fig = go.Figure(go.Heatmap(
+            z=z, x=[f"W{n}" for n in range(COHORT_MAX_WEEKS + 1)], y=[f"{w} ({c['leads']:,})" for w, c in zip(weeks, cohorts)],
+            colorscale=[[0, "#0F172A"], [0.5, "#3B82F6"], [1, "#10B981"]], colorbar=dict(title="% → Deal"),
+            texttemplate="%{z:.0f}%", hovertemplate="Created week of %{y}<br>%{x}: %{z}% converted<extra></extra>",
+        ))
+        fig.update_layout(title="Lead → Deal Conversion by Creation Week (cumulative %, weeks since created)",
+                          yaxis=dict(autorange="reversed"), paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                          margin=dict(t=40, b=10), height=max(320, 28 * len(cohorts) + 120))
+        blk.payload = fig
+    # Compare cohorts at the same age: 4 weeks after creation, for the cohorts that have reached it
+    mature = [(w, row[4]) for w, row in zip(weeks, z) if row[4] is not None]
+    if mature:
+        avg = sum(pct for _, pct in mature) / len(mature)
+        best_week, best_pct = max(mature, key=lambda m: m[1])
+        insight = (
+            f"<div class='insight-card'>On average <b>{avg:.1f}%</b> of a week's leads have become deals within "
+            f"4 weeks. The best recent cohort, week of <b>{best_week}</b>, reached <b>{best_pct:.1f}%</b>.</div>")
+    else:
+        insight = "<div class='insight-card'>No cohort in this window is 4 weeks old yet.</div>"
+    return fig, {"insight": insight}
+
+def _build_deal_count_by_stage(deal_stages):
+    with prof.section("Deal Pipeline", "Deal Count by Stage", "frame") as blk:
+        df_stages = pd.DataFrame([
+            {"Stage": s, "Deals": m["count"], "Value (₹)": round(m["value"])}
+            for s, m in deal_stages.items()
+        ]).sort_values("Deals", ascending=True)
+        blk.payload = df_stages
+    with prof.section("Deal Pipeline", "Deal Count by Stage", "figure") as blk:
+        fig = px.bar(df_stages, x="Deals", y="Stage", orientation="h",
+                     title="Deal Count by Stage",
+                     color="Deals", color_continuous_scale="Purples")
+        fig.update_coloraxes(showscale=False)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    top_stage = max(deal_stages, key=lambda s: deal_stages[s]["count"])
+    insight = (
+        f"<div class='insight-card'><b>{top_stage}</b> has the highest deal concentration "
+        f"({deal_stages[top_stage]['count']} deals). If this is an early stage, it indicates strong top-of-funnel pipeline.</div>")
+    return fig, {"insight": insight}
+
+def _build_value_by_stage(deal_stages):
+    with prof.section("Deal Pipeline", "Value by Stage", "frame") as blk:
+        df_val = pd.DataFrame([
+            {"Stage": s, "Value (₹)": round(m["value"])}
+            for s, m in deal_stages.items()
+        ]).sort_values("Value (₹)", ascending=True)
+        blk.payload = df_val
+    with prof.section("Deal Pipeline", "Value by Stage", "figure") as blk:
+        fig = px.bar(df_val, x="Value (₹)", y="Stage", orientation="h",
+                     title="Pipeline ₹ Value by Stage",
+                     color="Value (₹)", color_continuous_scale="Greens")
+        fig.update_coloraxes(showscale=False)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    top_val_stage = max(deal_stages, key=lambda s: deal_stages[s]["value"])
+    insight = (
+        f"<div class='insight-card'>The highest ₹ concentration is at <b>{top_val_stage}</b> "
+        f"(₹{deal_stages[top_val_stage]['value']:,.0f}). Prioritise closing deals in this stage first.</div>")
+    return fig, {"insight": insight}
+
+def _build_rep_performance(deal_owners):
+    with prof.section("Deal Pipeline", "Rep Performance", "frame") as blk:
+        df_owner = pd.DataFrame([
+            {"Sales Rep": o, "Open Pipeline (₹)": round(m["open_value"]),
+             "Won Revenue (₹)": round(m["won_value"]), "Total Deals": m["deal_count"]}
+            for o, m in deal_owners.items()
+        ]).sort_values("Open Pipeline (₹)", ascending=False)
+        blk.payload = df_owner
+    with prof.section("Deal Pipeline", "Rep Performance", "figure") as blk:
+        fig = px.bar(
+            df_owner.melt(id_vars="Sales Rep", value_vars=["Open Pipeline (₹)", "Won Revenue (₹)"],
+                          var_name="Category", value_name="Value (₹)"),
+            x="Sales Rep", y="Value (₹)", color="Category", barmode="group",
+            title="Deal Value by Rep — Open Pipeline vs Won Revenue",
+            color_discrete_map={"Open Pipeline (₹)": "#6366F1", "Won Revenue (₹)": "#10B981"}
+        )
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    top_rep = df_owner.iloc[0]
+    insight = (
+        f"<div class='insight-card'><b>{top_rep['Sales Rep']}</b> holds the largest open pipeline "
+        f"(₹{top_rep['Open Pipeline (₹)']:,}). Reps with high open pipeline but low won revenue may need "
+        f"coaching on closing techniques.</div>")
+    return fig, {"insight": insight, "table": df_owner.to_dict("records")}
+
+def _build_time_in_stage(time_in_stage):
+    with prof.section("Deal Pipeline", "Time in Stage", "frame") as blk:
+        df_tis = pd.DataFrame([
+            {"Stage": s_, "Avg Days": m["avg_days"], "Median Days": m["median_days"], "Transitions": m["transitions"]}
+            for s_, m in time_in_stage.items()
+        ]).sort_values("Avg Days", ascending=True)
+        blk.payload = df_tis
+    with prof.section("Deal Pipeline", "Time in Stage", "figure") as blk:
+        fig = px.bar(df_tis, x="Avg Days", y="Stage", orientation="h",
+                     title="Average Days Spent in Each Stage",
+                     hover_data=["Median Days", "Transitions"],
+                     color="Avg Days", color_continuous_scale="Oranges")
+        fig.update_coloraxes(showscale=False)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    slowest = df_tis.iloc[-1]
+    insight = (
+        f"<div class='insight-card'>Deals sit longest in <b>{slowest['Stage']}</b> — "
+        f"<b>{slowest['Avg Days']:.1f} days</b> on average (median {slowest['Median Days']:.1f}). "
+        f"This is the stage where a nudge from the rep shortens the sales cycle most.</div>")
+    return fig, {"insight": insight}
+
+def _build_stage_conversion(conversion):
+    stages = conversion.get("stages", {})
+    with prof.section("Deal Pipeline", "Stage Conversion", "frame") as blk:
+        df_conv = pd.DataFrame([
+            {"Stage": s_, "Deals Entered": m["entered"], "Reached Won": m["won"], "Win Rate %": m["win_rate_pct"]}
+            for s_, m in stages.items() if s_ not in ("Closed Won", "Closed Lost")
+        ], columns=["Stage", "Deals Entered", "Reached Won", "Win Rate %"]).sort_values("Win Rate %", ascending=True)
+        blk.payload = df_conv
+    with prof.section("Deal Pipeline", "Stage Conversion", "figure") as blk:
+        fig = px.bar(df_conv, x="Win Rate %", y="Stage", orientation="h",
+                     title="Win Rate from Each Stage",
+                     hover_data=["Deals Entered", "Reached Won"],
+                     color="Win Rate %", color_continuous_scale="Greens")
+        fig.update_coloraxes(showscale=False)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    top_moves = conversion.get("transitions", [])[:10]
+    table = [{"From": t["from"], "To": t["to"], "Deals": t["count"]} for t in top_moves]
+    return fig, {"table": table}
+
+def _build_revenue_forecast(fc):
+    with prof.section("Deal Pipeline", "Revenue Forecast", "frame") as blk:
+        df_fc = pd.DataFrame([
+            {"Month": pd.Timestamp(f"{m}-01").strftime("%b %Y"), "P10": b["p10"], "P50": b["p50"], "P90": b["p90"],
+             "Expected": b["expected"]}
+            for m, b in fc["months"].items()
+        ])
+        blk.payload = df_fc
+    with prof.section("Deal Pipeline", "Revenue Forecast", "figure") as blk:
+        fig = go.Figure(go.Bar(
+            x=df_fc["Month"], y=df_fc["P50"], name="P50 (likely)", marker_color="#6366F1",
+            error_y=dict(type="data", symmetric=False, array=df_fc["P90"] - df_fc["P50"],
+                         arrayminus=df_fc["P50"] - df_fc["P10"], color="#9CA3AF"),
+            customdata=df_fc[["P10", "P90"]],
+            hovertemplate="%{x}<br>P50 ₹%{y:,.0f}<br>P10 ₹%{customdata[0]:,.0f} · P90 ₹%{customdata[1]:,.0f}<extra></extra>",
+        ))
+        fig.update_layout(title=f"Won Revenue Forecast — P10 to P90 over {fc['scenarios']:,} scenarios",
+                          yaxis_title="₹", paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
+                          margin=dict(t=40, b=10))
+        blk.payload = fig
+    total = fc["total"]
+    insight = (
+        f"<div class='insight-card'>Across the next {len(fc['months'])} months the open pipeline should close "
+        f"<b>₹{total['p50']:,}</b> (P50), with an 80% range of <b>₹{total['p10']:,} – ₹{total['p90']:,}</b>, "
+        f"from {fc['forecast_deals']:,} open deals at historical stage win rates.")
+    if fc["overdue_deals"]:
+        insight += (f" {fc['overdue_deals']:,} deal(s) are past their closing date and are counted in this month — "
+                    f"update their Closing Date in Zoho to sharpen the forecast.")
+    insight += "</div>"
+    table = [{"Sales Rep": o, "P10 (₹)": b["p10"], "P50 (₹)": b["p50"], "P90 (₹)": b["p90"], "Expected (₹)": b["expected"]}
+             for o, b in fc["owners"].items()]
+    return fig, {"insight": insight, "table": table}
+
+def _build_closing_soon(closing):
+    with prof.section("Deal Pipeline", "Closing Soon", "frame") as blk:
+        df_close = pd.DataFrame(closing)[["deal_name", "stage", "amount", "owner", "closed_time"]]
+        df_close.rename(columns={
+            "deal_name": "Deal", "stage": "Stage",
+            "amount": "Amount (₹)", "owner": "Owner", "closed_time": "Close Date"
+        }, inplace=True)
+        df_close["Amount (₹)"] = df_close["Amount (₹)"].apply(lambda x: f"₹{x:,.0f}" if x else "₹0")
+        blk.payload = df_close
+    return None, {"table": df_close.to_dict("records")}
+
+def _build_sync_history(sync_history):
+    with prof.section("System Health", "Sync History", "frame") as blk:
+        df_sync = pd.DataFrame(sync_history)
+        df_sync["sync_time"] = df_sync["sync_time"].str[:16].str.replace("T", " ")
+        df_sync.rename(columns={"sync_time": "Timestamp", "records_fetched": "Records", "status": "Status"}, inplace=True)
+        blk.payload = df_sync
+    with prof.section("System Health", "Sync History", "figure") as blk:
+        fig = px.bar(df_sync, x="Timestamp", y="Records",
+                     title="Records Synced Per Run",
+                     color="Records", color_continuous_scale="Blues")
+        fig.update_coloraxes(showscale=False)
+        fig.update_xaxes(tickangle=45)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    return fig, {"table": df_sync[["Timestamp", "Records", "Status"]].to_dict("records")}
+
+def _stage_frame(stage_metrics):
+    df_stage = pd.DataFrame(stage_metrics)
+    df_stage["Run"] = df_stage["run_started"].str[:16].str.replace("T", " ")
+    df_stage["Seconds"] = df_stage["duration_ms"] / 1000
+    return df_stage
+
+def _build_stage_timings(stage_metrics):
+    with prof.section("System Health", "Stage Timings", "frame") as blk:
+        df_stage = _stage_frame(stage_metrics)
+        blk.payload = df_stage
+    with prof.section("System Health", "Stage Timings", "figure") as blk:
+        fig = px.bar(df_stage, x="Run", y="Seconds", color="stage",
+                     title="Wall Time per Stage — Last 10 Runs")
+        fig.update_xaxes(tickangle=45)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    # Insight: compare the latest run against the median of the previous runs per stage
+    latest_run = df_stage["run_id"].iloc[-1]
+    latest = df_stage[df_stage["run_id"] == latest_run].set_index("stage")["Seconds"]
+    history = df_stage[df_stage["run_id"] != latest_run].groupby("stage")["Seconds"].median()
+    regressed = [
+        f"<b>{stg}</b> ({latest[stg]:.1f}s vs {history[stg]:.1f}s median)"
+        for stg in latest.index if stg in history and history[stg] > 0 and latest[stg] > history[stg] * 1.5
+    ]
+    failed = df_stage[(df_stage["run_id"] == latest_run) & (df_stage["errors"] > 0)]["stage"].tolist()
+    if regressed or failed:
+        insight = (
+            f"<div class='warning-card'>⚠️ Latest run: "
+            f"{'regressed stages — ' + ', '.join(regressed) + '. ' if regressed else ''}"
+            f"{'failed spans in ' + ', '.join(failed) + '.' if failed else ''}</div>")
+    else:
+        insight = (
+            f"<div class='success-card'>Latest run completed in <b>{latest.sum():.1f}s</b> "
+            f"with every stage within 1.5× of its recent median.</div>")
+    table = df_stage[["Run", "stage", "Seconds", "records", "bytes", "spans", "errors"]].to_dict("records")
+    return fig, {"insight": insight, "table": table}
+
+def _build_stage_throughput(stage_metrics):
+    with prof.section("System Health", "Stage Throughput", "figure") as blk:
+        df_tp = _stage_frame(stage_metrics)
+        df_tp = df_tp[df_tp["records"] > 0].copy()
+        df_tp["Records / s"] = df_tp["records"] / df_tp["Seconds"].where(df_tp["Seconds"] > 0)
+        fig = px.line(df_tp, x="Run", y="Records / s", color="stage", markers=True,
+                      title="Throughput per Stage (records or tokens / s)")
+        fig.update_xaxes(tickangle=45)
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    return fig, {}
+
+def _build_custom_leads(field, breakdown):
+    with prof.section("Lead Intelligence", f"By {field}", "frame") as blk:
+        rows = []
+        for val, m in breakdown.items():
+            rows.append({field: val, "Status": "In Pipeline", "Count": m["in_pipeline"]})
+            rows.append({field: val, "Status": "Junk / Unqualified", "Count": m["junk_or_unqualified"]})
+        df_cf = pd.DataFrame(rows)
+        blk.payload = df_cf
+    with prof.section("Lead Intelligence", f"By {field}", "figure") as blk:
+        fig = px.bar(df_cf, x=field, y="Count", color="Status", barmode="stack",
+                     title=f"Leads by {field.replace('_', ' ')} — Pipeline vs Junk",
+                     color_discrete_map={"In Pipeline": "#10B981", "Junk / Unqualified": "#EF553B"})
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    top_val = max(breakdown, key=lambda v: breakdown[v]["in_pipeline"])
+    insight = (
+        f"<div class='insight-card'><b>{top_val}</b> contributes the most live pipeline "
+        f"({breakdown[top_val]['in_pipeline']:,} leads) of the top {len(breakdown)} {field.replace('_', ' ')} values.</div>")
+    return fig, {"insight": insight}
+
+def _build_custom_deals(field, breakdown):
+    with prof.section("Deal Pipeline", f"By {field}", "frame") as blk:
+        df_cf = pd.DataFrame([
+            {field: val, "Open Pipeline (₹)": round(m["open_value"]), "Won Revenue (₹)": round(m["won_value"]),
+             "Total Deals": m["deal_count"]}
+            for val, m in breakdown.items()
+        ])
+        blk.payload = df_cf
+    with prof.section("Deal Pipeline", f"By {field}", "figure") as blk:
+        fig = px.bar(
+            df_cf.melt(id_vars=field, value_vars=["Open Pipeline (₹)", "Won Revenue (₹)"],
+                       var_name="Category", value_name="Value (₹)"),
+            x=field, y="Value (₹)", color="Category", barmode="group",
+            title=f"Deal Value by {field.replace('_', ' ')} — Open Pipeline vs Won Revenue",
+            color_discrete_map={"Open Pipeline (₹)": "#6366F1", "Won Revenue (₹)": "#10B981"}
+        )
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    return fig, {"table": df_cf.to_dict("records")}
+
+# Trends Explorer: range presets (days back from today; None = all history) and the RPC's metrics / dimensions
+TREND_RANGES = {"30D": 30, "90D": 90, "1Y": 365, "3Y": 3 * 365, "All": None, "Custom": None}
+TREND_METRICS = {"New Leads": "leads", "Pipeline Created (₹)": "pipeline_created", "Won Revenue (₹)": "won_value"}
+TREND_GROUPS = {"None": None, "Owner": "owner", "Source": "source", "Stage / Status": "stage"}
+
+def _build_time_series(metric_label, group_label, ts):
+    section = f"Trends: {metric_label}"
+    with prof.section("Executive Summary", section, "frame") as blk:
+        df_ts = pd.DataFrame([
+            {"Period": bucket, "Group": group, metric_label: value}
+            for group, values in ts["series"].items()
+            for bucket, value in zip(ts["buckets"], values)
+        ])
+        df_ts["Period"] = pd.to_datetime(df_ts["Period"])
+        blk.payload = df_ts
+    with prof.section("Executive Summary", section, "figure") as blk:
+        title = f"{metric_label} per {ts['granularity']} — {ts['start_date']} to {ts['end_date']}"
+        if group_label == "None":
+            fig = px.area(df_ts, x="Period", y=metric_label, title=title)
+            fig.update_traces(line_color="#6366F1", fillcolor="rgba(99,102,241,0.12)")
+        else:
+            fig = px.area(df_ts, x="Period", y=metric_label, color="Group", title=f"{title} · by {group_label}")
+        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        blk.payload = fig
+    # Insight
+    per_bucket = df_ts.groupby("Period")[metric_label].sum()
+    total = per_bucket.sum()
+    money = metric_label.endswith("(₹)")
+    fmt = (lambda v: f"₹{v:,.0f}") if money else (lambda v: f"{v:,.0f}")
+    peak_fmt = {"day": "%d %b %Y", "week": "week of %d %b %Y", "month": "%b %Y"}[ts["granularity"]]
+    insight = (
+        f"<div class='insight-card'><b>{fmt(total)}</b> across {len(per_bucket)} {ts['granularity']}s; "
+        f"the peak {ts['granularity']} was <b>{per_bucket.idxmax().strftime(peak_fmt)}</b> at <b>{fmt(per_bucket.max())}</b> "
+        f"against an average of {fmt(per_bucket.mean())}.")
+    if group_label != "None" and total:
+        by_group = df_ts.groupby("Group")[metric_label].sum()
+        insight += f" <b>{by_group.idxmax()}</b> leads with {by_group.max() / total:.0%} of the total."
+    return fig, {"insight": insight + "</div>"}
+
 # ─── Tabs ────────────────────────────────────────────────────────────────────
-tab1, tab2, tab3, tab4 = st.tabs([
+tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "📊 Executive Summary",
     "🎯 Lead Intelligence",
     "💰 Deal Pipeline",
     "⚙️ System Health",
+    "🔎 Record Explorer",
 ])
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -271,7 +908,7 @@ with tab1:
         col_date, _ = st.columns([1, 3])
         with col_date:
             selected_date = st.selectbox("Report Date", ai_dates, index=0, label_visibility="collapsed")
-        briefing = database_client.get_briefing_by_date(selected_date)
+        briefing = load_briefing(selected_date, data_version)
         if briefing:
             with st.container(border=True):
                 st.markdown(briefing)
@@ -288,67 +925,18 @@ with tab1:
     with col_a:
         trend = d["trend"]
         if trend:
-            df_trend = pd.DataFrame(sorted(trend.items()), columns=["Date", "New Leads"])
-            df_trend["Date"] = pd.to_datetime(df_trend["Date"])
-            avg_leads = df_trend["New Leads"].mean()
-            fig = px.area(
-                df_trend, x="Date", y="New Leads",
-                title="New Lead Volume — Last 30 Days",
-                line_shape="spline",
-            )
-            fig.update_traces(line_color="#6366F1", fillcolor="rgba(99,102,241,0.12)")
-            fig.add_hline(y=avg_leads, line_dash="dot", line_color="#9CA3AF",
-                          annotation_text=f"30-day avg: {avg_leads:.0f}")
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)",
-                              margin=dict(t=40, b=10))
+            fig, sec = cached_section("Executive Summary", "Lead Trend", _build_lead_trend, trend)
             st.plotly_chart(fig, use_container_width=True)
-            # Insight
-            recent_days = df_trend.tail(3)["New Leads"].mean()
-            prev_3_days = df_trend.iloc[-6:-3]["New Leads"].mean() if len(df_trend) >= 6 else avg_leads
-            momentum = "improving" if recent_days > prev_3_days else "declining"
-            trend_dir = "above" if recent_days > avg_leads else "below"
-            color_class = "success-card" if trend_dir == "above" else "warning-card"
-            st.markdown(
-                f"<div class='{color_class}'>The last 3 days averaged <b>{recent_days:.0f} leads/day</b> — "
-                f"<b>{abs(recent_days - avg_leads):.0f} {'more' if trend_dir=='above' else 'fewer'}</b> than the 30-day average of <b>{avg_leads:.0f}</b>. "
-                f"Momentum is <b>{momentum}</b> compared to the prior 3-day window ({prev_3_days:.0f} avg). "
-                f"{'No action needed — pipeline intake is healthy.' if trend_dir=='above' else 'Run a quick audit of active ad campaigns to identify what changed.'}"
-                f"</div>", unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
         else:
             st.info("No lead trend data available yet.")
 
     with col_b:
         pipeline_statuses = d["pipeline"].get("pipeline_statuses", {})
         if pipeline_statuses:
-            junk_statuses = {"Junk Lead", "Not Qualified", "Not Qualified Lead"}
-            df_stages = (
-                pd.DataFrame(list(pipeline_statuses.items()), columns=["Stage", "Count"])
-                  .sort_values("Count", ascending=True)
-            )
-            df_stages["Color"] = df_stages["Stage"].apply(
-                lambda s: "#EF553B" if s in junk_statuses else
-                          "#00CC96" if "Won" in s else "#6366F1"
-            )
-            fig = px.bar(
-                df_stages, x="Count", y="Stage", orientation="h",
-                title="Pipeline Stage Breakdown",
-                color="Color", color_discrete_map="identity",
-            )
-            fig.update_layout(showlegend=False, paper_bgcolor="rgba(0,0,0,0)",
-                              plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Executive Summary", "Pipeline Stages", _build_pipeline_stages, pipeline_statuses)
             st.plotly_chart(fig, use_container_width=True)
-            # Insight
-            top_stage = max(pipeline_statuses, key=pipeline_statuses.get)
-            junk_total = sum(v for k_, v in pipeline_statuses.items() if k_ in junk_statuses)
-            total_all  = sum(pipeline_statuses.values())
-            junk_share = round((junk_total / total_all) * 100) if total_all else 0
-            in_pipeline = total_all - junk_total
-            st.markdown(
-                f"<div class='insight-card'><b>{top_stage}</b> has the most records at <b>{pipeline_statuses[top_stage]:,}</b>. "
-                f"Across the entire funnel, <b>{in_pipeline:,}</b> leads are actively progressing "
-                f"while <b>{junk_total:,} ({junk_share}%) are junk/unqualified</b> — "
-                f"{'quality is healthy; marketing spend is translating well into qualified pipeline.' if junk_share < 20 else 'this level of junk is eroding pipeline efficiency. A source-level targeting review is recommended.'}"
-                f"</div>", unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
         else:
             st.info("No pipeline data available.")
 
@@ -360,50 +948,52 @@ with tab1:
     with col_c:
         src = d["pipeline"].get("source_breakdown", {})
         if src:
-            df_src = pd.DataFrame(list(src.items()), columns=["Source", "Count"])
-            top_src = df_src.sort_values("Count", ascending=False).iloc[0]
-            fig = px.pie(df_src, values="Count", names="Source",
-                         title="Lead Source Distribution (Today)", hole=0.45)
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Executive Summary", "Source Mix", _build_source_mix, src)
             st.plotly_chart(fig, use_container_width=True)
-            total_sources = len(src)
-            second_src = df_src.sort_values("Count", ascending=False).iloc[1] if total_sources > 1 else None
-            top_share = round((top_src['Count'] / df_src['Count'].sum()) * 100)
-            st.markdown(
-                f"<div class='insight-card'><b>{top_src['Source']}</b> dominates today's inbound with "
-                f"<b>{top_src['Count']} leads ({top_share}% of total)</b>. "
-                f"{f'Second-place is <b>{second_src["Source"]}</b> with <b>{second_src["Count"]}</b> leads.' if second_src is not None else ''} "
-                f"Heavy reliance on a single channel creates risk — if this source underperforms tomorrow, overall volume drops sharply.</div>",
-                unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
         else:
             st.info("No source data for today.")
 
     with col_d:
         wl = d["won_vs_lost"]
         if wl["won_count"] or wl["lost_count"]:
-            total = wl["won_count"] + wl["lost_count"]
-            win_rate = round((wl["won_count"] / total) * 100) if total else 0
-            df_wl = pd.DataFrame([
-                {"Outcome": "Closed Won",  "Count": wl["won_count"],  "Value (₹)": wl["won_value"]},
-                {"Outcome": "Closed Lost", "Count": wl["lost_count"], "Value (₹)": wl["lost_value"]},
-            ])
-            fig = px.bar(df_wl, x="Outcome", y="Count", color="Outcome", text="Count",
-                         title="Won vs Lost Deals",
-                         color_discrete_map={"Closed Won": "#10B981", "Closed Lost": "#EF553B"})
-            fig.update_traces(textposition="outside")
-            fig.update_layout(showlegend=False, paper_bgcolor="rgba(0,0,0,0)",
-                              plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Executive Summary", "Won vs Lost", _build_won_vs_lost, wl)
             st.plotly_chart(fig, use_container_width=True)
-            color_class = "success-card" if win_rate >= 50 else "warning-card"
-            revenue_at_risk = wl['lost_value']
-            st.markdown(
-                f"<div class='{color_class}'>Win rate stands at <b>{win_rate}%</b> across {total} closed deals. "
-                f"The team has converted <b>₹{wl['won_value']:,}</b> in revenue, but left <b>₹{revenue_at_risk:,} on the table</b> through lost deals. "
-                f"{'Conversion is strong — focus on increasing deal volume to scale revenue.' if win_rate >= 50 else 'Win rate is below 50%. Strategy review on objection handling and deal qualification is recommended.'}"
-                f"</div>", unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
         else:
             st.info("No closed deals yet.")
 
+    st.divider()
+
+    # ── Trends Explorer: any range, bucketed and capped server-side ───────────
+    st.markdown("<div class='section-label'>Trends Explorer</div>", unsafe_allow_html=True)
+    t1, t2, t3, t4 = st.columns([2, 1, 1, 1])
+    range_label = t1.radio("Range", list(TREND_RANGES), index=1, horizontal=True, key="trend_range")
+    metric_label = t2.selectbox("Metric", list(TREND_METRICS), key="trend_metric")
+    group_label = t3.selectbox("Split by", list(TREND_GROUPS), key="trend_group")
+    trend_start = trend_end = None
+    if range_label == "Custom":
+        picked = t4.date_input("Dates", value=(date.today() - timedelta(days=89), date.today()),
+                               format="YYYY-MM-DD", key="trend_dates")
+        if len(picked) == 2:
+            trend_start, trend_end = picked[0].isoformat(), picked[1].isoformat()
+    elif TREND_RANGES[range_label]:
+        trend_start = (date.today() - timedelta(days=TREND_RANGES[range_label] - 1)).isoformat()
+
+    if range_label == "Custom" and not trend_start:
+        st.info("Pick an end date to load the trend.")
+    else:
+        metric, group_by = TREND_METRICS[metric_label], TREND_GROUPS[group_label]
+        ts = load_time_series(metric, trend_start, trend_end, group_by, data_version)
+        if ts.get("series"):
+            fig, sec = cached_section("Executive Summary",
+                                      f"Trends {metric} {group_by} {trend_start} {trend_end}",
+                                      _build_time_series, metric_label, group_label, ts)
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
+        else:
+            st.info(f"No {metric_label.lower()} in this range.")
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # TAB 2 — LEAD INTELLIGENCE
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -415,52 +1005,16 @@ with tab2:
     with col_a:
         statuses = d["lead_statuses"]
         if statuses:
-            df_st = (pd.DataFrame(list(statuses.items()), columns=["Status", "Count"])
-                       .sort_values("Count", ascending=True))
-            fig = px.bar(df_st, x="Count", y="Status", orientation="h",
-                         title="Lead Status Breakdown (All Time)",
-                         color="Count", color_continuous_scale="Blues")
-            fig.update_coloraxes(showscale=False)
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Lead Intelligence", "Lead Status", _build_lead_status, statuses)
             st.plotly_chart(fig, use_container_width=True)
-            # Insight
-            junk_keys = ["Junk Lead", "Not Qualified", "Not Qualified Lead"]
-            junk_count = sum(statuses.get(k_, 0) for k_ in junk_keys)
-            total_leads = sum(statuses.values())
-            top_status = max(statuses, key=statuses.get)
-            st.markdown(
-                f"<div class='insight-card'><b>{top_status}</b> is the most common lead status with "
-                f"<b>{statuses[top_status]:,}</b> leads. "
-                f"<b>{junk_count:,}</b> leads ({round(junk_count/total_leads*100) if total_leads else 0}%) "
-                f"are classified as junk or unqualified — these are not converting into pipeline value.</div>",
-                unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
 
     with col_b:
         owner_leads = d["owner_leads"]
         if owner_leads:
-            df_ow = (pd.DataFrame(list(owner_leads.items()), columns=["Sales Rep", "Leads Assigned"])
-                       .sort_values("Leads Assigned", ascending=True))
-            avg_load = df_ow["Leads Assigned"].mean()
-            df_ow["Color"] = df_ow["Leads Assigned"].apply(
-                lambda x: "#EF553B" if x > avg_load * 2 else "#6366F1"
-            )
-            fig = px.bar(df_ow, x="Leads Assigned", y="Sales Rep", orientation="h",
-                         title="Sales Rep Lead Workload",
-                         color="Color", color_discrete_map="identity")
-            fig.update_layout(showlegend=False, paper_bgcolor="rgba(0,0,0,0)",
-                              plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Lead Intelligence", "Rep Workload", _build_rep_workload, owner_leads)
             st.plotly_chart(fig, use_container_width=True)
-            overloaded = df_ow[df_ow["Leads Assigned"] > avg_load * 2]["Sales Rep"].tolist()
-            if overloaded:
-                st.markdown(
-                    f"<div class='warning-card'>⚠️ <b>{', '.join(overloaded)}</b> "
-                    f"{'is' if len(overloaded) == 1 else 'are'} carrying more than 2× the average lead load "
-                    f"({avg_load:.0f} avg). This risks slow follow-up and deal decay. Consider redistributing leads.</div>",
-                    unsafe_allow_html=True)
-            else:
-                st.markdown(
-                    f"<div class='success-card'>Lead distribution is balanced across reps. Average load is <b>{avg_load:.0f} leads/rep</b>.</div>",
-                    unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
 
     st.divider()
     st.markdown("<div class='section-label'>Marketing Channel Quality</div>", unsafe_allow_html=True)
@@ -468,54 +1022,61 @@ with tab2:
     sq = d["source_quality"]
     if sq:
         # Stacked bar
-        q_rows = []
-        for src, m in sq.items():
-            q_rows.append({"Source": src, "Status": "In Pipeline", "Count": m["in_pipeline"]})
-            q_rows.append({"Source": src, "Status": "Junk / Unqualified", "Count": m["junk_or_unqualified"]})
-        df_q = pd.DataFrame(q_rows)
-        fig = px.bar(df_q, x="Source", y="Count", color="Status", barmode="stack",
-                     title="Channel Quality — Junk vs Pipeline per Source",
-                     color_discrete_map={"In Pipeline": "#10B981", "Junk / Unqualified": "#EF553B"})
-        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        fig, sec = cached_section("Lead Intelligence", "Channel Quality", _build_channel_quality, sq)
         st.plotly_chart(fig, use_container_width=True)
-
-        # Auto-generate insight from the source matrix
-        best_src  = max(sq, key=lambda s: sq[s].get("in_pipeline", 0))
-        worst_src = max(sq, key=lambda s: sq[s].get("junk_or_unqualified", 0))
-        st.markdown(
-            f"<div class='insight-card'><b>{best_src}</b> is the top-performing channel with "
-            f"<b>{sq[best_src]['in_pipeline']}</b> leads in pipeline. "
-            f"<b>{worst_src}</b> produces the most junk ({sq[worst_src]['junk_or_unqualified']} unqualified leads) "
-            f"— review this channel's targeting criteria.</div>", unsafe_allow_html=True)
+        st.markdown(sec["insight"], unsafe_allow_html=True)
 
         # Bubble
-        for src in sq:
-            total = sq[src].get("total_leads", 0)
-            junk  = sq[src].get("junk_or_unqualified", 0)
-            sq[src]["junk_pct"] = round((junk / total) * 100) if total else 0
-
-        df_bubble = pd.DataFrame([
-            {"Source": src, "Total Leads": m["total_leads"], "Junk %": m["junk_pct"], "In Pipeline": m["in_pipeline"]}
-            for src, m in sq.items()
-        ])
-        fig2 = px.scatter(
-            df_bubble, x="Source", y="Junk %", size="Total Leads",
-            color="Junk %", color_continuous_scale=["#10B981", "#F59E0B", "#EF553B"],
-            hover_data=["Total Leads", "In Pipeline"],
-            title="Lead Volume vs Junk % — Bubble View",
-            size_max=60,
-        )
-        fig2.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        fig2, sec2 = cached_section("Lead Intelligence", "Volume vs Junk Bubble", _build_junk_bubble, sq)
         st.plotly_chart(fig2, use_container_width=True)
 
         with st.expander("📄 Raw Source Quality Table"):
-            display_rows = [
-                {"Source": src, "Total Leads": m["total_leads"], "In Pipeline": m["in_pipeline"],
-                 "Junk / Unqualified": m["junk_or_unqualified"], "Junk %": f"{m['junk_pct']}%"}
-                for src, m in sq.items()
-            ]
-            st.dataframe(pd.DataFrame(display_rows).sort_values("Total Leads", ascending=False),
-                         use_container_width=True)
+            st.dataframe(sec2["table"], use_container_width=True)
+
+    st.divider()
+    st.markdown("<div class='section-label'>Lead Cohorts — Time to First Deal</div>", unsafe_allow_html=True)
+    co_a, co_b, co_c, _ = st.columns([1, 1, 1, 1])
+    cohort_weeks = co_a.selectbox("Creation weeks", [8, 12, 26, 52], index=1, key="cohort_weeks")
+    cohort_all = load_lead_cohorts(cohort_weeks, None, None, data_version)
+    cohort_source = co_b.selectbox("Source", ["All"] + cohort_all.get("sources", []), key="cohort_source")
+    cohort_owner = co_c.selectbox("Owner", ["All"] + cohort_all.get("owners", []), key="cohort_owner")
+    source_arg = None if cohort_source == "All" else cohort_source
+    owner_arg = None if cohort_owner == "All" else cohort_owner
+    cohorts = (cohort_all if source_arg is None and owner_arg is None
+               else load_lead_cohorts(cohort_weeks, source_arg, owner_arg, data_version)).get("cohorts", [])
+    if cohorts:
+        fig, sec = cached_section("Lead Intelligence", f"Lead Cohorts {cohort_weeks}/{cohort_source}/{cohort_owner}",
+                                  _build_lead_cohorts, cohorts)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown(sec["insight"], unsafe_allow_html=True)
+    else:
+        st.info("No lead cohorts yet. Run `python -m jobs.build_lead_cohorts` once; syncs keep them current.")
+
+    st.divider()
+    st.markdown("<div class='section-label'>Likely Junk Leads (Model Score, Last 7 Days)</div>", unsafe_allow_html=True)
+    likely_junk = load_likely_junk(7, data_version)
+    if not likely_junk.get("scored"):
+        st.info("No scored leads yet. Train the model with `python -m jobs.train_lead_scorer --rescore`.")
+    elif not likely_junk.get("likely_junk"):
+        st.info(f"None of the {likely_junk['scored']} leads created this week score as likely junk.")
+    else:
+        fig, sec = cached_section("Lead Intelligence", "Likely Junk", _build_likely_junk, likely_junk)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown(sec["insight"], unsafe_allow_html=True)
+        with st.expander("📄 Highest-Scoring Unworked Leads"):
+            st.dataframe(sec["table"], use_container_width=True)
+
+    lead_fields = d["promoted"].get("Leads", [])
+    if lead_fields:
+        st.divider()
+        st.markdown("<div class='section-label'>Custom Attribute Breakdown</div>", unsafe_allow_html=True)
+        cf_col, _ = st.columns([1, 3])
+        lead_field = cf_col.selectbox("Slice leads by", lead_fields, key="lead_custom_field")
+        breakdown = load_custom_breakdown("Leads", lead_field, data_version)
+        if breakdown:
+            fig, sec = cached_section("Lead Intelligence", f"By {lead_field}", _build_custom_leads, lead_field, breakdown)
+            st.plotly_chart(fig, use_container_width=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # TAB 3 — DEAL PIPELINE
@@ -528,85 +1089,99 @@ with tab3:
 
     with col_a:
         if deal_stages:
-            df_stages = pd.DataFrame([
-                {"Stage": s, "Deals": m["count"], "Value (₹)": round(m["value"])}
-                for s, m in deal_stages.items()
-            ]).sort_values("Deals", ascending=True)
-            fig = px.bar(df_stages, x="Deals", y="Stage", orientation="h",
-                         title="Deal Count by Stage",
-                         color="Deals", color_continuous_scale="Purples")
-            fig.update_coloraxes(showscale=False)
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Deal Pipeline", "Deal Count by Stage", _build_deal_count_by_stage, deal_stages)
             st.plotly_chart(fig, use_container_width=True)
-            top_stage = max(deal_stages, key=lambda s: deal_stages[s]["count"])
-            st.markdown(
-                f"<div class='insight-card'><b>{top_stage}</b> has the highest deal concentration "
-                f"({deal_stages[top_stage]['count']} deals). If this is an early stage, it indicates strong top-of-funnel pipeline.</div>",
-                unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
 
     with col_b:
         if deal_stages:
-            df_val = pd.DataFrame([
-                {"Stage": s, "Value (₹)": round(m["value"])}
-                for s, m in deal_stages.items()
-            ]).sort_values("Value (₹)", ascending=True)
-            fig = px.bar(df_val, x="Value (₹)", y="Stage", orientation="h",
-                         title="Pipeline ₹ Value by Stage",
-                         color="Value (₹)", color_continuous_scale="Greens")
-            fig.update_coloraxes(showscale=False)
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sec = cached_section("Deal Pipeline", "Value by Stage", _build_value_by_stage, deal_stages)
             st.plotly_chart(fig, use_container_width=True)
-            top_val_stage = max(deal_stages, key=lambda s: deal_stages[s]["value"])
-            st.markdown(
-                f"<div class='insight-card'>The highest ₹ concentration is at <b>{top_val_stage}</b> "
-                f"(₹{deal_stages[top_val_stage]['value']:,.0f}). Prioritise closing deals in this stage first.</div>",
-                unsafe_allow_html=True)
+            st.markdown(sec["insight"], unsafe_allow_html=True)
 
     st.divider()
     st.markdown("<div class='section-label'>Sales Rep Performance</div>", unsafe_allow_html=True)
 
     deal_owners = d["deal_by_owner"]
     if deal_owners:
-        df_owner = pd.DataFrame([
-            {"Sales Rep": o, "Open Pipeline (₹)": round(m["open_value"]),
-             "Won Revenue (₹)": round(m["won_value"]), "Total Deals": m["deal_count"]}
-            for o, m in deal_owners.items()
-        ]).sort_values("Open Pipeline (₹)", ascending=False)
-
-        fig = px.bar(
-            df_owner.melt(id_vars="Sales Rep", value_vars=["Open Pipeline (₹)", "Won Revenue (₹)"],
-                          var_name="Category", value_name="Value (₹)"),
-            x="Sales Rep", y="Value (₹)", color="Category", barmode="group",
-            title="Deal Value by Rep — Open Pipeline vs Won Revenue",
-            color_discrete_map={"Open Pipeline (₹)": "#6366F1", "Won Revenue (₹)": "#10B981"}
-        )
-        fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+        fig, sec = cached_section("Deal Pipeline", "Rep Performance", _build_rep_performance, deal_owners)
         st.plotly_chart(fig, use_container_width=True)
-
-        top_rep = df_owner.iloc[0]
-        st.markdown(
-            f"<div class='insight-card'><b>{top_rep['Sales Rep']}</b> holds the largest open pipeline "
-            f"(₹{top_rep['Open Pipeline (₹)']:,}). Reps with high open pipeline but low won revenue may need "
-            f"coaching on closing techniques.</div>", unsafe_allow_html=True)
+        st.markdown(sec["insight"], unsafe_allow_html=True)
 
         with st.expander("📄 Raw Rep Performance Table"):
-            st.dataframe(df_owner, use_container_width=True)
+            st.dataframe(sec["table"], use_container_width=True)
+
+    deal_fields = d["promoted"].get("Deals", [])
+    if deal_fields:
+        st.divider()
+        st.markdown("<div class='section-label'>Custom Attribute Breakdown</div>", unsafe_allow_html=True)
+        cf_col, _ = st.columns([1, 3])
+        deal_field = cf_col.selectbox("Slice deals by", deal_fields, key="deal_custom_field")
+        breakdown = load_custom_breakdown("Deals", deal_field, data_version)
+        if breakdown:
+            fig, sec = cached_section("Deal Pipeline", f"By {deal_field}", _build_custom_deals, deal_field, breakdown)
+            st.plotly_chart(fig, use_container_width=True)
+            with st.expander(f"📄 Raw {deal_field.replace('_', ' ')} Table"):
+                st.dataframe(sec["table"], use_container_width=True)
+
+    st.divider()
+    st.markdown("<div class='section-label'>Deal Velocity & Stage Conversion</div>", unsafe_allow_html=True)
+
+    time_in_stage = d["time_in_stage"]
+    conversion = d["conversion"]
+    if time_in_stage or conversion.get("stages"):
+        col_a, col_b = st.columns(2)
+
+        with col_a:
+            if time_in_stage:
+                fig, sec = cached_section("Deal Pipeline", "Time in Stage", _build_time_in_stage, time_in_stage)
+                st.plotly_chart(fig, use_container_width=True)
+                st.markdown(sec["insight"], unsafe_allow_html=True)
+
+        with col_b:
+            if conversion.get("stages"):
+                fig, sec = cached_section("Deal Pipeline", "Stage Conversion", _build_stage_conversion, conversion)
+                st.plotly_chart(fig, use_container_width=True)
+                with st.expander("📄 Most Common Stage Moves"):
+                    st.dataframe(sec["table"], use_container_width=True)
+
+        owner_velocity = d["owner_velocity"]
+        if owner_velocity:
+            with st.expander("📄 Rep Velocity Table"):
+                st.dataframe(sorted([
+                    {"Sales Rep": o, "Won Deals": m["won_deals"], "Avg Days to Win": m["avg_days_to_win"],
+                     "Stage Moves": m["stage_moves"]}
+                    for o, m in owner_velocity.items()
+                ], key=lambda r: r["Won Deals"], reverse=True), use_container_width=True)
+    else:
+        st.info("No stage history yet. Transitions are recorded from the next sync onwards.")
+
+    st.divider()
+    st.markdown("<div class='section-label'>Revenue Forecast (Monte Carlo)</div>", unsafe_allow_html=True)
+
+    fc = load_forecast(data_version)
+    if fc["forecast_deals"]:
+        fig, sec = cached_section("Deal Pipeline", "Revenue Forecast", _build_revenue_forecast, fc)
+        st.plotly_chart(fig, use_container_width=True)
+        st.markdown(sec["insight"], unsafe_allow_html=True)
+        with st.expander("📄 Forecast by Sales Rep"):
+            st.dataframe(sec["table"], use_container_width=True)
+    else:
+        st.info("No open deals with a value and a closing date in the next few months.")
 
     st.divider()
     st.markdown("<div class='section-label'>Deals Closing in the Next 30 Days</div>", unsafe_allow_html=True)
 
     closing = d["closing_soon"]
-    if closing:
-        df_close = pd.DataFrame(closing)
-        df_close.rename(columns={
-            "deal_name": "Deal", "stage": "Stage",
-            "amount": "Amount (₹)", "owner": "Owner", "closed_time": "Close Date"
-        }, inplace=True)
-        df_close["Amount (₹)"] = df_close["Amount (₹)"].apply(lambda x: f"₹{x:,.0f}" if x else "₹0")
+    if closing["rows"]:
+        _, sec = cached_section("Deal Pipeline", "Closing Soon", _build_closing_soon, closing["rows"])
         st.markdown(
-            f"<div class='warning-card'>⏰ <b>{len(closing)} deal(s)</b> are closing within 30 days. "
+            f"<div class='warning-card'>⏰ <b>{closing['total']:,} deal(s)</b> are closing within 30 days. "
             f"These require immediate attention from the assigned reps.</div>", unsafe_allow_html=True)
-        st.dataframe(df_close, use_container_width=True)
+        st.dataframe(sec["table"], use_container_width=True)
+        if closing["has_more"]:
+            st.caption(f"Showing the {len(closing['rows'])} soonest — browse all of them in 🔎 Record Explorer "
+                       f"(Deals, Open only, Closed Time).")
     else:
         st.markdown("<div class='success-card'>✅ No open deals with a deadline in the next 30 days.</div>",
                     unsafe_allow_html=True)
@@ -636,23 +1211,42 @@ with tab4:
                 f"<b>{last_records:,}</b> records from Zoho CRM.</div>", unsafe_allow_html=True)
 
         with col_b:
-            df_sync = pd.DataFrame(sync_history)
-            df_sync["sync_time"] = df_sync["sync_time"].str[:16].str.replace("T", " ")
-            df_sync.rename(columns={"sync_time": "Timestamp", "records_fetched": "Records", "status": "Status"}, inplace=True)
-            fig = px.bar(df_sync, x="Timestamp", y="Records",
-                         title="Records Synced Per Run",
-                         color="Records", color_continuous_scale="Blues")
-            fig.update_coloraxes(showscale=False)
-            fig.update_xaxes(tickangle=45)
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(t=40, b=10))
+            fig, sync_sec = cached_section("System Health", "Sync History", _build_sync_history, sync_history)
             st.plotly_chart(fig, use_container_width=True)
 
         st.divider()
         st.markdown("<div class='section-label'>Last 10 Sync Logs</div>", unsafe_allow_html=True)
-        st.dataframe(df_sync[["Timestamp", "Records", "Status"]], use_container_width=True)
+        st.dataframe(sync_sec["table"], use_container_width=True)
     else:
         st.info("No sync logs found. Run `run_daily_sync.py` to generate logs.")
 
+    st.divider()
+    st.markdown("<div class='section-label'>Pipeline Stage Timings</div>", unsafe_allow_html=True)
+
+    stage_metrics = d["stage_metrics"]
+    if stage_metrics:
+        col_a, col_b = st.columns(2)
+
+        with col_a:
+            fig, sec = cached_section("System Health", "Stage Timings", _build_stage_timings, stage_metrics)
+            st.plotly_chart(fig, use_container_width=True)
+
+        with col_b:
+            fig_tp, _ = cached_section("System Health", "Stage Throughput", _build_stage_throughput, stage_metrics)
+            st.plotly_chart(fig_tp, use_container_width=True)
+
+        st.markdown(sec["insight"], unsafe_allow_html=True)
+
+        with st.expander("📄 Raw Stage Metrics"):
+            st.dataframe(sec["table"], use_container_width=True)
+    else:
+        st.info("No stage metrics yet. They are recorded on the next `run_daily_sync.py` run.")
+
+    st.divider()
+    st.markdown("<div class='section-label'>Dashboard Render Profile</div>", unsafe_allow_html=True)
+    # Filled at the very end of the script, once every tab's sections have been timed
+    profile_slot = st.container()
+
     st.divider()
     st.markdown("<div class='section-label'>Connected Data Sources</div>", unsafe_allow_html=True)
     src_col1, src_col2, src_col3, src_col4 = st.columns(4)
@@ -661,6 +1255,130 @@ with tab4:
     src_col3.success("✅ crm_contacts")
     src_col4.success("✅ crm_accounts")
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# TAB 5 — RECORD EXPLORER
+# ═══════════════════════════════════════════════════════════════════════════════
+EXPLORER_PAGE_SIZE = 50
+EXPLORER_SORTS = {
+    "deals": {"Closed Time": "closed_time", "Created Time": "created_time", "Modified Time": "modified_time",
+              "Amount": "amount", "Deal Name": "deal_name", "Owner": "owner", "Stage": "stage"},
+    "leads": {"Created Time": "created_time", "Modified Time": "modified_time", "Annual Revenue": "annual_revenue",
+              "Name": "full_name", "Owner": "owner", "Status": "lead_status"},
+}
+EXPLORER_DATE_FIELDS = {
+    "deals": {"Created Time": "created_time", "Closed Time": "closed_time", "Modified Time": "modified_time"},
+    "leads": {"Created Time": "created_time", "Modified Time": "modified_time"},
+}
+
+@st.cache_data(ttl=1800, show_spinner=False)
+def load_explorer_page(data_version, cursor, **query):
+    return database_client.explore_records(cursor=cursor, **query)
+
+def _explorer_next(cursor):
+    st.session_state["exp_cursors"].append(cursor)
+
+def _explorer_prev():
+    st.session_state["exp_cursors"].pop()
+
+with tab5:
+    st.markdown("<div class='section-label'>Browse Raw CRM Records</div>", unsafe_allow_html=True)
+
+    f1, f2, f3, f4 = st.columns(4)
+    module = f1.radio("Module", ["Deals", "Leads"], horizontal=True).lower()
+    is_deals = module == "deals"
+    owners  = sorted(d["deal_by_owner"] if is_deals else d["owner_leads"])
+    stages  = sorted(d["deal_stages"] if is_deals else d["lead_statuses"])
+    sources = sorted(d["source_quality"])
+    owner  = f2.selectbox("Owner", ["All"] + owners)
+    stage  = f3.selectbox("Stage" if is_deals else "Status", ["All"] + stages)
+    source = f4.selectbox("Source", ["All"] + sources)
+
+    g1, g2, g3, g4 = st.columns(4)
+    date_field = g1.selectbox("Date Field", list(EXPLORER_DATE_FIELDS[module]))
+    date_range = g2.date_input("Date Range", value=(), format="YYYY-MM-DD")
+    sort_label = g3.selectbox("Sort By", list(EXPLORER_SORTS[module]))
+    with g4:
+        sort_desc = st.toggle("Descending", value=True)
+        open_only = st.toggle("Open deals only", value=False, disabled=not is_deals)
+
+    # Any raw Zoho attribute can be matched via JSONB containment; promoted fields are offered first
+    h1, h2, _ = st.columns([1, 1, 2])
+    custom_field = h1.text_input("Zoho Field", placeholder=", ".join(d["promoted"].get(module.title(), [])) or "e.g. City",
+                                 help="API name of any Zoho field, including custom ones. Nested: Product.name")
+    custom_value = h2.text_input("Equals", disabled=not custom_field)
+    raw_filter = None
+    if custom_field and custom_value:
+        try:
+            value = json.loads(custom_value)          # numbers / booleans
+        except ValueError:
+            value = custom_value
+        for part in reversed(custom_field.strip().split(".")):
+            value = {part: value}
+        raw_filter = value
+
+    query = {
+        "module": module,
+        "sort_by": EXPLORER_SORTS[module][sort_label],
+        "sort_desc": sort_desc,
+        "page_size": EXPLORER_PAGE_SIZE,
+        "owner": None if owner == "All" else owner,
+        "stage": None if stage == "All" else stage,
+        "source": None if source == "All" else source,
+        "date_column": EXPLORER_DATE_FIELDS[module][date_field],
+        "date_from": date_range[0].isoformat() if len(date_range) == 2 else None,
+        "date_to": date_range[1].isoformat() if len(date_range) == 2 else None,
+        "open_only": open_only and is_deals,
+        "raw_filter": raw_filter,
+    }
+
+    # Any change to the filters or sort starts again from page one
+    query_key = repr(sorted(query.items()))
+    if st.session_state.get("exp_query") != query_key:
+        st.session_state["exp_query"] = query_key
+        st.session_state["exp_cursors"] = [None]
+        st.session_state["exp_total"] = 0
+
+    cursors = st.session_state["exp_cursors"]
+    with prof.section("Record Explorer", "Page", "load") as blk:
+        page = load_explorer_page(data_version, cursors[-1], **query)
+        blk.payload = page
+    # The RPC only counts matches on the first page
+    if page.get("total") is not None:
+        st.session_state["exp_total"] = page["total"]
+    total = st.session_state["exp_total"]
+
+    rows = page["rows"]
+    if rows:
+        first = (len(cursors) - 1) * EXPLORER_PAGE_SIZE + 1
+        st.caption(f"Rows {first:,}–{first + len(rows) - 1:,} of {total:,} matching {module}")
+        st.dataframe(pd.DataFrame(rows).drop(columns=["sort_key"]), use_container_width=True, hide_index=True)
+    else:
+        st.info("No records match these filters.")
+
+    n1, n2, _ = st.columns([1, 1, 6])
+    n1.button("◀ Previous", use_container_width=True, disabled=len(cursors) == 1, on_click=_explorer_prev)
+    n2.button("Next ▶", use_container_width=True, disabled=not page["has_more"],
+              on_click=_explorer_next, args=(page["next_cursor"],))
+
 # ─── Footer ──────────────────────────────────────────────────────────────────
 st.divider()
 st.caption("Powered by Zoho CRM · Supabase Cloud PostgreSQL · Streamlit · Llama 3.2 (Local AI)")
+
+# ─── Render Profile Output ───────────────────────────────────────────────────
+if rerun_profile:
+    st.session_state["last_pstats_path"] = rerun_profile.stop()
+    st.toast(f"cProfile stats saved to {st.session_state['last_pstats_path']}")
+
+with profile_slot:
+    if prof.enabled and prof.rows:
+        df_prof = pd.DataFrame(prof.rows).sort_values("Time (ms)", ascending=False)
+        slowest = df_prof.iloc[0]
+        st.markdown(
+            f"<div class='insight-card'>This rerun spent <b>{prof.total_ms():,.0f} ms</b> in profiled sections. "
+            f"Slowest: <b>{slowest['Tab']} → {slowest['Section']}</b> ({slowest['Phase']}, {slowest['Time (ms)']:,.0f} ms).</div>",
+            unsafe_allow_html=True)
+        st.dataframe(df_prof, use_container_width=True, hide_index=True)
+    else:
+        st.info("Enable ⏱️ Render Profiler in the sidebar (or set DASHBOARD_PROFILE=1) to time each section.")
+    if st.session_state.get("last_pstats_path"):
+        st.caption(f"Last cProfile dump: `{st.session_state['last_pstats_path']}` — inspect with `python -m pstats` or snakeviz.")
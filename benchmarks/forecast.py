@@ -0,0 +1,87 @@
+"""
+Latency and accuracy of the Monte Carlo pipeline forecast (core.forecast) on synthetic open deals.
+
+    python -m benchmarks.forecast                          # 30k open deals, 12 owners
+    python -m benchmarks.forecast --deals 100000 --owners 25
+
+No database is needed. For each size it times:
+  • pooled — the production path (top-variance deals drawn individually, the rest pooled)
+  • exact  — every deal drawn individually (`pooled=False`)
+and reports the largest relative P10/P50/P90 gap between them across every month and owner band,
+next to the gap between two exact runs with different seeds (the Monte Carlo noise floor).
+"""
+import time
+import argparse
+from datetime import date
+
+import numpy as np
+
+from core import forecast
+
+STAGES = ["Qualification", "Needs Analysis", "Id. Decision Makers", "Proposal", "Negotiation"]
+STAGE_OUTCOMES = {
+    "Qualification": {"closed": 400, "won": 40},
+    "Needs Analysis": {"closed": 250, "won": 50},
+    "Proposal": {"closed": 200, "won": 80},
+    "Negotiation": {"closed": 100, "won": 60},
+}
+
+def synthetic_inputs(deals: int, owners: int, today: date, seed: int = 7) -> dict:
+    """get_forecast_inputs-shaped payload: log-normal amounts, close months around the horizon, some undated."""
+    rng = np.random.default_rng(seed)
+    months = forecast.horizon_months(date(today.year - 1, today.month, 1), 12 + forecast.DEFAULT_HORIZON_MONTHS + 3)
+    close = rng.choice(np.array(months + [None] * 3, dtype=object), deals)
+    return {
+        "deals": {
+            "stage": list(rng.choice(STAGES, deals)),
+            "amount": [float(a) for a in np.round(rng.lognormal(12, 1.2, deals))],
+            "close_month": list(close),
+            "owner": [f"Rep {i}" for i in rng.integers(0, owners, deals)],
+        },
+        "stage_outcomes": STAGE_OUTCOMES,
+        "won_count": 300,
+        "closed_count": 1000,
+    }
+
+def _worst_gap(a: dict, b: dict) -> float:
+    """Largest relative difference between two forecasts' month and owner bands."""
+    worst = 0.0
+    for section in ("months", "owners"):
+        for key, band in b[section].items():
+            for q in ("p10", "p50", "p90"):
+                worst = max(worst, abs(a[section][key][q] - band[q]) / max(band[q], 1))
+    return worst
+
+def run(deals: int, owners: int, scenarios: int) -> dict:
+    today = date.today()
+    inputs = synthetic_inputs(deals, owners, today)
+    t0 = time.perf_counter()
+    pooled = forecast.simulate(inputs, scenarios=scenarios, today=today)
+    t1 = time.perf_counter()
+    exact = forecast.simulate(inputs, scenarios=scenarios, today=today, pooled=False, seed=1)
+    t2 = time.perf_counter()
+    exact_again = forecast.simulate(inputs, scenarios=scenarios, today=today, pooled=False, seed=2)
+    return {
+        "deals": deals, "owners": owners, "forecast_deals": pooled["forecast_deals"],
+        "individually_drawn": pooled["individually_drawn"],
+        "pooled_s": round(t1 - t0, 3), "exact_s": round(t2 - t1, 3),
+        "pooled_gap": round(_worst_gap(pooled, exact), 4), "noise_gap": round(_worst_gap(exact_again, exact), 4),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pooled vs exact Monte Carlo forecast: latency and band accuracy.")
+    parser.add_argument("--deals", type=int, nargs="+", default=[30_000])
+    parser.add_argument("--owners", type=int, default=12)
+    parser.add_argument("--scenarios", type=int, default=forecast.DEFAULT_SCENARIOS)
+    args = parser.parse_args(argv)
+
+    print(f"🎲 {args.scenarios:,} scenarios × {forecast.DEFAULT_HORIZON_MONTHS} months, {args.owners} owners")
+    print(f"\n{'deals':>9} {'in horizon':>11} {'drawn alone':>12} {'pooled s':>9} {'exact s':>8} "
+          f"{'max band gap':>13} {'MC noise':>9}")
+    for deals in args.deals:
+        r = run(deals, args.owners, args.scenarios)
+        print(f"{r['deals']:>9,} {r['forecast_deals']:>11,} {r['individually_drawn']:>12,} {r['pooled_s']:>9.2f} "
+              f"{r['exact_s']:>8.2f} {r['pooled_gap']:>13.2%} {r['noise_gap']:>9.2%}")
+
+if __name__ == "__main__":
+    main()
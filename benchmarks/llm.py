@@ -0,0 +1,245 @@
+"""
+Speed and format compliance of candidate briefing models on a corpus of stored AI payloads.
+
+    LLM_CORPUS_DIR=llm_corpus                                        # .env: the daily run keeps its payloads
+    python -m benchmarks.llm --export 2026-09-01                     # or rebuild past days from Supabase
+    python -m benchmarks.llm --models llama3.2,llama3.2:1b,qwen2.5:3b-instruct-q4_K_M
+    python -m benchmarks.llm --models llama3.2 --num-ctx 4096,8192   # same model, two context sizes
+    python -m benchmarks.llm --stub                                  # harness self-check, no Ollama needed
+
+Every corpus payload is sent through the same two prompts the daily briefing uses (dashboard report
+and WhatsApp Signals/Focus), once per model × context size. Speeds come from Ollama's own timings:
+prefill = prompt tokens / prompt_eval_duration, generation = output tokens / eval_duration.
+Peak memory is the largest footprint /api/ps reports for the loaded model (weights plus KV cache)
+during the run. Model loading is excluded by a warm-up call.
+
+A report is valid when it is one <DASHBOARD_REPORT> block with nothing outside it and the three
+section headings in order. A WhatsApp narrative is valid when the model itself wrote two SIGNAL and two
+FOCUS lines of at most 25 words each (no fallback from the anomalies needed) and the rendered message
+fits the template and WHATSAPP_MAX_CHARS. The table ends with the fastest variant whose outputs all passed.
+
+Payloads stored by the daily run (LLM_CORPUS_DIR) are exactly what the LLM saw. --export rebuilds past days
+the way the briefing backfill does, without the `revenue_forecast` and `likely_junk_leads` sections, so its
+prompts are shorter than live ones and skip the rules for those sections; prefer stored payloads for timings.
+"""
+import os
+import re
+import glob
+import contextlib
+import json
+import logging
+import time
+import argparse
+import statistics
+
+import httpx
+from langchain_ollama import ChatOllama
+
+from ai_agents import analyst_agent
+from ai_agents.whatsapp_report import render_whatsapp_report, WHATSAPP_MAX_CHARS, LINES_PER_SECTION
+from benchmarks.stubs import StubOllamaServer
+from core import fast_json
+from core.config import Config
+
+DEFAULT_CORPUS_DIR = Config.LLM_CORPUS_DIR or "llm_corpus"
+DEFAULT_MODELS = "llama3.2"
+REPORT_SECTIONS = ["### 1. The Daily Pulse", "### 2. Deep Dive Diagnostics", "### 3. Immediate Execution"]
+NARRATIVE_MAX_WORDS = 25
+
+# ─── Corpus ──────────────────────────────────────────────────
+
+def export_corpus(start: str, end: str, directory: str) -> int:
+    """
+    Writes one <report_date>.json per day in [start, end] from the batched range RPC, as the briefing backfill
+    builds them. Unlike live payloads they carry no `revenue_forecast` or `likely_junk_leads` section.
+    """
+    from datetime import date, timedelta
+    from jobs.backfill_briefings import load_payloads
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    payloads = load_payloads(first, last, {(first + timedelta(days=i)).isoformat() for i in range((last - first).days + 1)})
+    os.makedirs(directory, exist_ok=True)
+    for report_date, payload in payloads.items():
+        with open(os.path.join(directory, f"{report_date}.json"), "wb") as f:
+            f.write(fast_json.dumps(payload, indent=True))
+    return len(payloads)
+
+def load_corpus(directory: str, limit: int = None) -> list:
+    """[(name, payload)] for every *.json in the corpus directory, oldest report date first."""
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json")))[:limit]:
+        with open(path, "rb") as f:
+            corpus.append((os.path.splitext(os.path.basename(path))[0], fast_json.loads(f.read())))
+    return corpus
+
+# ─── Format checks ───────────────────────────────────────────
+
+def check_report(text: str) -> list:
+    """Problems with a dashboard report's format; an empty list means valid."""
+    text = (text or "").strip()
+    problems = []
+    opens = len(re.findall(r"<DASHBOARD_REPORT>", text, re.IGNORECASE))
+    closes = len(re.findall(r"</DASHBOARD_REPORT>", text, re.IGNORECASE))
+    if opens != 1 or closes != 1:
+        problems.append(f"{opens} opening / {closes} closing tags")
+    elif not re.fullmatch(r"<DASHBOARD_REPORT>.*</DASHBOARD_REPORT>", text, re.DOTALL | re.IGNORECASE):
+        problems.append("text outside the tags")
+    body = analyst_agent.extract_dashboard_report(text)
+    positions = [body.find(heading) for heading in REPORT_SECTIONS]
+    if -1 in positions:
+        problems.append(f"missing {REPORT_SECTIONS[positions.index(-1)]!r}")
+    elif positions != sorted(positions):
+        problems.append("sections out of order")
+    return problems
+
+def check_whatsapp(payload: dict, text: str) -> list:
+    """Problems with the model's Signals/Focus lines and the message they render into."""
+    narrative = analyst_agent._parse_labelled_lines(text)
+    problems = []
+    for section, label in (("signals", "SIGNAL"), ("focus", "FOCUS")):
+        lines = narrative[section]
+        if len(lines) != LINES_PER_SECTION:
+            problems.append(f"{len(lines)} {label} lines")
+        if any(len(line.split()) > NARRATIVE_MAX_WORDS for line in lines):
+            problems.append(f"{label} line over {NARRATIVE_MAX_WORDS} words")
+
+    message = render_whatsapp_report(payload, narrative)
+    if not message.startswith("📊 Daily CRM Summary"):
+        problems.append("header missing")
+    if len(message) > WHATSAPP_MAX_CHARS:
+        problems.append(f"{len(message)} chars")
+    signals, _, focus = message.partition("\n\n👉 Focus:")
+    if "\n\n⚠️ Signals:" not in signals or signals.count("\n– ") != LINES_PER_SECTION or focus.count("\n– ") != LINES_PER_SECTION:
+        problems.append("template sections malformed")
+    return problems
+
+# ─── Runs ────────────────────────────────────────────────────
+
+def _loaded_model_bytes(client: httpx.Client, model: str) -> tuple:
+    """(size, size_vram) of the model as /api/ps reports it, or (None, None) if the server doesn't say."""
+    try:
+        models = client.get("/api/ps").raise_for_status().json().get("models", [])
+    except (httpx.HTTPError, ValueError):
+        return None, None
+    for m in models:
+        if m.get("name") == model or m.get("model") == model or m.get("name", "").split(":")[0] == model:
+            return m.get("size"), m.get("size_vram")
+    return None, None
+
+def _invoke(llm: ChatOllama, prompt: str) -> dict:
+    t0 = time.perf_counter()
+    response = llm.invoke(prompt)
+    meta = response.response_metadata or {}
+    return {"latency_s": time.perf_counter() - t0, "text": response.content or "",
+            "prompt_tokens": meta.get("prompt_eval_count", 0), "prefill_ns": meta.get("prompt_eval_duration", 0),
+            "output_tokens": meta.get("eval_count", 0), "generate_ns": meta.get("eval_duration", 0)}
+
+def run_variant(base_url: str, model: str, num_ctx: int, corpus: list, temperature: float) -> dict:
+    """Replays the corpus through one model / context size and returns its summary row."""
+    common = {"model": model, "temperature": temperature, "num_ctx": num_ctx, "base_url": base_url, "keep_alive": "5m"}
+    report_llm = ChatOllama(**common)
+    narrative_llm = ChatOllama(**common, num_predict=analyst_agent.NARRATIVE_NUM_PREDICT)
+    ps = httpx.Client(base_url=base_url, timeout=10)
+
+    t0 = time.perf_counter()
+    ChatOllama(**common, num_predict=1).invoke("ok")
+    load_s = time.perf_counter() - t0
+
+    calls, report_latency, narrative_latency, failures = [], [], [], []
+    peak_bytes, peak_vram = None, None
+    for name, payload in corpus:
+        report = _invoke(report_llm, analyst_agent._construct_data_scientist_prompt(payload))
+        narrative = _invoke(narrative_llm, analyst_agent._construct_whatsapp_narrative_prompt(payload))
+        calls += [report, narrative]
+        report_latency.append(report["latency_s"])
+        narrative_latency.append(narrative["latency_s"])
+        for kind, problems in (("report", check_report(report["text"])),
+                               ("whatsapp", check_whatsapp(payload, narrative["text"]))):
+            if problems:
+                failures.append({"payload": name, "output": kind, "problems": problems})
+        size, vram = _loaded_model_bytes(ps, model)
+        if size is not None and (peak_bytes is None or size > peak_bytes):
+            peak_bytes, peak_vram = size, vram
+    ps.close()
+
+    prefill_ns = sum(c["prefill_ns"] for c in calls)
+    generate_ns = sum(c["generate_ns"] for c in calls)
+    failed = {(f["payload"], f["output"]) for f in failures}
+    return {
+        "variant": model if num_ctx is None else f"{model} @ {num_ctx}",
+        "model": model, "num_ctx": num_ctx, "payloads": len(corpus), "load_s": load_s,
+        "prefill_tok_s": sum(c["prompt_tokens"] for c in calls) / (prefill_ns / 1e9) if prefill_ns else None,
+        "generate_tok_s": sum(c["output_tokens"] for c in calls) / (generate_ns / 1e9) if generate_ns else None,
+        "report_p50_s": statistics.median(report_latency), "report_max_s": max(report_latency),
+        "whatsapp_p50_s": statistics.median(narrative_latency),
+        "total_s": sum(report_latency) + sum(narrative_latency),
+        "peak_mem_gb": peak_bytes / 1e9 if peak_bytes is not None else None,
+        "gpu_share": peak_vram / peak_bytes if peak_bytes else None,
+        "report_valid": sum((name, "report") not in failed for name, _ in corpus) / len(corpus),
+        "whatsapp_valid": sum((name, "whatsapp") not in failed for name, _ in corpus) / len(corpus),
+        "failures": failures,
+    }
+
+def pick_fastest_valid(rows: list):
+    """The variant with the lowest total latency among those whose every report and narrative passed."""
+    valid = [r for r in rows if r["report_valid"] == 1 and r["whatsapp_valid"] == 1]
+    return min(valid, key=lambda r: r["total_s"]) if valid else None
+
+def _print_table(rows: list):
+    def fmt(value, width, spec):
+        return f"{'–':>{width}}" if value is None else f"{value:>{width}{spec}}"
+    print(f"{'variant':<34} {'prefill t/s':>11} {'gen t/s':>8} {'load s':>7} {'report p50':>10} {'max':>6} "
+          f"{'wa p50':>7} {'peak GB':>8} {'GPU':>5} {'report ok':>9} {'wa ok':>6}")
+    for r in rows:
+        print(f"{r['variant']:<34} {fmt(r['prefill_tok_s'], 11, ',.0f')} {fmt(r['generate_tok_s'], 8, ',.1f')} "
+              f"{r['load_s']:>7.1f} {r['report_p50_s']:>10.2f} {r['report_max_s']:>6.1f} {r['whatsapp_p50_s']:>7.2f} "
+              f"{fmt(r['peak_mem_gb'], 8, '.2f')} {fmt(r['gpu_share'], 5, '.0%')} "
+              f"{r['report_valid']:>9.0%} {r['whatsapp_valid']:>6.0%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Ollama models on speed and briefing format compliance.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help="Directory of stored payloads (*.json).")
+    parser.add_argument("--export", metavar="START",
+                        help="First report date (YYYY-MM-DD) to rebuild from Supabase, then exit (no forecast / likely-junk sections).")
+    parser.add_argument("--end", help="Last report date for --export (default: yesterday).")
+    parser.add_argument("--limit", type=int, help="Use only the first N payloads.")
+    parser.add_argument("--models", default=DEFAULT_MODELS, help="Comma-separated Ollama model tags (quantizations are tags too).")
+    parser.add_argument("--num-ctx", default="", help="Comma-separated context sizes to try per model (default: Ollama's).")
+    parser.add_argument("--temperature", type=float, default=0.3)
+    parser.add_argument("--stub", action="store_true", help="Run against the in-process stub Ollama instead of a real server.")
+    parser.add_argument("--output", default="llm_bench.json", help="Where to write the rows and every format failure.")
+    args = parser.parse_args(argv)
+    # analyst_agent configures INFO logging; one httpx line per request would bury the progress output
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.export:
+        from datetime import date, timedelta
+        end = args.end or (date.today() - timedelta(days=1)).isoformat()
+        print(f"📥 Stored {export_corpus(args.export, end, args.corpus)} payload(s) in {args.corpus}/")
+        return
+
+    corpus = load_corpus(args.corpus, args.limit)
+    if not corpus:
+        raise SystemExit(f"❌ No payloads in {args.corpus}/ — store some first with --export YYYY-MM-DD.")
+    models = [m.strip() for m in args.models.split(",") if m.strip()]
+    contexts = [int(n) for n in args.num_ctx.split(",") if n.strip()] or [None]
+
+    host = os.environ.get("OLLAMA_HOST", "127.0.0.1:11434")
+    rows = []
+    with (StubOllamaServer() if args.stub else contextlib.nullcontext()) as stub:
+        base_url = stub.url if stub else (host if "://" in host else f"http://{host}")
+        for model in models:
+            for num_ctx in contexts:
+                print(f"🧠 {model}{'' if num_ctx is None else f' @ num_ctx={num_ctx}'}: {len(corpus)} payload(s)...")
+                rows.append(run_variant(base_url, model, num_ctx, corpus, args.temperature))
+
+    print()
+    _print_table(rows)
+    best = pick_fastest_valid(rows)
+    print(f"\n🏁 Fastest with every output valid: {best['variant']} ({best['total_s']:.1f}s for {best['payloads']} payload(s))"
+          if best else "\n⚠️ No variant produced valid output for every payload; see failures in the JSON output.")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"corpus": args.corpus, "payloads": len(corpus), "rows": rows}, f, ensure_ascii=False, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Local event generator for the Zoho push receiver (jobs/notification_receiver.py).
+
+    python -m benchmarks.notification_events                        # self-contained run against the mock Zoho API
+    python -m benchmarks.notification_events --events 2000 --rate 200 --window-seconds 2
+    python -m benchmarks.notification_events --target http://127.0.0.1:8765/zoho/notify --token $ZOHO_NOTIFY_TOKEN
+
+Without --target, an in-process NotificationReceiver fetches each coalesced batch by ID from
+MockZohoServer and only counts the records (no Supabase needed), then reports how many Zoho
+requests the coalescing window saved and the event-to-fetched latency. With --target, the
+same Zoho-shaped events are POSTed to an already running receiver.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+import requests
+
+from benchmarks.stubs import MockZohoServer
+from benchmarks.synthetic_data import SIZES, MODULE_RATIOS, MODULE_PREFIX, module_count
+
+# Share of the dataset that receives edits; real CRMs concentrate activity on recent records
+HOT_FRACTION = 0.02
+OPERATION_WEIGHTS = {"update": 0.7, "insert": 0.25, "delete": 0.05}
+
+def generate_events(size: str, count: int, seed: int = 42, token: str = None, channel_id: str = "1000000068001"):
+    """Zoho Notification API payloads: 1–3 record IDs each, drawn from a small hot set so edits repeat."""
+    rng = random.Random(seed)
+    modules = list(MODULE_RATIOS)
+    events = []
+    for _ in range(count):
+        module = rng.choices(modules, [MODULE_RATIOS[m] for m in modules])[0]
+        hot = max(1, int(module_count(size, module) * HOT_FRACTION))
+        ids = [f"{MODULE_PREFIX[module]}{rng.randrange(hot):012d}" for _ in range(rng.randint(1, 3))]
+        events.append({
+            "server_time": int(time.time() * 1000),
+            "module": module,
+            "resource_uri": f"https://www.zohoapis.in/crm/v2/{module}",
+            "ids": ids,
+            "affected_fields": [],
+            "operation": rng.choices(list(OPERATION_WEIGHTS), list(OPERATION_WEIGHTS.values()))[0],
+            "channel_id": channel_id,
+            "token": token,
+        })
+    return events
+
+def post_events(url: str, events: list, rate: float):
+    """POSTs events at roughly `rate` per second; returns (accepted, rejected)."""
+    session = requests.Session()
+    accepted = rejected = 0
+    interval = 1 / rate if rate else 0
+    t0 = time.perf_counter()
+    for i, event in enumerate(events):
+        response = session.post(url, json=event)
+        accepted += response.status_code == 200
+        rejected += response.status_code != 200
+        delay = t0 + (i + 1) * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return accepted, rejected
+
+def run_self_contained(size: str, events: list, rate: float, window_seconds: float, token: str) -> dict:
+    from benchmarks.run import _configure_env
+    with MockZohoServer(size=size) as zoho:
+        # Supabase / Ollama are never touched: the flush below only fetches
+        _configure_env(zoho.url, "http://127.0.0.1:9", "http://127.0.0.1:9", "unused")
+        from services import zoho_client
+        from services.zoho_notifications import NotificationReceiver
+
+        access_token = zoho_client.get_access_token()
+        fetched = {"records": 0}
+
+        def flush(batch):
+            for module, ids in batch.items():
+                fetched["records"] += len(zoho_client.fetch_records_by_ids(access_token, module, ids))
+
+        requests_before = zoho.requests_served
+        receiver = NotificationReceiver(flush, zoho_client.SYNC_MODULES, window_seconds,
+                                        host="127.0.0.1", port=0, token=token)
+        t0 = time.perf_counter()
+        with receiver:
+            accepted, rejected = post_events(receiver.url, events, rate)
+        elapsed = time.perf_counter() - t0
+
+        stats = receiver.buffer.stats
+        lag = sorted(receiver.lag_ms)
+        return {
+            "events_posted": len(events),
+            "accepted": accepted,
+            "rejected": rejected,
+            "ids_queued": stats["ids"],
+            "duplicate_ids": stats["duplicates"],
+            "deletes": stats["deletes"],
+            "batches": stats["batches"],
+            "zoho_requests": zoho.requests_served - requests_before,
+            "zoho_requests_one_per_event": len(events) - sum(e["operation"] == "delete" for e in events),
+            "records_fetched": fetched["records"],
+            "lag_p50_ms": round(statistics.median(lag), 1) if lag else None,
+            "lag_p95_ms": round(lag[int(len(lag) * 0.95) - 1], 1) if lag else None,
+            "elapsed_s": round(elapsed, 2),
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate Zoho Notification API events for the push receiver.")
+    parser.add_argument("--size", choices=list(SIZES), default="10k")
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=100, help="Events per second.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--window-seconds", type=float, default=1.0, help="Coalescing window (self-contained mode).")
+    parser.add_argument("--target", help="URL of a running receiver; omit for the self-contained run.")
+    parser.add_argument("--token", default="bench-notify", help="Shared secret placed in every event.")
+    args = parser.parse_args(argv)
+
+    events = generate_events(args.size, args.events, args.seed, args.token)
+    if args.target:
+        accepted, rejected = post_events(args.target, events, args.rate)
+        print(f"📤 Posted {len(events)} events to {args.target}: {accepted} accepted, {rejected} rejected")
+        return 0 if not rejected else 1
+
+    report = run_self_contained(args.size, events, args.rate, args.window_seconds, args.token)
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
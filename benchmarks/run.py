@@ -0,0 +1,216 @@
+"""
+End-to-end benchmark runner: synthetic Zoho → real fetch/upsert code → local Postgres → RPCs → stub LLM.
+
+    python -m benchmarks.run --size 10k
+    python -m benchmarks.run --size 100k --repeat 5 --compare
+    python -m benchmarks.run --size 10k --save-baseline
+
+Requires the Supabase CLI local stack (`supabase start`); pass its service_role key via
+BENCH_SUPABASE_KEY. Zoho and Ollama are replaced by in-process HTTP stand-ins.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, date, timedelta
+
+from benchmarks import local_db
+from benchmarks.stubs import MockZohoServer, StubOllamaServer
+from benchmarks.synthetic_data import SIZES, MODULE_RATIOS, module_count
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+DEFAULT_TOLERANCE = 0.15
+
+# (result name, database_client getter, kwargs) — every analytics RPC the pipeline or dashboard calls
+ANALYTICS_RPCS = [
+    ("rpc.get_advanced_analytics", "get_advanced_analytics", {}),
+    ("rpc.get_overview_kpis", "get_overview_kpis", {}),
+    ("rpc.get_pipeline_period_stats", "get_pipeline_period_stats", {}),
+    ("rpc.get_lead_volume_trend", "get_lead_volume_trend", {"days": 30}),
+    ("rpc.get_lead_status_breakdown", "get_lead_status_breakdown", {}),
+    ("rpc.get_owner_lead_distribution", "get_owner_lead_distribution", {}),
+    ("rpc.get_deal_stage_breakdown", "get_deal_stage_breakdown", {}),
+    ("rpc.get_deal_value_by_owner", "get_deal_value_by_owner", {}),
+    ("rpc.get_deals_closing_soon", "get_deals_closing_soon", {"days": 30}),
+    ("rpc.get_won_vs_lost", "get_won_vs_lost", {}),
+    ("rpc.get_contact_and_account_breakdown", "get_contact_owner_distribution", {}),
+    ("rpc.get_source_quality_all_time", "get_source_quality_all_time", {}),
+    ("rpc.get_deal_time_in_stage", "get_deal_time_in_stage", {}),
+    ("rpc.get_deal_velocity_by_owner", "get_deal_velocity_by_owner", {}),
+    ("rpc.get_stage_conversion", "get_stage_conversion", {}),
+    ("rpc.explore_records.deals", "explore_records", {"module": "deals", "sort_by": "closed_time", "sort_desc": False}),
+    ("rpc.explore_records.leads", "explore_records", {"module": "leads", "owner": "Priya Nair"}),
+    ("rpc.get_advanced_analytics_range.365d", "get_advanced_analytics_range",
+     {"start_date": (date.today() - timedelta(days=364)).isoformat(), "end_date": date.today().isoformat()}),
+    ("rpc.get_time_series.leads_by_owner.all", "get_time_series", {"metric": "leads", "group_by": "owner"}),
+    ("rpc.get_time_series.won_value.365d", "get_time_series",
+     {"metric": "won_value", "start_date": (date.today() - timedelta(days=364)).isoformat()}),
+    ("rpc.get_forecast_inputs", "get_forecast_inputs", {}),
+    ("rpc.get_lead_cohorts.52w", "get_lead_cohorts", {"weeks": 52}),
+]
+
+def _configure_env(zoho_url: str, ollama_url: str, supabase_url: str, supabase_key: str):
+    """Points core.config at the local stand-ins. Must run before any `services` import."""
+    os.environ.update({
+        "ZOHO_CLIENT_ID": "bench",
+        "ZOHO_CLIENT_SECRET": "bench",
+        "ZOHO_REFRESH_TOKEN": "bench",
+        "ZOHO_ACCOUNTS_URL": zoho_url,
+        "ZOHO_API_URL": zoho_url,
+        "SUPABASE_URL": supabase_url,
+        "SUPABASE_KEY": supabase_key,
+        "TWILIO_ACCOUNT_SID": "ACbench",
+        "TWILIO_AUTH_TOKEN": "bench",
+        "TWILIO_WHATSAPP_NUMBER": "+10000000000",
+        "TARGET_WHATSAPP_NUMBER": "+10000000001",
+        "OLLAMA_HOST": ollama_url,
+    })
+    os.environ.pop("PROMETHEUS_TEXTFILE_PATH", None)
+
+def _time(fn, repeat: int, records: int = 0):
+    """Runs `fn` `repeat` times; returns (timing dict, last result)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - t0)
+    median = statistics.median(durations)
+    timing = {
+        "median_s": round(median, 4),
+        "min_s": round(min(durations), 4),
+        "max_s": round(max(durations), 4),
+        "runs": repeat,
+    }
+    if records:
+        timing["records"] = records
+        timing["records_per_s"] = round(records / median, 1) if median else None
+    return timing, result
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=local_db.REPO_ROOT, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(size: str, repeat: int, seed: int, zoho_latency_ms: int, db_url: str,
+                   supabase_url: str, supabase_key: str, skip_schema: bool = False) -> dict:
+    results = {}
+    with MockZohoServer(size=size, seed=seed, latency_ms=zoho_latency_ms) as zoho, StubOllamaServer() as llm:
+        _configure_env(zoho.url, llm.url, supabase_url, supabase_key)
+        if not skip_schema:
+            local_db.apply_schema(db_url)
+        local_db.reset_tables(db_url)
+
+        # Imported only now: these modules read Config at import time
+        from services import zoho_client, database_client, async_database_client
+        from jobs.run_daily_sync import build_ai_payload
+        from ai_agents.analyst_agent import get_executive_summary, get_whatsapp_narrative
+        from ai_agents.whatsapp_report import render_whatsapp_report
+
+        token = zoho_client.get_access_token()
+        for module in MODULE_RATIOS:
+            count = module_count(size, module)
+            timing, records = _time(lambda: zoho_client.fetch_incremental_module(token, module), repeat, count)
+            results[f"fetch_incremental_module.{module}"] = timing
+            timing, _ = _time(lambda: database_client.upsert_module_data(module, records), repeat, count)
+            results[f"upsert_module_data.{module}"] = timing
+            del records
+
+        local_db.analyze(db_url)
+
+        for name, getter, kwargs in ANALYTICS_RPCS:
+            fn = getattr(database_client, getter)
+            results[name], _ = _time(lambda: fn(**kwargs), repeat)
+
+        results["build_ai_payload"], payload = _time(build_ai_payload, repeat)
+        results["get_executive_summary (stub LLM)"], _ = _time(lambda: get_executive_summary(payload), repeat)
+        results["get_whatsapp_narrative (stub LLM)"], narrative = _time(lambda: get_whatsapp_narrative(payload), repeat)
+        results["render_whatsapp_report"], _ = _time(lambda: render_whatsapp_report(payload, narrative), repeat)
+        results["load_all_data"], _ = _time(async_database_client.fetch_dashboard_data, repeat)
+
+    return {
+        "meta": {
+            "size": size,
+            "records": {m: module_count(size, m) for m in MODULE_RATIOS},
+            "seed": seed,
+            "repeat": repeat,
+            "zoho_latency_ms": zoho_latency_ms,
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+def compare(current: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE):
+    """Returns one row per benchmark: (name, baseline_s, current_s, delta_pct, verdict)."""
+    rows = []
+    for name, cur in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            rows.append((name, None, cur["median_s"], None, "NEW"))
+            continue
+        delta = (cur["median_s"] - base["median_s"]) / base["median_s"] if base["median_s"] else 0.0
+        verdict = "REGRESSED" if delta > tolerance else ("IMPROVED" if delta < -tolerance else "ok")
+        rows.append((name, base["median_s"], cur["median_s"], delta * 100, verdict))
+    return rows
+
+def _print_comparison(rows):
+    print(f"\n{'Benchmark':<45} {'Baseline':>10} {'Current':>10} {'Delta':>9}  Verdict")
+    print("─" * 88)
+    for name, base, cur, delta, verdict in rows:
+        base_s = f"{base:.4f}" if base is not None else "—"
+        delta_s = f"{delta:+.1f}%" if delta is not None else "—"
+        print(f"{name:<45} {base_s:>10} {cur:>10.4f} {delta_s:>9}  {verdict}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end CRM pipeline benchmarks against local stand-ins.")
+    parser.add_argument("--size", choices=list(SIZES), default="10k", help="Synthetic dataset size (Leads count).")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per benchmark (median is reported).")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--zoho-latency-ms", type=int, default=0, help="Artificial delay per mock Zoho page.")
+    parser.add_argument("--db-url", default=os.environ.get("BENCH_DB_URL", local_db.DEFAULT_DB_URL))
+    parser.add_argument("--supabase-url", default=os.environ.get("BENCH_SUPABASE_URL", "http://127.0.0.1:54321"))
+    parser.add_argument("--supabase-key", default=os.environ.get("BENCH_SUPABASE_KEY"))
+    parser.add_argument("--skip-schema", action="store_true", help="Do not re-apply schema.sql / supabase_analytics.sql.")
+    parser.add_argument("--output", default="bench_output.json", help="Where to write the JSON results.")
+    parser.add_argument("--compare", action="store_true", help="Compare against benchmarks/baselines/<size>.json.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown before REGRESSED (0.15 = 15%%).")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline for --size.")
+    args = parser.parse_args(argv)
+
+    if not args.supabase_key:
+        parser.error("Set BENCH_SUPABASE_KEY (or --supabase-key) to the local stack's service_role key.")
+
+    report = run_benchmarks(args.size, args.repeat, args.seed, args.zoho_latency_ms, args.db_url,
+                            args.supabase_url, args.supabase_key, args.skip_schema)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.size}.json")
+    exit_code = 0
+    if args.compare:
+        if not os.path.exists(baseline_path):
+            print(f"⚠️ No baseline at {baseline_path}. Run with --save-baseline first.")
+        else:
+            with open(baseline_path) as f:
+                rows = compare(report, json.load(f), args.tolerance)
+            _print_comparison(rows)
+            exit_code = 1 if any(r[4] == "REGRESSED" for r in rows) else 0
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline saved to {baseline_path}")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
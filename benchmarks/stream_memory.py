@@ -0,0 +1,159 @@
+"""
+Peak memory, CPU and bytes of the Zoho fetch → map → upsert path: buffered vs streaming vs light.
+
+    python -m benchmarks.stream_memory                      # Leads at 100k
+    python -m benchmarks.stream_memory --size 1m --module Leads
+
+Each variant runs in its own child process, so `ru_maxrss` is that variant's high-water
+mark and its CPU time excludes the stand-in servers (mock Zoho + a PostgREST sink that
+discards writes, both in this parent process):
+  • buffered  — the previous path: response.json() per page into one module-wide list,
+                a second list of mapped rows, stdlib-json bodies and the rows echoed back
+                (supabase-py's default return=representation), parsed again
+  • streaming — zoho_client.iter_incremental_module → database_client.upsert_module_data
+                (one page + one chunk alive at a time, fast_json bodies, return=minimal)
+  • light     — streaming with the TWO_TIER_SYNC projection: only the typed-column fields
+                are fetched and raw_data is left out of the upsert
+Results are normalized per 100k records.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+from benchmarks.stubs import MockZohoServer, StubPostgrestSink
+from benchmarks.synthetic_data import SIZES, MODULE_RATIOS, module_count
+
+VARIANTS = ["buffered", "streaming", "light"]
+
+def _rusage():
+    """(cpu seconds, peak RSS in MB) of this process so far."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return usage.ru_utime + usage.ru_stime, peak
+
+def _run_buffered(zoho_client, database_client, token: str, module: str) -> int:
+    """The pre-streaming path, kept here as the baseline."""
+    import requests
+    from core.config import Config
+    session = requests.Session()
+    headers = {"Authorization": f"Zoho-oauthtoken {token}"}
+    records, page = [], 1
+    zoho_bytes = write_bytes = 0
+    while True:
+        response = session.get(f"{Config.ZOHO_API_URL}/crm/v2/{module}", headers=headers,
+                               params={"page": page, "per_page": zoho_client.PAGE_SIZE})
+        if response.status_code != 200:
+            break
+        zoho_bytes += len(response.content)
+        data = response.json()
+        records.extend(data.get("data", []))
+        if not data.get("info", {}).get("more_records"):
+            break
+        page += 1
+
+    rows = [row for row in (database_client._map_record(module, rec) for rec in records) if row]
+    table = database_client.MODULE_TABLES[module]
+    for i in range(0, len(rows), database_client.UPSERT_CHUNK_SIZE):
+        body = json.dumps(rows[i:i + database_client.UPSERT_CHUNK_SIZE])
+        write_bytes += len(body.encode("utf-8"))
+        response = session.post(f"{Config.SUPABASE_URL}/rest/v1/{table}",
+                                params={"on_conflict": "id"}, data=body,
+                                headers={"Content-Type": "application/json",
+                                         "Prefer": "return=representation,resolution=merge-duplicates"})
+        response.json()
+    return len(rows), zoho_bytes, write_bytes
+
+def _run_streaming(zoho_client, database_client, token: str, module: str, light: bool = False):
+    from core import telemetry
+    fields = database_client.TYPED_COLUMN_FIELDS[module] if light else None
+    run = telemetry.start_run()
+    try:
+        written = database_client.upsert_module_data(
+            module, zoho_client.iter_incremental_module(token, module, fields=fields), light=light)
+    finally:
+        telemetry.end_run()
+    totals = run.stage_totals()
+    return written, totals.get("fetch", {}).get("bytes", 0), totals.get("upsert", {}).get("bytes", 0)
+
+def _run_light(zoho_client, database_client, token: str, module: str):
+    return _run_streaming(zoho_client, database_client, token, module, light=True)
+
+def child(variant: str, module: str):
+    """Runs one variant in this process and prints its measurements as one JSON line."""
+    # Imported only now: the parent set the environment these modules read at import time
+    from services import zoho_client, database_client
+    from core import fast_json
+    token = zoho_client.get_access_token()
+    cpu0, rss0 = _rusage()
+    t0 = time.perf_counter()
+    runner = {"buffered": _run_buffered, "streaming": _run_streaming, "light": _run_light}[variant]
+    # The stand-ins are local, so silence the pipeline's progress prints
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        records, zoho_bytes, write_bytes = runner(zoho_client, database_client, token, module)
+    finally:
+        sys.stdout = stdout
+    wall = time.perf_counter() - t0
+    cpu1, rss1 = _rusage()
+    print(json.dumps({"variant": variant, "records": records, "wall_s": round(wall, 3),
+                      "cpu_s": round(cpu1 - cpu0, 3), "peak_rss_mb": round(rss1, 1),
+                      "baseline_rss_mb": round(rss0, 1), "zoho_bytes": zoho_bytes, "write_bytes": write_bytes,
+                      "orjson": fast_json.orjson is not None}))
+
+def run(size: str, module: str, seed: int = 42) -> list:
+    results = []
+    with MockZohoServer(size=size, seed=seed) as zoho, StubPostgrestSink() as sink:
+        env = dict(os.environ)
+        env.update({
+            "ZOHO_CLIENT_ID": "bench", "ZOHO_CLIENT_SECRET": "bench", "ZOHO_REFRESH_TOKEN": "bench",
+            "ZOHO_ACCOUNTS_URL": zoho.url, "ZOHO_API_URL": zoho.url,
+            "SUPABASE_URL": sink.url, "SUPABASE_KEY": "bench",
+            "TWILIO_ACCOUNT_SID": "ACbench", "TWILIO_AUTH_TOKEN": "bench",
+            "TWILIO_WHATSAPP_NUMBER": "+10000000000", "TARGET_WHATSAPP_NUMBER": "+10000000001",
+            "CRM_PARTITIONED": "false",
+        })
+        for variant in VARIANTS:
+            out = subprocess.run([sys.executable, "-m", "benchmarks.stream_memory", "--child", variant,
+                                  "--module", module], env=env, capture_output=True, text=True, check=True)
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Peak RSS / CPU / bytes of buffered vs streaming vs light fetch→upsert.")
+    parser.add_argument("--size", choices=list(SIZES), default="100k")
+    parser.add_argument("--module", choices=list(MODULE_RATIOS), default="Leads")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.child:
+        return child(args.child, args.module)
+
+    print(f"📦 {module_count(args.size, args.module):,} {args.module} records through fetch → map → upsert ...")
+    results = run(args.size, args.module, args.seed)
+    print(f"\n{'variant':<10} {'records':>9} {'wall s':>8} {'CPU s/100k':>11} {'peak RSS MB':>12} {'Δ RSS MB/100k':>14} "
+          f"{'Zoho MB/100k':>13} {'write MB/100k':>14}")
+    for r in results:
+        per_100k = 100_000 / max(r["records"], 1)
+        r["cpu_s_per_100k"] = round(r["cpu_s"] * per_100k, 2)
+        r["rss_growth_mb_per_100k"] = round((r["peak_rss_mb"] - r["baseline_rss_mb"]) * per_100k, 1)
+        r["zoho_mb_per_100k"] = round(r["zoho_bytes"] / 1e6 * per_100k, 1)
+        r["write_mb_per_100k"] = round(r["write_bytes"] / 1e6 * per_100k, 1)
+        print(f"{r['variant']:<10} {r['records']:>9,} {r['wall_s']:>8.2f} {r['cpu_s_per_100k']:>11.2f} "
+              f"{r['peak_rss_mb']:>12.1f} {r['rss_growth_mb_per_100k']:>14.1f} "
+              f"{r['zoho_mb_per_100k']:>13.1f} {r['write_mb_per_100k']:>14.1f}")
+    base, new, light = results
+    if base["rss_growth_mb_per_100k"] and base["cpu_s_per_100k"]:
+        print(f"\n🏁 streaming: {1 - new['rss_growth_mb_per_100k'] / base['rss_growth_mb_per_100k']:.0%} less memory growth, "
+              f"{1 - new['cpu_s_per_100k'] / base['cpu_s_per_100k']:.0%} less CPU per 100k records "
+              f"(orjson {'on' if new['orjson'] else 'off — pip install orjson'})")
+    if light["zoho_bytes"] and light["write_bytes"]:
+        print(f"🪶 light: {new['zoho_bytes'] / light['zoho_bytes']:.1f}× fewer Zoho bytes, "
+              f"{new['write_bytes'] / light['write_bytes']:.1f}× fewer upsert bytes than a full streaming pass")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import json
+import time
+import threading
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from benchmarks.synthetic_data import generate_page, get_records_by_ids, MODULE_RATIOS
+
+# ─────────────────────────────────────────────────────────────
+# LOCAL STAND-INS FOR ZOHO CRM, OLLAMA AND POSTGREST WRITES
+# Both run on an ephemeral localhost port in a daemon thread so a benchmark
+# exercises the real requests / langchain-ollama code paths without a network.
+# ─────────────────────────────────────────────────────────────
+
+STUB_LLM_REPORT = """<DASHBOARD_REPORT>
+### 1. The Daily Pulse
+- 42 new leads yesterday, 12% above the 7-day average. Open pipeline stands at ₹4,20,00,000.
+### 2. Deep Dive Diagnostics
+- Kushal Shah is OVERLOADED with 191 active leads and ₹0 pipeline.
+- 'Facebook' is a TOXIC channel with 38% junk leads.
+### 3. Immediate Execution
+- Re-assign Kushal Shah's untouched leads today.
+- Pause the Facebook lead-form campaign pending a targeting review.
+</DASHBOARD_REPORT>"""
+
+STUB_LLM_NARRATIVE = """SIGNAL: Kushal Shah holds 191 active leads with ₹0 pipeline.
+SIGNAL: Facebook leads are 38% junk.
+FOCUS: Re-assign Kushal Shah's untouched leads today.
+FOCUS: Pause the Facebook lead-form campaign pending a targeting review."""
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, small responses stall on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class _BackgroundServer:
+    """Starts a ThreadingHTTPServer on 127.0.0.1:<ephemeral> for the duration of a `with` block."""
+
+    handler_class = None
+
+    def __enter__(self):
+        handler = type("BoundHandler", (self.handler_class,), {"stub": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class _ZohoHandler(_QuietHandler):
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        if path == "/oauth/v2/token":
+            return self._send_json(200, {"access_token": "bench-token", "expires_in": 3600, "token_type": "Bearer"})
+        if path == "/crm/v2/actions/watch":
+            watches = json.loads(body or b"{}").get("watch", [])
+            return self._send_json(200, {"watch": [{"code": "SUCCESS", "status": "success",
+                                                    "details": {"events": w.get("events", [])}} for w in watches]})
+        self._send_json(404, {"code": "INVALID_URL_PATTERN"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) != 3 or parts[:2] != ["crm", "v2"] or parts[2] not in MODULE_RATIOS:
+            return self._send_json(404, {"code": "INVALID_URL_PATTERN"})
+        module = parts[2]
+        query = parse_qs(url.query)
+        page = int(query.get("page", ["1"])[0])
+        per_page = min(int(query.get("per_page", ["200"])[0]), 200)
+
+        stub = self.stub
+        if stub.latency_ms:
+            time.sleep(stub.latency_ms / 1000)
+        stub.requests_served += 1
+        if "ids" in query:
+            ids = query["ids"][0].split(",")
+            if len(ids) > 100:
+                return self._send_json(400, {"code": "LIMIT_EXCEEDED", "message": "ids limit exceeded (100)"})
+            records = get_records_by_ids(module, stub.size, ids, stub.seed, stub.now)
+            more = False
+        else:
+            records, more = generate_page(module, stub.size, page, per_page, stub.seed, stub.now)
+        if "fields" in query:
+            keep = ["id"] + query["fields"][0].split(",")
+            records = [{k: rec[k] for k in keep if k in rec} for rec in records]
+        if not records:
+            self.send_response(204)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_json(200, {
+            "data": records,
+            "info": {"per_page": per_page, "count": len(records), "page": page, "more_records": more},
+        })
+
+class MockZohoServer(_BackgroundServer):
+    """
+    Serves the OAuth token endpoint, paginated `/crm/v2/<Module>` list responses (or
+    `?ids=` lookups of up to 100 records, optionally projected with `?fields=`) and the
+    watch-channel endpoint for a synthetic dataset size. `latency_ms` adds a fixed per-request delay.
+    """
+
+    handler_class = _ZohoHandler
+
+    def __init__(self, size: str = "10k", seed: int = 42, latency_ms: int = 0):
+        self.size = size
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.now = datetime.now()
+        self.requests_served = 0
+
+class _OllamaHandler(_QuietHandler):
+    def do_GET(self):
+        if urlparse(self.path).path == "/api/tags":
+            return self._send_json(200, {"models": [{"name": "stub:latest", "model": "stub:latest"}]})
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if urlparse(self.path).path != "/api/chat":
+            return self._send_json(404, {"error": "not found"})
+
+        stub = self.stub
+        prompt = "".join(m.get("content", "") for m in request.get("messages", []))
+        prompt_tokens = max(1, len(prompt) // 4)
+        # The WhatsApp narrative and per-rep prompts ask for SIGNAL:/FOCUS: lines only
+        content = stub.narrative_text if "FOCUS:" in prompt else stub.response_text
+        eval_tokens = max(1, len(content) // 4)
+        prefill_s = prompt_tokens / stub.prefill_tokens_per_s
+        generate_s = eval_tokens / stub.generate_tokens_per_s
+        time.sleep(prefill_s + generate_s)
+        stub.requests_served += 1
+
+        created = datetime.utcnow().isoformat() + "Z"
+        chunks = [
+            {"model": request.get("model"), "created_at": created,
+             "message": {"role": "assistant", "content": content}, "done": False},
+            {"model": request.get("model"), "created_at": created,
+             "message": {"role": "assistant", "content": ""}, "done": True, "done_reason": "stop",
+             "total_duration": int((prefill_s + generate_s) * 1e9), "load_duration": 0,
+             "prompt_eval_count": prompt_tokens, "prompt_eval_duration": int(prefill_s * 1e9),
+             "eval_count": eval_tokens, "eval_duration": int(generate_s * 1e9)},
+        ]
+        if request.get("stream", True):
+            body = "".join(json.dumps(c) + "\n" for c in chunks).encode("utf-8")
+            content_type = "application/x-ndjson"
+        else:
+            final = dict(chunks[1], message={"role": "assistant", "content": content})
+            body = json.dumps(final).encode("utf-8")
+            content_type = "application/json"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class StubOllamaServer(_BackgroundServer):
+    """
+    Minimal Ollama `/api/chat` stand-in returning a canned dashboard report (or the canned
+    Signals/Focus lines for the WhatsApp narrative prompt).
+    Simulated prefill/generation speeds make the LLM stage cost proportional to prompt size.
+    """
+
+    handler_class = _OllamaHandler
+
+    def __init__(self, response_text: str = STUB_LLM_REPORT, prefill_tokens_per_s: float = 5000.0,
+                 generate_tokens_per_s: float = 2000.0, narrative_text: str = STUB_LLM_NARRATIVE):
+        self.response_text = response_text
+        self.narrative_text = narrative_text
+        self.prefill_tokens_per_s = prefill_tokens_per_s
+        self.generate_tokens_per_s = generate_tokens_per_s
+        self.requests_served = 0
+
+class _PostgrestSinkHandler(_QuietHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        self.stub.requests_served += 1
+        self.stub.bytes_received += len(body)
+        # supabase-py's default return=representation gets the rows echoed back, as PostgREST would
+        echo = body if "return=representation" in self.headers.get("Prefer", "") else b""
+        self.send_response(201)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(echo)))
+        self.end_headers()
+        self.wfile.write(echo)
+
+class StubPostgrestSink(_BackgroundServer):
+    """
+    Accepts PostgREST table writes (`POST /rest/v1/<table>`) and discards them, so client-side
+    encode/send cost can be measured without a database.
+    """
+
+    handler_class = _PostgrestSinkHandler
+
+    def __init__(self):
+        self.requests_served = 0
+        self.bytes_received = 0
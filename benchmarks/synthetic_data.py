@@ -0,0 +1,171 @@
+import zlib
+import random
+from datetime import datetime, timedelta
+
+# ─────────────────────────────────────────────────────────────
+# SEEDED SYNTHETIC ZOHO CRM DATA
+# Records are generated page-by-page from (seed, module, page), so any page of a
+# 1M-record dataset can be produced on demand without holding the dataset in memory.
+# ─────────────────────────────────────────────────────────────
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Per-module volume relative to the Leads count of a dataset size
+MODULE_RATIOS = {"Leads": 1.0, "Deals": 0.25, "Contacts": 0.25, "Accounts": 0.05}
+MODULE_PREFIX = {"Leads": "L", "Deals": "D", "Contacts": "C", "Accounts": "A"}
+
+OWNERS = ["Kushal Shah", "Priya Nair", "Rahul Mehta", "Ananya Iyer", "Vikram Rao", "Sneha Kulkarni", "Arjun Das", "Meera Pillai"]
+LEAD_SOURCES = ["Google Ads", "Facebook", "Website", "Referral", "Walk-in", "IndiaMART", "Cold Call", "Trade Show"]
+LEAD_STATUSES = ["New Lead", "Contacted", "Attempted to Contact", "Qualified", "Junk Lead", "Not Qualified", "Pre-Qualified", "Contact in Future"]
+LEAD_STATUS_WEIGHTS = [20, 18, 14, 12, 15, 8, 8, 5]
+NOISY_SOURCES = {"Facebook", "IndiaMART", "Cold Call"}
+DEAL_STAGES = ["Qualification", "Needs Analysis", "Site Visit", "Proposal/Price Quote", "Negotiation/Review", "Closed Won", "Closed Lost"]
+DEAL_STAGE_WEIGHTS = [20, 16, 14, 14, 10, 12, 14]
+INDUSTRIES = ["Real Estate", "Construction", "Hospitality", "Retail", "IT Services", "Healthcare", "Education", None]
+CITIES = ["Mumbai", "Pune", "Bengaluru", "Hyderabad", "Chennai", "Delhi", "Ahmedabad", "Goa"]
+FIRST_NAMES = ["Aarav", "Diya", "Ishaan", "Kavya", "Rohan", "Saanvi", "Kabir", "Aditi", "Neel", "Tara"]
+LAST_NAMES = ["Sharma", "Patel", "Reddy", "Joshi", "Gupta", "Menon", "Bose", "Kapoor", "Naidu", "Desai"]
+
+HISTORY_DAYS = 365
+
+# Share of Leads that repeat an earlier lead's email / phone, and of Contacts that are converted Leads
+DUPLICATE_LEAD_RATE = 0.08
+CONVERTED_CONTACT_RATE = 0.3
+
+def module_count(size: str, module: str) -> int:
+    return int(SIZES[size] * MODULE_RATIOS[module])
+
+def _owner(rng):
+    name = rng.choice(OWNERS)
+    return {"name": name, "id": str(zlib.crc32(name.encode())), "email": f"{name.split()[0].lower()}@ahasmarthomes.in"}
+
+def _person(module: str, index: int) -> int:
+    """Who a record is about. Repeat leads and converted contacts reuse an earlier lead's identity."""
+    h = zlib.crc32(f"{module}:{index}".encode())
+    if module == "Leads" and index and h % 1000 < DUPLICATE_LEAD_RATE * 1000:
+        return h % index
+    if module == "Contacts" and h % 1000 < CONVERTED_CONTACT_RATE * 1000:
+        return index
+    return index if module == "Leads" else 500_000_000 + index   # stays inside _mobile's one-to-one range
+
+def _email(person: int, rng) -> str:
+    email = f"{FIRST_NAMES[person % 10].lower()}.{LAST_NAMES[person // 10 % 10].lower()}{person}@example.com"
+    return email.title() if rng.random() < 0.2 else email
+
+def _mobile(person: int, rng) -> str:
+    # person → distinct 9-digit suffix (7919 is coprime to 9 × 10^8); spelled the ways Zoho users type it
+    digits = f"9{(person * 7919) % 900_000_000 + 100_000_000}"
+    return rng.choice([f"+91 {digits}", f"0{digits}", f"+91-{digits[:5]}-{digits[5:]}", digits])
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%S+05:30")
+
+def make_record(module: str, index: int, rng: random.Random, now: datetime) -> dict:
+    """Builds one Zoho v2-shaped record, including nested objects and custom fields."""
+    created = now - timedelta(days=rng.random() ** 2 * HISTORY_DAYS, seconds=rng.randint(0, 86399))
+    modified = min(now, created + timedelta(days=rng.random() * 30))
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    person = _person(module, index)
+    rec = {
+        "id": f"{MODULE_PREFIX[module]}{index:012d}",
+        "Owner": _owner(rng),
+        "Created_Time": _iso(created),
+        "Modified_Time": _iso(modified),
+        "Created_By": _owner(rng),
+        "Tag": [],
+        "$approved": True,
+        "$editable": True,
+        "City": rng.choice(CITIES),
+    }
+    if module == "Leads":
+        email = _email(person, rng) if rng.random() > 0.1 else None
+        mobile = _mobile(person, rng) if rng.random() > 0.05 else None
+        source = rng.choice(LEAD_SOURCES)
+        # Junk is likelier from the noisy channels and without an email, so lead scoring has signal to learn
+        junk_odds = (2.0 if source in NOISY_SOURCES else 1.0) * (2.5 if email is None else 1.0) * (3.0 if mobile is None else 1.0)
+        weights = [w * junk_odds if status in ("Junk Lead", "Not Qualified") else w
+                   for status, w in zip(LEAD_STATUSES, LEAD_STATUS_WEIGHTS)]
+        rec.update({
+            "First_Name": first,
+            "Last_Name": last,
+            "Full_Name": f"{first} {last}",
+            "Email": email,
+            "Mobile": mobile,
+            "Lead_Source": source,
+            "Lead_Status": rng.choices(LEAD_STATUSES, weights)[0],
+            "Annual_Revenue": rng.choice([None, 0, rng.randint(1, 500) * 100000]),
+            "Company": f"{last} Residency" if rng.random() > 0.6 else None,
+            "Description": "Interested in smart lighting and security automation." if rng.random() > 0.5 else None,
+            "Product_Line": rng.choice(["Lighting", "Security", "Climate", "Full Home"]),
+            "$converted": False,
+        })
+    elif module == "Deals":
+        closing = created + timedelta(days=rng.randint(7, 120))
+        rec.update({
+            "Deal_Name": f"{last} Villa Automation",
+            "Stage": rng.choices(DEAL_STAGES, DEAL_STAGE_WEIGHTS)[0],
+            "Lead_Source": rng.choice(LEAD_SOURCES),
+            "Amount": rng.randint(2, 400) * 25000,
+            "Closing_Date": closing.strftime("%Y-%m-%d"),
+            "Probability": rng.choice([10, 20, 40, 60, 75, 90]),
+            "Contact_Name": {"name": f"{first} {last}", "id": f"C{index:012d}"},
+        })
+    elif module == "Contacts":
+        rec.update({
+            "First_Name": first,
+            "Last_Name": last,
+            "Full_Name": f"{first} {last}",
+            "Email": _email(person, rng) if rng.random() > 0.2 else None,
+            "Mobile": _mobile(person, rng),
+        })
+    elif module == "Accounts":
+        rec.update({
+            "Account_Name": f"{last} {rng.choice(['Developers', 'Estates', 'Group', 'Builders'])}",
+            "Industry": rng.choice(INDUSTRIES),
+            "Employees": rng.randint(5, 2000),
+        })
+    return rec
+
+def generate_page(module: str, size: str, page: int, per_page: int = 200, seed: int = 42, now: datetime = None):
+    """
+    Returns (records, more_records) for one page. The same (seed, module, page) always yields
+    the same records, independently of which other pages were generated.
+    """
+    total = module_count(size, module)
+    start = (page - 1) * per_page
+    end = min(start + per_page, total)
+    if start >= total:
+        return [], False
+    rng = random.Random(f"{seed}:{module}:{page}")
+    now = now or datetime.now()
+    records = [make_record(module, i, rng, now) for i in range(start, end)]
+    return records, end < total
+
+def iter_records(module: str, size: str, seed: int = 42, per_page: int = 200):
+    """Yields every record of a module for the given dataset size, page by page."""
+    now = datetime.now()
+    page = 1
+    while True:
+        records, more = generate_page(module, size, page, per_page, seed, now)
+        yield from records
+        if not more:
+            break
+        page += 1
+
+def get_records_by_ids(module: str, size: str, ids: list, seed: int = 42, now: datetime = None):
+    """Looks records up by ID, identical to what the 200-per-page listing returns for them. Unknown IDs are skipped."""
+    prefix = MODULE_PREFIX[module]
+    total = module_count(size, module)
+    pages = {}
+    records = []
+    for record_id in ids:
+        if not record_id.startswith(prefix) or not record_id[len(prefix):].isdigit():
+            continue
+        index = int(record_id[len(prefix):])
+        if index >= total:
+            continue
+        page = index // 200 + 1
+        if page not in pages:
+            pages[page] = generate_page(module, size, page, 200, seed, now)[0]
+        records.append(pages[page][index % 200])
+    return records
@@ -11,10 +11,17 @@ class Config:
     ZOHO_REFRESH_TOKEN = os.environ.get("ZOHO_REFRESH_TOKEN")
     ZOHO_ACCOUNTS_URL = os.environ.get("ZOHO_ACCOUNTS_URL", "https://accounts.zoho.in")
     ZOHO_API_URL = os.environ.get("ZOHO_API_URL", "https://www.zohoapis.in")
+    ZOHO_MAX_REQUESTS_PER_MINUTE = int(os.environ.get("ZOHO_MAX_REQUESTS_PER_MINUTE", "0"))  # 0 = unpaced
+
+    # Zoho traffic capture / offline replay (optional, mutually exclusive)
+    ZOHO_CAPTURE_PATH = os.environ.get("ZOHO_CAPTURE_PATH")        # e.g. captures/2024-06-01.jsonl.gz
+    ZOHO_REPLAY_PATH = os.environ.get("ZOHO_REPLAY_PATH")
+    ZOHO_REPLAY_LATENCY_MS = os.environ.get("ZOHO_REPLAY_LATENCY_MS")  # milliseconds or "recorded"
 
     # Supabase SDK Variables
     SUPABASE_URL = os.environ.get("SUPABASE_URL")
     SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+    SUPABASE_SCHEMA = os.environ.get("SUPABASE_SCHEMA", "public")  # per-org schema in a shared project (must be an exposed schema)
 
     # Twilio SDK Variables
     TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID")
@@ -22,6 +29,47 @@ class Config:
     TWILIO_WHATSAPP_NUMBER = os.environ.get("TWILIO_WHATSAPP_NUMBER")
     TARGET_WHATSAPP_NUMBER = os.environ.get("TARGET_WHATSAPP_NUMBER")
 
+    # Custom Zoho fields promoted from raw_data into indexed columns (see jobs/promote_fields.py)
+    PROMOTED_FIELDS_FILE = os.environ.get("PROMOTED_FIELDS_FILE", "promoted_fields.json")
+
+    # Resident scheduler (jobs/scheduler.py)
+    SYNC_INTERVAL_MINUTES = int(os.environ.get("SYNC_INTERVAL_MINUTES", "15"))
+    BRIEFING_TIME = os.environ.get("BRIEFING_TIME", "08:00")        # local HH:MM for the daily AI + WhatsApp run
+    SYNC_LOCK_PATH = os.environ.get("SYNC_LOCK_PATH", "sync.lock")
+    SYNC_LOCK_WAIT_SECONDS = float(os.environ.get("SYNC_LOCK_WAIT_SECONDS", "60"))  # a held lock (e.g. a push flush) is waited out this long before skipping
+    OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "24h")  # how long Ollama keeps the model loaded after a call
+    # Intra-day syncs fetch/update only the typed columns; the daily pipeline's full pass refreshes raw_data
+    TWO_TIER_SYNC = os.environ.get("TWO_TIER_SYNC", "false").lower() == "true"
+
+    # Historical briefing backfill (jobs/backfill_briefings.py)
+    LLM_CACHE_DIR = os.environ.get("LLM_CACHE_DIR", "llm_cache")
+    BACKFILL_WORKERS = int(os.environ.get("BACKFILL_WORKERS", "2"))  # match OLLAMA_NUM_PARALLEL on the Ollama server
+    LLM_CORPUS_DIR = os.environ.get("LLM_CORPUS_DIR")  # set to keep each daily AI payload for benchmarks/llm.py
+
+    # Per-rep WhatsApp briefings (jobs/run_rep_briefings.py)
+    REP_BRIEFINGS_ENABLED = os.environ.get("REP_BRIEFINGS_ENABLED", "false").lower() == "true"  # send after the CEO briefing
+    REP_CONTACTS_FILE = os.environ.get("REP_CONTACTS_FILE", "rep_contacts.json")  # {"CRM owner name": "+91XXXXXXXXXX"}
+    REP_BRIEFING_WORKERS = int(os.environ.get("REP_BRIEFING_WORKERS", "2"))
+
+    # Push ingest via Zoho's Notification API (jobs/notification_receiver.py)
+    ZOHO_NOTIFY_URL = os.environ.get("ZOHO_NOTIFY_URL")              # public URL Zoho POSTs change events to
+    ZOHO_NOTIFY_TOKEN = os.environ.get("ZOHO_NOTIFY_TOKEN")          # shared secret echoed back in every event
+    ZOHO_NOTIFY_CHANNEL_ID = os.environ.get("ZOHO_NOTIFY_CHANNEL_ID", "1000000068001")
+    NOTIFY_HOST = os.environ.get("NOTIFY_HOST", "0.0.0.0")          # anything but loopback requires ZOHO_NOTIFY_TOKEN
+    NOTIFY_PORT = int(os.environ.get("NOTIFY_PORT", "8765"))
+    NOTIFY_WINDOW_SECONDS = float(os.environ.get("NOTIFY_WINDOW_SECONDS", "5"))
+
+    # Lead scoring (core/lead_scoring.py, trained by jobs/train_lead_scorer.py)
+    LEAD_SCORE_MODEL_PATH = os.environ.get("LEAD_SCORE_MODEL_PATH", "models/lead_scorer.npz")  # no file = leads go unscored
+    LIKELY_JUNK_THRESHOLD = float(os.environ.get("LIKELY_JUNK_THRESHOLD", "0.7"))  # junk_score at which a lead is flagged
+
+    # Month-partitioned leads_raw / crm_deals (set after running supabase_partitioning.sql)
+    CRM_PARTITIONED = os.environ.get("CRM_PARTITIONED", "false").lower() == "true"
+    ARCHIVE_AFTER_MONTHS = int(os.environ.get("ARCHIVE_AFTER_MONTHS", "12"))
+
+    # Observability (optional): node_exporter textfile-collector path for per-stage pipeline metrics
+    PROMETHEUS_TEXTFILE_PATH = os.environ.get("PROMETHEUS_TEXTFILE_PATH")
+
     @classmethod
     def validate(cls):
         """Ensure all critical environment variables are loaded to prevent runtime crashes."""
@@ -33,5 +81,8 @@ class Config:
         if missing:
             raise ValueError(f"Missing critical Environment Variables in .env: {', '.join(missing)}")
 
+        if cls.ZOHO_CAPTURE_PATH and cls.ZOHO_REPLAY_PATH:
+            raise ValueError("ZOHO_CAPTURE_PATH and ZOHO_REPLAY_PATH cannot both be set.")
+
 # Validate upfront on boot
 Config.validate()
@@ -0,0 +1,33 @@
+import json
+
+# ─────────────────────────────────────────────────────────────
+# FAST JSON CODEC
+# orjson (Rust) decodes Zoho pages and encodes upsert bodies several times faster
+# than the stdlib and straight to/from bytes, skipping the str round trip. It is an
+# optional dependency: without it every call falls back to `json` with identical output
+# (UTF-8, no ASCII escaping), so nothing else needs to know which one is active.
+# ─────────────────────────────────────────────────────────────
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(data):
+    """Decodes JSON from bytes or str."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Encodes to UTF-8 JSON bytes (non-string dict keys are stringified, as by the stdlib)."""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def dumps_str(obj, indent: bool = False) -> str:
+    """`dumps` as text — for prompts and console output."""
+    return dumps(obj, indent).decode("utf-8")
@@ -0,0 +1,165 @@
+import numpy as np
+from datetime import date
+
+# ─────────────────────────────────────────────────────────────
+# MONTE CARLO PIPELINE FORECAST
+# Every open deal is won with its stage's historical win rate, in the month Zoho
+# expects it to close. Thousands of scenarios give P10 / P50 / P90 revenue per month,
+# per owner and for the whole horizon. Inputs come from the get_forecast_inputs RPC.
+#   • win rates — share of closed deals that passed through a stage and were won,
+#     shrunk toward the overall win rate so a thinly observed stage can't swing it
+#   • draws — the INDIVIDUAL_DEALS deals that add the most variance (amount² · p · (1 − p))
+#     are drawn one by one. Every other deal is pooled with its month, owner and stage:
+#     each scenario draws an exact Binomial count of wins k for the pool, then a value for
+#     those k deals from their finite-population mean and variance, clipped to the
+#     smallest/largest possible k-deal total (a pool of one is an exact Bernoulli). Cost
+#     scales with scenarios × (INDIVIDUAL_DEALS + pools) instead of scenarios × deals.
+# The seed is fixed, so the dashboard and the briefing report the same numbers for the same data.
+# ─────────────────────────────────────────────────────────────
+
+DEFAULT_SCENARIOS = 10_000
+DEFAULT_HORIZON_MONTHS = 6
+DEFAULT_SEED = 42
+PRIOR_WEIGHT = 20          # closed deals' worth of evidence given to the overall rate in every stage's estimate
+DEFAULT_WIN_RATE = 0.2     # only used before any deal has closed
+INDIVIDUAL_DEALS = 2_000
+BLOCK_DEALS = 1024         # individually drawn deals per (scenarios × block) batch of uniforms
+PERCENTILES = (10, 50, 90)
+
+def stage_win_rates(inputs: dict):
+    """({stage: win probability}, overall win rate) from the RPC's closed-deal outcomes."""
+    closed, won = inputs.get("closed_count") or 0, inputs.get("won_count") or 0
+    overall = won / closed if closed else DEFAULT_WIN_RATE
+    rates = {
+        stage: (o.get("won", 0) + PRIOR_WEIGHT * overall) / (o.get("closed", 0) + PRIOR_WEIGHT)
+        for stage, o in (inputs.get("stage_outcomes") or {}).items()
+    }
+    return rates, overall
+
+def horizon_months(today: date, months: int) -> list:
+    """["YYYY-MM", ...] starting with today's month."""
+    return [f"{today.year + (today.month - 1 + i) // 12}-{(today.month - 1 + i) % 12 + 1:02d}" for i in range(months)]
+
+def simulate(inputs: dict, scenarios: int = DEFAULT_SCENARIOS, months: int = DEFAULT_HORIZON_MONTHS,
+             seed: int = DEFAULT_SEED, today: date = None, pooled: bool = True) -> dict:
+    """
+    Runs the forecast. Returns {"months": {"YYYY-MM": band}, "owners": {owner: band}, "total": band, ...}
+    where a band is {"p10", "p50", "p90", "expected"} in ₹ over the horizon. Deals past their close
+    date count in the current month; undated deals and those closing after the horizon are left out.
+    `pooled=False` draws every deal individually (the reference the pooled draws are checked against).
+    """
+    deals = inputs.get("deals") or {}
+    month_keys = horizon_months(today or date.today(), months)
+    month_index = {m: i for i, m in enumerate(month_keys)}
+    close = deals.get("close_month") or []
+    m_idx = np.array([0 if c and c < month_keys[0] else month_index.get(c, -1) for c in close], dtype=np.int64)
+    undated = sum(1 for c in close if not c)
+    overdue = sum(1 for c in close if c and c < month_keys[0])
+
+    rates, overall = stage_win_rates(inputs)
+    keep = m_idx >= 0
+    amount = np.asarray(deals.get("amount") or [], dtype=np.float64)[keep]
+    stages, s_idx = np.unique(np.asarray(deals.get("stage") or [], dtype=object)[keep].astype(str), return_inverse=True)
+    owners, o_idx = np.unique(np.asarray(deals.get("owner") or [], dtype=object)[keep].astype(str), return_inverse=True)
+    p = np.array([rates.get(s, overall) for s in stages])[s_idx]
+    cell = m_idx[keep] * len(owners) + o_idx              # (month, owner) column of the scenario matrix
+
+    totals = np.zeros((scenarios, months * max(len(owners), 1)))
+    rng = np.random.default_rng(seed)
+    if len(amount):
+        # Deals grouped by (cell, stage), largest first, so pools and cells are contiguous runs
+        group = cell * len(stages) + s_idx
+        order = np.lexsort((-amount, group))
+        amount, p, cell, group = amount[order], p[order], cell[order], group[order]
+        alone = np.ones(len(amount), dtype=bool)
+        if pooled and len(amount) > INDIVIDUAL_DEALS:
+            alone[:] = False
+            alone[np.argpartition(-(amount ** 2) * p * (1 - p), INDIVIDUAL_DEALS)[:INDIVIDUAL_DEALS]] = True
+        _draw_individually(rng, totals, amount[alone], p[alone], cell[alone])
+        if not alone.all():
+            _draw_pools(rng, totals, amount[~alone], p[~alone], cell[~alone], group[~alone])
+
+    by_cell = totals.reshape(scenarios, months, -1)
+    expected = np.zeros((months, max(len(owners), 1)))
+    if len(amount):
+        np.add.at(expected, (cell // len(owners), cell % len(owners)), amount * p)
+    by_month, by_owner = by_cell.sum(axis=2), by_cell.sum(axis=1)
+    owner_bands = {str(owner): _band(by_owner[:, i], expected[:, i].sum()) for i, owner in enumerate(owners)}
+    return {
+        "as_of": (today or date.today()).isoformat(),
+        "scenarios": scenarios,
+        "months": {m: _band(by_month[:, i], expected[i].sum()) for i, m in enumerate(month_keys)},
+        "owners": dict(sorted(owner_bands.items(), key=lambda kv: kv[1]["expected"], reverse=True)),
+        "total": _band(by_month.sum(axis=1), expected.sum()),
+        "open_deals": len(close),
+        "forecast_deals": int(keep.sum()),
+        "undated_deals": undated,
+        "overdue_deals": overdue,
+        "individually_drawn": int(alone.sum()) if len(amount) else 0,
+        "win_rates": {s: round(r, 3) for s, r in sorted(rates.items())},
+        "overall_win_rate": round(overall, 3),
+    }
+
+def _band(samples: np.ndarray, expected: float) -> dict:
+    p10, p50, p90 = np.percentile(samples, PERCENTILES)
+    return {"p10": int(round(p10)), "p50": int(round(p50)), "p90": int(round(p90)), "expected": int(round(expected))}
+
+def _runs(keys: np.ndarray):
+    """Start index of every run of equal values in a sorted key array."""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+def _draw_individually(rng, totals: np.ndarray, amount: np.ndarray, p: np.ndarray, cell: np.ndarray):
+    scenarios = totals.shape[0]
+    p32 = p.astype(np.float32)
+    for start in range(0, len(amount), BLOCK_DEALS):
+        end = min(start + BLOCK_DEALS, len(amount))
+        won = rng.random((scenarios, end - start), dtype=np.float32) < p32[start:end]
+        starts = _runs(cell[start:end])
+        totals[:, cell[start:end][starts]] += np.add.reduceat(np.where(won, amount[start:end], 0.0), starts, axis=1)
+
+def _draw_pools(rng, totals: np.ndarray, amount: np.ndarray, p: np.ndarray, cell: np.ndarray, group: np.ndarray):
+    scenarios = totals.shape[0]
+    starts = _runs(group)
+    n = np.diff(np.r_[starts, len(group)])
+    sums = np.add.reduceat(amount, starts)
+    mean = sums / n
+    var = np.maximum(np.add.reduceat(amount ** 2, starts) / n - mean ** 2, 0)
+    prefix = np.r_[0.0, np.cumsum(amount)]                # amounts are largest-first within each pool
+
+    # One row per pool, one column per scenario
+    k = _binomial_counts(rng, n, p[starts], scenarios)
+    spread = np.sqrt(var[:, None] * k * (n[:, None] - k) / np.maximum(n - 1, 1)[:, None])
+    value = k * mean[:, None] + spread * rng.standard_normal(k.shape)
+    first = starts[:, None]
+    largest_k = prefix[first + k] - prefix[first]
+    smallest_k = sums[:, None] - (prefix[first + n[:, None] - k] - prefix[first])
+    value = np.clip(value, smallest_k, largest_k)
+
+    pool_cell = cell[starts]
+    cell_starts = _runs(pool_cell)
+    totals[:, pool_cell[cell_starts]] += np.add.reduceat(value, cell_starts, axis=0).T
+
+def _binomial_counts(rng, n: np.ndarray, p: np.ndarray, scenarios: int) -> np.ndarray:
+    """Exact Binomial(n, p) draws, (pools × scenarios), by inverse CDF — far faster than Generator.binomial here."""
+    p = np.clip(p, 1e-9, 1 - 1e-9)
+    u = rng.random((len(n), scenarios))
+    k = np.empty((len(n), scenarios), dtype=np.int64)
+    for g in range(len(n)):
+        ks = np.arange(1, n[g] + 1)
+        log_pmf = np.cumsum(np.r_[n[g] * np.log1p(-p[g]), np.log(n[g] - ks + 1) - np.log(ks) + np.log(p[g] / (1 - p[g]))])
+        cdf = np.cumsum(np.exp(log_pmf - log_pmf.max()))
+        k[g] = np.searchsorted(cdf / cdf[-1], u[g], side="right")
+    return np.minimum(k, n[:, None])
+
+def payload_section(forecast: dict, top_owners: int = 10) -> dict:
+    """Compact, pre-formatted view of the forecast for the AI payload."""
+    def fmt(band):
+        return f"P10 ₹{band['p10']:,} · P50 ₹{band['p50']:,} · P90 ₹{band['p90']:,}"
+    months = list(forecast["months"])
+    return {
+        "method": f"Monte Carlo over {forecast['scenarios']:,} scenarios of {forecast['forecast_deals']:,} open deals "
+                  "at historical stage win rates. P10 = pessimistic, P50 = likely, P90 = optimistic.",
+        f"next_{len(months)}_months_revenue": fmt(forecast["total"]),
+        "by_month": {date(int(m[:4]), int(m[5:]), 1).strftime("%b %Y"): fmt(b) for m, b in forecast["months"].items()},
+        "by_owner": {owner: fmt(b) for owner, b in list(forecast["owners"].items())[:top_owners]},
+    }
@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import zlib
+import logging
+from datetime import datetime
+
+import numpy as np
+
+# ─────────────────────────────────────────────────────────────
+# LEAD SCORING
+# Predicts, the moment a lead is synced, how likely it is to end up Junk / Not Qualified.
+#   • features — each Zoho payload becomes a few dozen "field=value" strings (source, city, owner,
+#     email kind and domain, phone validity, name / company / description signals, revenue bucket,
+#     creation hour, tags, a few crosses), hashed into 2^HASH_BITS slots. No vocabulary to maintain;
+#     custom values Zoho adds later simply hash into new slots.
+#   • model — logistic regression over the hashed slots, trained offline by jobs/train_lead_scorer.py
+#     on leads whose status is settled. Encoding is a per-record loop, scoring a numpy gather-sum
+#     over the whole chunk.
+# The score is P(junk) in [0, 1], stored in leads_raw.junk_score.
+# ─────────────────────────────────────────────────────────────
+
+JUNK_STATUSES = {"Junk Lead", "Not Qualified", "Not Qualified Lead"}
+# Outcome not known yet — these leads are scored but never trained on
+OPEN_STATUSES = {"New Lead", "Not Contacted", "Attempted to Contact", "Contacted", "Contact in Future"}
+
+HASH_BITS = 18
+MAX_FEATURES = 40          # per lead; padding slots point at a weight that is always 0
+PAD = 1 << HASH_BITS
+
+CATEGORICAL_FIELDS = ["Lead_Source", "City", "State", "Country", "Industry", "Product_Line", "Designation", "Salutation"]
+FREE_MAIL_DOMAINS = {"gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.in", "hotmail.com", "outlook.com",
+                     "live.com", "rediffmail.com", "icloud.com", "protonmail.com"}
+_NON_DIGITS = re.compile(r"\D")
+
+def features(rec: dict) -> list:
+    """Feature strings of one Zoho Lead payload."""
+    f = []
+    for field in CATEGORICAL_FIELDS:
+        value = rec.get(field)
+        if value not in (None, ""):
+            f.append(f"{field}={str(value).strip().lower()}")
+    owner = rec.get("Owner")
+    if isinstance(owner, dict):
+        f.append(f"owner={owner.get('name')}")
+
+    email = str(rec.get("Email") or "").strip().lower()
+    local, _, domain = email.rpartition("@")
+    if not email:
+        email_kind = "none"
+    elif not local or "." not in domain:
+        email_kind = "invalid"
+    else:
+        email_kind = "free" if domain in FREE_MAIL_DOMAINS else "company"
+        f.append(f"email_domain={domain}")
+        if any(ch.isdigit() for ch in local):
+            f.append("email:digits")
+    f.append(f"email:{email_kind}")
+
+    digits = _NON_DIGITS.sub("", str(rec.get("Mobile") or rec.get("Phone") or ""))
+    phone_kind = "none" if not digits else "ok" if len(digits) >= 10 and len(set(digits[-10:])) > 1 else "invalid"
+    f.append(f"phone:{phone_kind}")
+    f.append(f"contact:{email_kind}/{phone_kind}")
+
+    name = str(rec.get("Full_Name") or rec.get("Last_Name") or "").strip()
+    f.append("name:none" if not name else "name:digits" if any(ch.isdigit() for ch in name)
+             else "name:single" if " " not in name else "name:full")
+    f.append("company:yes" if rec.get("Company") else "company:none")
+    description = str(rec.get("Description") or "")
+    f.append("description:none" if not description else "description:short" if len(description) < 40 else "description:long")
+    try:
+        revenue = float(rec.get("Annual_Revenue") or 0)
+    except (TypeError, ValueError):
+        revenue = 0
+    f.append(f"revenue:{int(np.log10(revenue)) if revenue >= 1 else 0}")
+
+    created = str(rec.get("Created_Time") or "")
+    if len(created) >= 13:
+        f.append(f"hour:{created[11:13]}")
+        try:
+            f.append(f"weekday:{datetime.fromisoformat(created[:10]).weekday()}")
+        except ValueError:
+            pass
+    for tag in rec.get("Tag") or []:
+        if isinstance(tag, dict) and tag.get("name"):
+            f.append(f"tag={tag['name'].lower()}")
+
+    source = str(rec.get("Lead_Source") or "unknown").lower()
+    f.append(f"source×email={source}/{email_kind}")
+    f.append(f"source×phone={source}/{phone_kind}")
+    return f
+
+def encode(records: list) -> np.ndarray:
+    """(records × MAX_FEATURES) int32 matrix of hashed feature slots, padded with PAD."""
+    idx = np.full((len(records), MAX_FEATURES), PAD, dtype=np.int32)
+    mask = PAD - 1
+    for i, rec in enumerate(records):
+        hashed = [zlib.crc32(s.encode()) & mask for s in features(rec)[:MAX_FEATURES]]
+        idx[i, :len(hashed)] = hashed
+    return idx
+
+def label(lead_status: str):
+    """1 = junk, 0 = worked (settled, not junk), None = still open."""
+    if lead_status in JUNK_STATUSES:
+        return 1
+    if not lead_status or lead_status in OPEN_STATUSES:
+        return None
+    return 0
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+def fit(idx: np.ndarray, y: np.ndarray, epochs: int = 4, batch_size: int = 4096, learning_rate: float = 0.1,
+        l2: float = 1e-6, seed: int = 42) -> dict:
+    """Logistic regression by mini-batch Adagrad over the hashed slots. Returns the model dict."""
+    weights = np.zeros(PAD + 1, dtype=np.float64)
+    accum = np.full(PAD + 1, 1e-8)
+    bias = float(np.log((y.mean() + 1e-6) / (1 - y.mean() + 1e-6)))
+    rng = np.random.default_rng(seed)
+    for _ in range(epochs):
+        order = rng.permutation(len(y))
+        for start in range(0, len(y), batch_size):
+            rows = order[start:start + batch_size]
+            batch = idx[rows]
+            err = _sigmoid(weights[batch].sum(axis=1) + bias) - y[rows]
+            grad = np.bincount(batch.ravel(), weights=np.repeat(err, batch.shape[1]), minlength=PAD + 1) / len(rows)
+            touched = np.unique(batch)
+            grad[touched] += l2 * weights[touched]
+            accum += grad ** 2
+            weights -= learning_rate * grad / np.sqrt(accum)
+            weights[PAD] = 0.0
+            bias -= learning_rate * float(err.mean())
+    return {"weights": weights.astype(np.float32), "bias": bias}
+
+def predict(model: dict, idx: np.ndarray) -> np.ndarray:
+    """P(junk) for each encoded lead."""
+    return _sigmoid(model["weights"][idx].sum(axis=1, dtype=np.float64) + model["bias"])
+
+def auc(y: np.ndarray, scores: np.ndarray) -> float:
+    """Area under the ROC curve (probability a random junk lead outscores a random worked one)."""
+    positives = int(y.sum())
+    negatives = len(y) - positives
+    if not positives or not negatives:
+        return float("nan")
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores, kind="mergesort")] = np.arange(1, len(scores) + 1)
+    return float((ranks[y == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+def save_model(model: dict, path: str, meta: dict):
+    """Atomic write, so a long-running process never loads a half-written model."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, weights=model["weights"], bias=np.float64(model["bias"]),
+                            meta=np.array(json.dumps({**meta, "hash_bits": HASH_BITS})))
+    os.replace(tmp_path, path)
+
+# path -> (file mtime, model or None)
+_loaded = {}
+
+def load_model(path: str):
+    """
+    The trained model saved at `path`, or None if there isn't one yet. The file is re-stat'ed on every
+    call and reloaded when it changes, so the scheduler and the push receiver pick up a retrained model.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        _loaded.pop(path, None)
+        return None
+    cached = _loaded.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("hash_bits") != HASH_BITS:
+                raise ValueError(f"trained with {meta.get('hash_bits')} hash bits, scorer uses {HASH_BITS}")
+            model = {"weights": data["weights"], "bias": float(data["bias"]), "meta": meta}
+    except (OSError, KeyError, ValueError) as e:
+        logging.warning(f"Ignoring lead scoring model {path}: {e}")
+        model = None
+    _loaded[path] = (mtime, model)
+    return model
+
+def score_records(model: dict, records: list) -> list:
+    """Junk scores (rounded to 4 places) for a batch of Zoho Lead payloads."""
+    if not records:
+        return []
+    return np.round(predict(model, encode(records)), 4).tolist()
@@ -0,0 +1,54 @@
+import os
+import re
+import json
+
+# ─────────────────────────────────────────────────────────────
+# MULTI-ORG CONFIGURATION
+# orgs.json lists one entry per franchise org. Every key except `name` / `enabled`
+# is an environment override applied in that org's own process before core.config
+# is imported, so Config, the Supabase/Zoho clients and every cache bind to that
+# org alone. Values may reference the environment as ${VAR} to keep secrets in .env.
+# Deliberately free of core.config: Config validates one org's credentials on import.
+# ─────────────────────────────────────────────────────────────
+
+# Each org must bring its own credentials — never inherit another org's from .env
+REQUIRED_KEYS = ["ZOHO_CLIENT_ID", "ZOHO_CLIENT_SECRET", "ZOHO_REFRESH_TOKEN", "SUPABASE_URL", "SUPABASE_KEY"]
+# ...and, when it sends a daily briefing, its own recipient, so one franchise's CEO never gets another's
+BRIEFING_REQUIRED_KEYS = ["TARGET_WHATSAPP_NUMBER"]
+
+# Org names become lock and log file names
+_NAME_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+_ENV_REFERENCE = re.compile(r"\$\{(\w+)\}")
+
+def _resolve(value, org_name: str, key: str) -> str:
+    def lookup(match):
+        if match.group(1) not in os.environ:
+            raise ValueError(f"Org '{org_name}': {key} references ${{{match.group(1)}}}, which is not set.")
+        return os.environ[match.group(1)]
+    return _ENV_REFERENCE.sub(lookup, str(value))
+
+def load_orgs(path: str, briefing: bool = True) -> list:
+    """
+    Reads the orgs file into [{"name", "env"}] for every enabled org. Raises ValueError on a bad entry.
+    `briefing` (the daily mode) also requires each org's own WhatsApp recipient.
+    """
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f).get("orgs", [])
+
+    orgs, seen = [], set()
+    for entry in entries:
+        name = str(entry.get("name", ""))
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid org name '{name}' in {path}: use lowercase letters, digits, '-' and '_'.")
+        if name in seen:
+            raise ValueError(f"Duplicate org name '{name}' in {path}.")
+        seen.add(name)
+        if entry.get("enabled", True) is False:
+            continue
+
+        env = {key: _resolve(value, name, key) for key, value in entry.items() if key not in ("name", "enabled")}
+        missing = [key for key in REQUIRED_KEYS + (BRIEFING_REQUIRED_KEYS if briefing else []) if not env.get(key)]
+        if missing:
+            raise ValueError(f"Org '{name}' is missing {', '.join(missing)} in {path}.")
+        orgs.append({"name": name, "env": env})
+    return orgs
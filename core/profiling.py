@@ -0,0 +1,96 @@
+import os
+import json
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+# ─────────────────────────────────────────────────────────────
+# DASHBOARD RENDER PROFILER
+# Times each (tab, section, phase) block of a Streamlit rerun — data load,
+# DataFrame construction, figure building — with peak memory and payload size.
+# Disabled profilers cost one attribute check per block.
+# ─────────────────────────────────────────────────────────────
+
+PROFILE_DIR = os.environ.get("DASHBOARD_PROFILE_DIR", "profiles")
+
+# True while tracemalloc runs because a profiler turned it on (not because the process was started with it)
+_tracing_started = False
+
+class _Block:
+    """Handle yielded to the profiled block; set `payload` to the object whose size should be reported."""
+    __slots__ = ("payload",)
+
+    def __init__(self):
+        self.payload = None
+
+def payload_size(obj) -> int:
+    """Best-effort in-memory / serialized size in bytes of a DataFrame, Plotly figure or JSON-like value."""
+    if obj is None:
+        return 0
+    if hasattr(obj, "memory_usage"):            # pandas DataFrame
+        return int(obj.memory_usage(deep=True).sum())
+    if hasattr(obj, "to_plotly_json"):          # Plotly figure
+        return len(obj.to_json())
+    try:
+        return len(json.dumps(obj, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+class RenderProfiler:
+    """Collects one row per profiled block of the current rerun."""
+
+    def __init__(self, enabled: bool = False):
+        global _tracing_started
+        self.enabled = enabled
+        self.rows = []
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        elif not enabled and _tracing_started:
+            # Tracing every allocation slows the whole process; stop once the toggle is switched off
+            tracemalloc.stop()
+            _tracing_started = False
+
+    @contextmanager
+    def section(self, tab: str, section: str, phase: str):
+        block = _Block()
+        if not self.enabled:
+            yield block
+            return
+        tracemalloc.reset_peak()
+        mem_start = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        try:
+            yield block
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            peak = tracemalloc.get_traced_memory()[1]
+            self.rows.append({
+                "Tab": tab,
+                "Section": section,
+                "Phase": phase,
+                "Time (ms)": round(elapsed_ms, 2),
+                "Peak Mem (KB)": round(max(peak - mem_start, 0) / 1024, 1),
+                "Payload (KB)": round(payload_size(block.payload) / 1024, 1),
+            })
+
+    def total_ms(self) -> float:
+        return sum(r["Time (ms)"] for r in self.rows)
+
+class RerunProfile:
+    """Wraps exactly one script rerun in cProfile and dumps a .pstats file when stopped."""
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+
+    def start(self):
+        self._profile.enable()
+
+    def stop(self) -> str:
+        self._profile.disable()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"dashboard_rerun_{datetime.now().strftime('%Y%m%dT%H%M%S')}.pstats")
+        self._profile.dump_stats(path)
+        return path
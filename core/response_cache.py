@@ -0,0 +1,42 @@
+import os
+import hashlib
+
+# ─────────────────────────────────────────────────────────────
+# LLM RESPONSE CACHE
+# One file per (model, temperature, prompt) fingerprint. A re-run over the same
+# inputs — e.g. a briefing backfill resumed after an interruption — serves
+# finished generations from disk instead of repeating minutes of inference.
+# ─────────────────────────────────────────────────────────────
+
+class ResponseCache:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.txt")
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                value = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: str):
+        """Atomic write, so concurrent workers or a killed run never leave a partial entry."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(value)
+        os.replace(tmp_path, path)
@@ -0,0 +1,93 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+# ─────────────────────────────────────────────────────────────
+# SINGLE-FLIGHT LOCK
+# Guarantees at most one sync runs at a time — across threads of the scheduler and
+# across processes (a cron-launched run_daily_sync.py next to the daemon). The lock
+# file is created atomically (O_EXCL); a file older than `stale_after_s` is assumed
+# to belong to a crashed run and is taken over. `wait_s` lets a caller wait out a short
+# holder (a push-notification flush) instead of skipping straight away.
+# ─────────────────────────────────────────────────────────────
+
+class LockHeld(RuntimeError):
+    """Raised when another run already holds the lock."""
+
+class SingleFlightLock:
+    def __init__(self, path: str, stale_after_s: float = 2 * 3600, wait_s: float = 0, retry_s: float = 1.0):
+        self.path = path
+        self.stale_after_s = stale_after_s
+        self.wait_s = wait_s
+        self.retry_s = retry_s
+        self._thread_lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Returns True if this caller now holds the lock, retrying a held lock for up to `wait_s` seconds."""
+        deadline = time.monotonic() + self.wait_s
+        while not self._try_acquire():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.retry_s)
+        return True
+
+    def _try_acquire(self) -> bool:
+        if not self._thread_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._create() or (self._is_stale() and self._take_over()):
+                return True
+        except OSError:
+            pass
+        self._thread_lock.release()
+        return False
+
+    def release(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        finally:
+            self._thread_lock.release()
+
+    def holder(self) -> dict:
+        """Who holds the lock: {"pid", "since"}, or {} when it is free or unreadable."""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def __enter__(self):
+        if not self.acquire():
+            raise LockHeld(f"Another sync holds {self.path} ({self.holder() or 'unknown holder'})")
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+    def _create(self) -> bool:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"pid": os.getpid(), "since": datetime.now().isoformat()}, f)
+        return True
+
+    def _is_stale(self) -> bool:
+        try:
+            return time.time() - os.path.getmtime(self.path) > self.stale_after_s
+        except FileNotFoundError:
+            return True
+
+    def _take_over(self) -> bool:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        return self._create()
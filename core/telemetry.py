@@ -0,0 +1,146 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# ─────────────────────────────────────────────────────────────
+# STAGE-LEVEL PIPELINE TELEMETRY
+# A run collects one span per stage (token, fetch page, map, upsert chunk,
+# analytics RPC, LLM prefill/generation, WhatsApp send). Services record into
+# the active run; when no run is active every call is a cheap no-op.
+# ─────────────────────────────────────────────────────────────
+
+class RunRecorder:
+    """Collects stage spans for one pipeline run. Thread-safe."""
+
+    def __init__(self, run_id: str = None):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.started_at = datetime.now().isoformat()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, label: str = None, duration_ms: float = 0.0, records: int = 0,
+               bytes_: int = 0, status: str = "OK", error: str = None, started_at: str = None):
+        """Appends a finished span (used directly when the duration is reported by a third party, e.g. Ollama)."""
+        span = {
+            "run_id": self.run_id,
+            "stage": stage,
+            "label": label or stage,
+            "started_at": started_at or datetime.now().isoformat(),
+            "duration_ms": round(duration_ms, 2),
+            "records": int(records or 0),
+            "bytes": int(bytes_ or 0),
+            "status": status,
+            "error": error,
+        }
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, stage: str, label: str = None):
+        """
+        Times the enclosed block. The yielded dict can be filled with `records`, `bytes`
+        or `status`/`error` by the caller; exceptions mark the span as ERROR and re-raise.
+        """
+        info = {"records": 0, "bytes": 0, "status": "OK", "error": None}
+        started_at = datetime.now().isoformat()
+        t0 = time.perf_counter()
+        try:
+            yield info
+        except Exception as e:
+            info["status"] = "ERROR"
+            info["error"] = str(e)[:500]
+            raise
+        finally:
+            self.record(stage, label, (time.perf_counter() - t0) * 1000, info["records"],
+                        info["bytes"], info["status"], info["error"], started_at)
+
+    @property
+    def has_errors(self) -> bool:
+        return any(s["status"] != "OK" for s in self.spans)
+
+    def stage_totals(self) -> dict:
+        """Aggregates spans per stage: {stage: {duration_ms, records, bytes, errors, spans}}."""
+        totals = {}
+        for s in self.spans:
+            t = totals.setdefault(s["stage"], {"duration_ms": 0.0, "records": 0, "bytes": 0, "errors": 0, "spans": 0})
+            t["duration_ms"] += s["duration_ms"]
+            t["records"] += s["records"]
+            t["bytes"] += s["bytes"]
+            t["errors"] += s["status"] != "OK"
+            t["spans"] += 1
+        return totals
+
+    def write_prometheus_textfile(self, path: str):
+        """Writes per-stage gauges in the node_exporter textfile-collector format (atomic replace)."""
+        lines = []
+        metrics = [
+            ("crm_sync_stage_duration_seconds", "Wall time spent in each pipeline stage during the last run.", "duration_ms", 1 / 1000),
+            ("crm_sync_stage_records", "Records (or tokens for LLM stages) processed per stage during the last run.", "records", 1),
+            ("crm_sync_stage_bytes", "Bytes transferred per stage during the last run.", "bytes", 1),
+            ("crm_sync_stage_errors", "Failed spans per stage during the last run.", "errors", 1),
+        ]
+        totals = self.stage_totals()
+        for name, help_text, key, scale in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for stage, t in sorted(totals.items()):
+                lines.append(f'{name}{{stage="{stage}"}} {t[key] * scale:g}')
+        lines.append("# HELP crm_sync_last_run_timestamp_seconds Unix time the last run finished.")
+        lines.append("# TYPE crm_sync_last_run_timestamp_seconds gauge")
+        lines.append(f"crm_sync_last_run_timestamp_seconds {time.time():.0f}")
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+class _NullSpan:
+    """Stand-in used when no run is active, so instrumented code never has to branch."""
+
+    @contextmanager
+    def span(self, stage, label=None):
+        yield {"records": 0, "bytes": 0, "status": "OK", "error": None}
+
+    def record(self, *args, **kwargs):
+        return None
+
+_NULL = _NullSpan()
+_active_run = None
+_last_run = None
+
+def start_run(run_id: str = None) -> RunRecorder:
+    """Starts a new run; subsequent `span`/`record` calls from any thread land in it."""
+    global _active_run
+    _active_run = RunRecorder(run_id)
+    return _active_run
+
+def end_run():
+    """Detaches the active run and returns it."""
+    global _active_run, _last_run
+    run, _active_run = _active_run, None
+    _last_run = run or _last_run
+    return run
+
+def last_run():
+    """The most recently ended run — for callers whose entry point starts and ends its own run."""
+    return _last_run
+
+def current_run():
+    return _active_run
+
+def span(stage: str, label: str = None):
+    return (_active_run or _NULL).span(stage, label)
+
+def record(stage: str, label: str = None, **kwargs):
+    return (_active_run or _NULL).record(stage, label, **kwargs)
+
+def log_stage_summary(run: RunRecorder):
+    """Prints a compact per-stage table for the job console."""
+    for stage, t in run.stage_totals().items():
+        logging.info(f"⏱️  {stage:<14} {t['duration_ms'] / 1000:8.2f}s  records={t['records']:<8} "
+                     f"bytes={t['bytes']:<10} errors={t['errors']}")
@@ -0,0 +1,39 @@
+import argparse
+from core.config import Config
+from services import database_client
+
+# ─────────────────────────────────────────────────────────────
+# COLD ARCHIVAL OF OLD raw_data PAYLOADS
+# Moves full Zoho payloads of Leads/Deals created more than N months ago into the lz4-compressed
+# crm_raw_archive table (see supabase_partitioning.sql). Typed columns and promoted cf_ fields stay
+# in the hot tables. Runs in batches so no single RPC approaches the statement timeout.
+# ─────────────────────────────────────────────────────────────
+
+def archive_old_payloads(months: int, batch_size: int, max_batches: int = None) -> dict:
+    """Calls archive_raw_data until a batch moves nothing. Returns total rows moved per module."""
+    totals = {}
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = database_client.archive_raw_data(months=months, batch_size=batch_size)
+        moved = result.get("moved", {})
+        batches += 1
+        for module, count in moved.items():
+            totals[module] = totals.get(module, 0) + count
+        print(f"📦 Batch {batches}: {', '.join(f'{m} {c:,}' for m, c in moved.items())} (created before {result.get('cutoff')})")
+        if not any(moved.values()):
+            break
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move old Leads/Deals raw_data into the compressed cold archive.")
+    parser.add_argument("--months", type=int, default=Config.ARCHIVE_AFTER_MONTHS, help="Archive records created more than this many months ago.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per module per RPC call.")
+    parser.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches (for off-peak windows).")
+    args = parser.parse_args(argv)
+
+    print(f"🧊 Archiving raw_data older than {args.months} months...")
+    totals = archive_old_payloads(args.months, args.batch_size, args.max_batches)
+    print(f"✅ Archived {sum(totals.values()):,} payload(s): {totals or 'nothing to do'}")
+
+if __name__ == "__main__":
+    main()
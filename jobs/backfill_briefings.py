@@ -0,0 +1,119 @@
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+from core.config import Config
+from core import telemetry
+from core.response_cache import ResponseCache
+from services import database_client
+from ai_agents.analyst_agent import get_executive_summary, extract_dashboard_report
+from jobs.run_daily_sync import assemble_ai_payload
+
+# ─────────────────────────────────────────────────────────────
+# HISTORICAL BRIEFING BACKFILL
+# 1. One get_advanced_analytics_range RPC computes every day's payload
+# 2. A bounded worker queue keeps exactly `workers` LLM generations in flight
+# 3. Finished generations are cached on disk, so a re-run resumes instead of repeating
+# 4. Briefings are upserted in bulk every FLUSH_EVERY days
+# Dashboard briefings only — nothing is sent to WhatsApp.
+# ─────────────────────────────────────────────────────────────
+
+# Upsert after this many finished days, so an interrupted overnight run keeps its progress
+FLUSH_EVERY = 25
+# get_advanced_analytics_range caps a single call at 731 days
+MAX_RANGE_DAYS = 731
+
+def _date_range(start: date, end: date):
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+def load_payloads(start: date, end: date, report_dates: set) -> dict:
+    """Builds {report_date: ai_payload} from as few range RPCs as possible."""
+    payloads = {}
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, chunk_start + timedelta(days=MAX_RANGE_DAYS - 1))
+        with telemetry.span("rpc", f"get_advanced_analytics_range {chunk_start}..{chunk_end}") as span:
+            by_day = database_client.get_advanced_analytics_range(chunk_start.isoformat(), chunk_end.isoformat())
+            span["records"] = len(by_day)
+        for report_date, analytics in by_day.items():
+            if report_date in report_dates:
+                # The range RPC carries the period-stats and won/lost fields alongside the analytics
+                payloads[report_date] = assemble_ai_payload(report_date, analytics, analytics, analytics)
+        chunk_start = chunk_end + timedelta(days=1)
+    return payloads
+
+def backfill_briefings(start: date, end: date, workers: int = 2, overwrite: bool = False,
+                       model_name: str = "llama3.2") -> dict:
+    """Generates and stores dashboard briefings for every date in [start, end]. Returns a summary dict."""
+    report_dates = _date_range(start, end)
+    if not overwrite:
+        existing = set(database_client.get_briefing_dates_between(start.isoformat(), end.isoformat()))
+        report_dates = [d for d in report_dates if d not in existing]
+    print(f"🗓️  {len(report_dates)} date(s) to backfill between {start} and {end}"
+          f"{'' if overwrite else ' (existing briefings kept)'}.")
+    if not report_dates:
+        return {"stored": 0, "failed": [], "cache_hits": 0}
+
+    t0 = time.perf_counter()
+    payloads = load_payloads(start, end, set(report_dates))
+    print(f"📐 Payloads for {len(payloads)} day(s) computed in {time.perf_counter() - t0:.1f}s (batched RPC).")
+
+    cache = ResponseCache(Config.LLM_CACHE_DIR)
+    queue = iter(sorted(payloads.items()))
+    in_flight, finished_md, failed = {}, {}, []
+    stored = 0
+
+    def submit_next(pool):
+        for report_date, payload in queue:
+            in_flight[pool.submit(get_executive_summary, payload, model_name, cache=cache)] = report_date
+            return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backfill-llm") as pool:
+        for _ in range(workers):
+            submit_next(pool)
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                report_date = in_flight.pop(future)
+                summary = future.result()
+                if summary:
+                    finished_md[report_date] = extract_dashboard_report(summary)
+                else:
+                    failed.append(report_date)
+                submit_next(pool)
+            if len(finished_md) >= FLUSH_EVERY or (finished_md and not in_flight):
+                database_client.log_ai_briefings_bulk(finished_md)
+                stored += len(finished_md)
+                finished_md = {}
+                print(f"✅ {stored}/{len(payloads)} briefings stored "
+                      f"({cache.hits} from cache, {time.perf_counter() - t0:.0f}s elapsed)")
+
+    return {"stored": stored, "failed": sorted(failed), "cache_hits": cache.hits,
+            "elapsed_s": round(time.perf_counter() - t0, 1)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate AI dashboard briefings for a historical date range.")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First report date (YYYY-MM-DD).")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today() - timedelta(days=1),
+                        help="Last report date (default: yesterday).")
+    parser.add_argument("--workers", type=int, default=Config.BACKFILL_WORKERS,
+                        help="Concurrent LLM generations; match OLLAMA_NUM_PARALLEL.")
+    parser.add_argument("--overwrite", action="store_true", help="Regenerate dates that already have a briefing.")
+    parser.add_argument("--model", default="llama3.2")
+    args = parser.parse_args(argv)
+    if args.end < args.start:
+        parser.error("--end must not be before --start")
+
+    run = telemetry.start_run()
+    try:
+        result = backfill_briefings(args.start, args.end, max(1, args.workers), args.overwrite, args.model)
+    finally:
+        telemetry.end_run()
+        telemetry.log_stage_summary(run)
+    if result["failed"]:
+        print(f"⚠️ {len(result['failed'])} date(s) failed and can be retried by re-running: {', '.join(result['failed'][:10])}"
+              f"{' …' if len(result['failed']) > 10 else ''}")
+    print(f"🏁 Backfill finished: {result['stored']} stored, {result['cache_hits']} served from the LLM cache.")
+
+if __name__ == "__main__":
+    main()
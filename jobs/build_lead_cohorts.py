@@ -0,0 +1,38 @@
+import argparse
+from services import database_client
+
+# ─────────────────────────────────────────────────────────────
+# LEAD COHORT BACKFILL
+# The sync keeps lead_cohorts current for every Leads / Deals / Contacts chunk it upserts. This job
+# places the leads that were stored before that (or after TRUNCATE lead_conversions, lead_cohorts,
+# to rebuild the matrix from scratch). Walks leads_raw in id order, one RPC per batch. Conversions
+# follow prospect clusters, so run jobs/resolve_prospects.py first.
+# ─────────────────────────────────────────────────────────────
+
+def backfill(batch_size: int) -> dict:
+    """Calls backfill_lead_cohorts until every lead is placed. Returns {"leads", "converted"}."""
+    after_id, batches = "", 0
+    totals = {"leads": 0, "converted": 0}
+    while True:
+        result = database_client.backfill_lead_cohorts(after_id=after_id, batch_size=batch_size)
+        if not result.get("leads") and result.get("last_id", after_id) == after_id:
+            break
+        batches += 1
+        after_id = result["last_id"]
+        totals["leads"] += result.get("leads", 0)
+        totals["converted"] += result.get("converted", 0)
+        print(f"📅 Batch {batches}: {totals['leads']:,} lead(s) placed, {totals['converted']:,} converted so far (up to id {after_id})")
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Place stored leads into the weekly conversion cohorts.")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Leads per RPC call.")
+    args = parser.parse_args(argv)
+
+    print("📊 Building lead cohorts...")
+    totals = backfill(args.batch_size)
+    # Leads that share a prospect are re-placed with each batch that touches them, so counts can exceed the lead total
+    print(f"✅ {totals['leads']:,} lead placement(s), {totals['converted']:,} with a deal")
+
+if __name__ == "__main__":
+    main()
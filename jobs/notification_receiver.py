@@ -0,0 +1,105 @@
+import time
+import signal
+import argparse
+import threading
+from core.config import Config
+from core.single_flight import SingleFlightLock
+from services import database_client
+from services.zoho_client import get_access_token, fetch_records_by_ids, enable_notifications, SYNC_MODULES
+from services.zoho_notifications import NotificationReceiver, is_loopback
+
+# ─────────────────────────────────────────────────────────────
+# PUSH INGEST DAEMON
+# Receives Zoho Notification API events, coalesces record IDs for NOTIFY_WINDOW_SECONDS,
+# then fetches just those records (100 IDs per request) and upserts them. Polling
+# (run_daily_sync.py / scheduler.py) stays in place as the reconciliation pass for
+# anything a notification missed. Each flush holds the same SYNC_LOCK_PATH lock as the
+# poll, so a push batch and a polling sync never interleave their fetches and upserts.
+# ─────────────────────────────────────────────────────────────
+
+# Zoho expires watch channels; renew well inside the 24h expiry we request
+CHANNEL_RENEW_HOURS = 20
+
+# How often a batch that found a polling sync running checks for the lock again
+LOCK_RETRY_SECONDS = 1.0
+
+_sync_lock = SingleFlightLock(Config.SYNC_LOCK_PATH)
+
+def _acquire_sync_lock():
+    """
+    Blocks until no polling sync holds SYNC_LOCK_PATH, then holds it. The batch waits rather than
+    being dropped: a poll that fetched before this change may upsert an older copy of the record,
+    and its log_sync then moves past the change, so no later poll would repair it.
+    """
+    if _sync_lock.acquire():
+        return
+    print(f"⏳ Sync in progress ({_sync_lock.holder() or 'unknown holder'}) — push batch waits for it.")
+    while not _sync_lock.acquire():
+        time.sleep(LOCK_RETRY_SECONDS)
+
+def flush_to_database(batch: dict):
+    """Fetches one coalesced batch of {module: [record_ids]} from Zoho and upserts it under the sync lock."""
+    _acquire_sync_lock()
+    try:
+        _flush_batch(batch)
+    finally:
+        _sync_lock.release()
+
+def _flush_batch(batch: dict):
+    t0 = time.perf_counter()
+    token = get_access_token()
+    if not token:
+        raise RuntimeError("Zoho authentication failed")
+
+    synced = {}
+    for module, ids in batch.items():
+        records = fetch_records_by_ids(token, module, ids)
+        if records:
+            database_client.upsert_module_data(module, records)
+        synced[module] = len(records)
+    # Deliberately no log_sync(): its timestamp is the If-Modified-Since of the next poll,
+    # and advancing it here would hide any change whose notification never arrived.
+    summary = ", ".join(f"{m} {n}/{len(batch[m])}" for m, n in synced.items())
+    print(f"📥 Push batch upserted ({summary}) in {time.perf_counter() - t0:.2f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zoho Notification API receiver (push ingest).")
+    parser.add_argument("--host", default=Config.NOTIFY_HOST,
+                        help="Interface to bind; anything but loopback requires ZOHO_NOTIFY_TOKEN.")
+    parser.add_argument("--port", type=int, default=Config.NOTIFY_PORT)
+    parser.add_argument("--window-seconds", type=float, default=Config.NOTIFY_WINDOW_SECONDS,
+                        help="How long to coalesce change events before one bulk fetch.")
+    parser.add_argument("--subscribe", action="store_true",
+                        help="Register (and keep renewing) the Zoho watch channel for ZOHO_NOTIFY_URL.")
+    args = parser.parse_args(argv)
+
+    if args.subscribe and not (Config.ZOHO_NOTIFY_URL and Config.ZOHO_NOTIFY_TOKEN):
+        parser.error("--subscribe needs ZOHO_NOTIFY_URL and ZOHO_NOTIFY_TOKEN in .env")
+    if not Config.ZOHO_NOTIFY_TOKEN and not is_loopback(args.host):
+        parser.error(f"listening on {args.host} needs ZOHO_NOTIFY_TOKEN in .env (or --host 127.0.0.1 for local testing)")
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop_event.set())
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+
+    receiver = NotificationReceiver(flush_to_database, SYNC_MODULES, args.window_seconds,
+                                    host=args.host, port=args.port, token=Config.ZOHO_NOTIFY_TOKEN)
+    with receiver:
+        print("========================================")
+        print(f"📡 Listening for Zoho notifications on {args.host}:{args.port} (window {args.window_seconds:g}s)")
+        print("========================================")
+        while not stop_event.is_set():
+            wait_s = CHANNEL_RENEW_HOURS * 3600
+            if args.subscribe:
+                token = get_access_token()
+                if not token or not enable_notifications(token, Config.ZOHO_NOTIFY_URL, Config.ZOHO_NOTIFY_CHANNEL_ID,
+                                                         SYNC_MODULES, Config.ZOHO_NOTIFY_TOKEN, expiry_hours=24):
+                    print("⚠️ Watch channel not active (retrying in 5 min); the scheduled poll still keeps Supabase current.")
+                    wait_s = 300
+            stop_event.wait(wait_s)
+        print("\n🛑 Stopping — flushing buffered events...")
+    print(f"👋 Receiver stopped. {receiver.buffer.stats}")
+
+if __name__ == "__main__":
+    main()
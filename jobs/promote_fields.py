@@ -0,0 +1,87 @@
+import re
+import sys
+import json
+import argparse
+from core.config import Config
+
+# ─────────────────────────────────────────────────────────────
+# CUSTOM FIELD PROMOTION — DDL GENERATOR
+# Reads promoted_fields.json ({"Leads": {"City": "text", ...}, ...}) and writes the SQL
+# that adds one STORED generated column + btree index per field, computed by Postgres
+# from raw_data on every upsert. Paste the output into the Supabase SQL Editor.
+# Nested lookups use a dotted path, e.g. "Product.name".
+# ─────────────────────────────────────────────────────────────
+
+MODULE_TABLES = {"Leads": "leads_raw", "Deals": "crm_deals", "Contacts": "crm_contacts", "Accounts": "crm_accounts"}
+
+# Casts are guarded by jsonb_typeof so one malformed record can never fail an upsert
+TYPE_EXPRESSIONS = {
+    "text":    ("TEXT",    "{value}"),
+    "numeric": ("NUMERIC", "CASE WHEN jsonb_typeof({json}) = 'number' THEN ({value})::numeric END"),
+    "boolean": ("BOOLEAN", "CASE WHEN jsonb_typeof({json}) = 'boolean' THEN ({value})::boolean END"),
+}
+
+FIELD_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9_]*(\.[A-Za-z][A-Za-z0-9_]*)*$")
+
+def load_promoted_fields(path: str = None) -> dict:
+    """Returns {module: {field: type}} after validating module names, field paths and types."""
+    with open(path or Config.PROMOTED_FIELDS_FILE, encoding="utf-8") as f:
+        spec = json.load(f)
+    for module, fields in spec.items():
+        if module not in MODULE_TABLES:
+            raise ValueError(f"Unknown module '{module}'. Expected one of: {', '.join(MODULE_TABLES)}")
+        for field, data_type in fields.items():
+            if not FIELD_PATTERN.match(field):
+                raise ValueError(f"Invalid field path '{field}' in {module}")
+            if data_type not in TYPE_EXPRESSIONS:
+                raise ValueError(f"Unsupported type '{data_type}' for {module}.{field}. Use: {', '.join(TYPE_EXPRESSIONS)}")
+    return spec
+
+def column_name(field: str) -> str:
+    """Zoho field path → promoted column, e.g. "Product.name" → "cf_product_name"."""
+    return "cf_" + field.replace(".", "_").lower()
+
+def field_ddl(module: str, field: str, data_type: str) -> str:
+    table = MODULE_TABLES[module]
+    column = column_name(field)
+    path = "{" + ",".join(field.split(".")) + "}"
+    sql_type, template = TYPE_EXPRESSIONS[data_type]
+    expression = template.format(json=f"(raw_data #> '{path}')", value=f"(raw_data #>> '{path}')")
+    return "\n".join([
+        f"-- {module}.{field} ({data_type})",
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {sql_type} GENERATED ALWAYS AS ({expression}) STORED;",
+        f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column});",
+        f"INSERT INTO promoted_fields (module, field, column_name, data_type) VALUES ('{module}', '{field}', '{column}', '{data_type}')",
+        "    ON CONFLICT (module, field) DO UPDATE SET column_name = EXCLUDED.column_name, data_type = EXCLUDED.data_type;",
+    ])
+
+def generate_sql(spec: dict) -> str:
+    blocks = [
+        "-- Generated by jobs/promote_fields.py — do not edit by hand.\n"
+        "-- Adding a STORED generated column rewrites the table once; run outside business hours on large tables."
+    ]
+    for module, fields in spec.items():
+        for field, data_type in fields.items():
+            blocks.append(field_ddl(module, field, data_type))
+    # PostgREST caches column lists; make the new columns visible immediately
+    blocks.append("NOTIFY pgrst, 'reload schema';")
+    return "\n\n".join(blocks) + "\n"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate SQL that promotes custom Zoho fields to indexed columns.")
+    parser.add_argument("--spec", default=None, help="Path to the promoted fields JSON (default: PROMOTED_FIELDS_FILE).")
+    parser.add_argument("--output", default="promoted_fields.sql", help="Where to write the SQL ('-' for stdout).")
+    args = parser.parse_args(argv)
+
+    spec = load_promoted_fields(args.spec)
+    sql = generate_sql(spec)
+    if args.output == "-":
+        sys.stdout.write(sql)
+        return
+    with open(args.output, "w", encoding="utf-8") as f:
+        f.write(sql)
+    total = sum(len(fields) for fields in spec.values())
+    print(f"✅ Wrote {total} promoted field(s) to {args.output} — paste it into the Supabase SQL Editor and Run.")
+
+if __name__ == "__main__":
+    main()
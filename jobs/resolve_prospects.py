@@ -0,0 +1,45 @@
+import argparse
+from services import database_client
+
+# ─────────────────────────────────────────────────────────────
+# PROSPECT CLUSTER BACKFILL
+# The sync resolves each Leads / Contacts upsert chunk as it lands. This job resolves the
+# records that were stored before that (or after TRUNCATE prospect_keys, prospect_clusters,
+# to rebuild clusters from scratch). Walks each module in id order, one RPC per batch, so no
+# call approaches the statement timeout. Run it before archive_raw_data.py: archived rows
+# keep only their promoted fields, so their emails and phones can no longer be read.
+# ─────────────────────────────────────────────────────────────
+
+MODULES = ["Leads", "Contacts"]
+
+def backfill(modules: list, batch_size: int) -> dict:
+    """Calls backfill_prospects until each module is exhausted. Returns {module: {"records", "clusters_merged"}}."""
+    totals = {}
+    for module in modules:
+        after_id, batches = "", 0
+        done = totals[module] = {"records": 0, "clusters_merged": 0}
+        while True:
+            result = database_client.backfill_prospects(module, after_id=after_id, batch_size=batch_size)
+            if not result.get("records") and result.get("last_id", after_id) == after_id:
+                break
+            batches += 1
+            after_id = result["last_id"]
+            done["records"] += result.get("records", 0)
+            done["clusters_merged"] += result.get("clusters_merged", 0)
+            print(f"🔗 {module} batch {batches}: {done['records']:,} resolved, "
+                  f"{done['clusters_merged']:,} cluster merge(s) so far (up to id {after_id})")
+    return totals
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve stored Leads / Contacts into prospect clusters.")
+    parser.add_argument("--module", choices=MODULES, help="Only this module (default: Leads, then Contacts).")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Records per RPC call.")
+    args = parser.parse_args(argv)
+
+    print("🧩 Resolving duplicate leads and lead ↔ contact matches...")
+    totals = backfill([args.module] if args.module else MODULES, args.batch_size)
+    for module, t in totals.items():
+        print(f"✅ {module}: {t['records']:,} record(s) resolved, {t['clusters_merged']:,} cluster merge(s)")
+
+if __name__ == "__main__":
+    main()
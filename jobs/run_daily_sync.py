@@ -1,10 +1,17 @@
+import os
 from datetime import datetime
-from services.zoho_client import get_access_token, fetch_incremental_module
-from ai_agents.analyst_agent import get_executive_summary
-from services import database_client
+from services.zoho_client import get_access_token, iter_incremental_module, SYNC_MODULES
+from ai_agents.analyst_agent import get_executive_summary, get_whatsapp_narrative, extract_dashboard_report
+from ai_agents.whatsapp_report import render_whatsapp_report
+from jobs.run_rep_briefings import run_rep_briefings
+from services import database_client, async_database_client
 from services.whatsapp_client import send_whatsapp_message
-import json
-import re
+from core.config import Config
+from core import telemetry, fast_json, forecast
+from core.single_flight import SingleFlightLock, LockHeld
+
+# briefing_deliveries recipient of the CEO WhatsApp (schema.sql §14)
+CEO_RECIPIENT = "ceo"
 
 def build_ai_payload():
     """
@@ -14,14 +21,32 @@ def build_ai_payload():
     today = datetime.now().strftime("%Y-%m-%d")
     
     # Get True Analytics from Raw CRM Database
-    analytics = database_client.get_advanced_analytics(today)
-    period_stats = database_client.get_pipeline_period_stats()
-    won_lost = database_client.get_won_vs_lost()
-    
+    # The RPCs are independent, so fetch them concurrently
+    sections = async_database_client.fetch_sections(
+        analytics=async_database_client.get_advanced_analytics(today),
+        period_stats=async_database_client.get_pipeline_period_stats(),
+        won_lost=async_database_client.get_won_vs_lost(),
+        forecast_inputs=async_database_client.get_forecast_inputs(),
+        likely_junk=async_database_client.get_likely_junk_leads(today),
+    )
+    with telemetry.span("forecast") as forecast_span:
+        revenue_forecast = forecast.simulate(sections["forecast_inputs"])
+        forecast_span["records"] = revenue_forecast["forecast_deals"]
+    return assemble_ai_payload(today, sections["analytics"], sections["period_stats"], sections["won_lost"],
+                               revenue_forecast, sections["likely_junk"])
+
+def assemble_ai_payload(report_date: str, analytics: dict, period_stats: dict, won_lost: dict,
+                        revenue_forecast: dict = None, likely_junk: dict = None):
+    """
+    Shapes the analytics RPC results into the AI payload and appends the rule-based anomalies.
+    `revenue_forecast` (core.forecast.simulate) is omitted for past dates, whose open pipeline isn't known.
+    `likely_junk` (get_likely_junk_leads) is omitted until a lead scoring model has scored the day's leads.
+    """
     final_payload = {
-      "report_date": today,
+      "report_date": report_date,
       "daily_metrics": {
         "new_leads_yesterday": analytics['new_leads_today'],
+        "duplicate_new_leads": analytics.get('duplicate_leads_today', 0),
         "seven_day_lead_average": analytics['seven_day_avg'],
         "percent_change_leads": analytics['percent_change_leads'],
         "total_open_pipeline_value": f"₹{analytics.get('pipeline_value', 0):,}",
@@ -39,6 +64,15 @@ def build_ai_payload():
         "Historical database initialized. Incremental syncs logic tracking active."
       ]
     }
+    if revenue_forecast:
+        final_payload["revenue_forecast"] = forecast.payload_section(revenue_forecast)
+    if likely_junk and likely_junk.get('scored'):
+        final_payload["likely_junk_leads"] = {
+            "scored_new_leads": likely_junk['scored'],
+            "likely_junk": likely_junk.get('likely_junk', 0),
+            "by_source": likely_junk.get('by_source', {}),
+            "by_owner": likely_junk.get('by_owner', {}),
+        }
     
     # --- HARDCODED AI INSIGHT GENERATION (NO MATH REQUIRED BY LLM) ---
     rep_matrix = final_payload.get('rep_pipeline_matrix', {})
@@ -52,6 +86,24 @@ def build_ai_payload():
                 f"Recommendation: Immediately pause giving {rep} new leads and re-assign their existing pool."
             )
             
+    # Same-day leads sharing an email / phone are one prospect; the breakdowns already count them once
+    new_leads = analytics.get('new_leads_today', 0)
+    duplicates = analytics.get('duplicate_leads_today', 0)
+    if new_leads >= 10 and duplicates / new_leads >= 0.2:
+        final_payload["anomalies_detected_by_math"].append(
+            f"DUPLICATE LEADS: {duplicates} of {new_leads} new leads were repeat entries for a prospect already captured that day. "
+            "Recommendation: Check the lead forms and ad integrations for double submissions."
+        )
+
+    # Model scores flag junk before a rep has spent a call on it
+    flagged = final_payload.get('likely_junk_leads', {})
+    if flagged.get('scored_new_leads', 0) >= 10 and flagged['likely_junk'] / flagged['scored_new_leads'] >= 0.3:
+        top_source = next(iter(flagged['by_source']), 'Unknown')
+        final_payload["anomalies_detected_by_math"].append(
+            f"LIKELY JUNK: {flagged['likely_junk']} of {flagged['scored_new_leads']} new leads look like junk to the lead scoring model "
+            f"(most from '{top_source}'). Recommendation: Have reps verify these contacts before calling, and check '{top_source}' targeting."
+        )
+
     source_matrix = final_payload.get('source_quality_matrix', {})
     for source, data in source_matrix.items():
         junk_pct_str = data.get('junk_pct', '0%')
@@ -68,88 +120,186 @@ def build_ai_payload():
 
     return final_payload
 
-def run_daily_pipeline():
-    """Main Orchestrator: Incremental Fetch -> DB Upsert -> SQL Analytics -> AI Output"""
+def run_daily_pipeline() -> bool:
+    """
+    Main Orchestrator: Incremental Fetch -> DB Upsert -> SQL Analytics -> AI Output.
+    Returns True once the CEO briefing has been delivered to WhatsApp.
+    """
     print("========================================")
     print("🚀 STARTING: Production CRM Intelligence (Cloud)")
     print("========================================\n")
     
+    run = telemetry.start_run()
+    try:
+        return _run_pipeline_stages(run)
+    finally:
+        telemetry.end_run()
+        _persist_run_metrics(run)
+
+def run_incremental_sync():
+    """
+    Lightweight cycle: incremental fetch -> DB upsert -> sync log. No analytics, LLM or WhatsApp.
+    With TWO_TIER_SYNC only the typed columns are fetched and written; raw_data waits for the daily full pass.
+    """
+    light = Config.TWO_TIER_SYNC
+    print(f"\n🔁 Incremental {'light ' if light else ''}sync — {datetime.now().strftime('%H:%M:%S')}")
+    run = telemetry.start_run()
+    try:
+        return _sync_modules(run, light=light)
+    finally:
+        telemetry.end_run()
+        _persist_run_metrics(run)
+
+def _persist_run_metrics(run):
+    """Stores the run's stage spans and optionally exports them for Prometheus."""
+    telemetry.log_stage_summary(run)
+    try:
+        database_client.log_stage_metrics(run.spans)
+    except Exception as e:
+        print(f"⚠️ Could not persist stage metrics: {e}")
+    if Config.PROMETHEUS_TEXTFILE_PATH:
+        try:
+            run.write_prometheus_textfile(Config.PROMETHEUS_TEXTFILE_PATH)
+        except OSError as e:
+            print(f"⚠️ Could not write Prometheus textfile: {e}")
+
+def _run_pipeline_stages(run) -> bool:
+    """Runs every pipeline stage inside the given telemetry run. Returns whether the CEO briefing was delivered."""
+    return _sync_modules(run) and _generate_and_dispatch_briefing()
+
+def _sync_modules(run, light: bool = False) -> bool:
+    """
+    Fetches every module changed since the last sync and upserts it. Returns False if authentication failed.
+    `light` fetches only the typed-column fields and leaves raw_data as stored.
+    """
     # 1. Fetch live data incrementally
-    token = get_access_token()
+    with telemetry.span("token") as token_span:
+        token = get_access_token()
+        if not token:
+            token_span["status"] = "ERROR"
     if not token:
         print("❌ Pipeline failed at Authentication stage.")
-        return
+        return False
         
-    last_sync = database_client.get_last_sync_time()
+    # A full pass resumes from the last full sync, so raw_data catches up on everything light runs skipped
+    last_sync = database_client.get_last_sync_time(full_only=not light and Config.TWO_TIER_SYNC)
+
+    # New months need a partition before their first upsert, or rows land in the DEFAULT partition
+    if Config.CRM_PARTITIONED:
+        with telemetry.span("partitions"):
+            database_client.ensure_partitions()
     
-    modules_to_sync = ["Leads", "Deals", "Contacts", "Accounts"]
     total_records_synced = 0
     
-    for module in modules_to_sync:
-        records = fetch_incremental_module(token, module, last_sync)
-        if records:
-            print(f"\n⚙️  Upserting {len(records)} updated {module} into Supabase Cloud Pipeline Database...")
-            database_client.upsert_module_data(module, records)
-            total_records_synced += len(records)
+    for module in SYNC_MODULES:
+        # Pages stream from Zoho straight into chunked upserts; a module is never held in memory whole
+        fields = database_client.TYPED_COLUMN_FIELDS[module] if light else None
+        records = iter_incremental_module(token, module, last_sync, fields=fields)
+        synced = database_client.upsert_module_data(module, records, light=light)
+        if synced:
+            print(f"⚙️  Upserted {synced} updated {module} into Supabase Cloud Pipeline Database.")
+            total_records_synced += synced
         
     # Always log sync even if 0 new
-    database_client.log_sync(total_records_synced)
+    database_client.log_sync(total_records_synced, status="PARTIAL" if run.has_errors else "SUCCESS", run_id=run.run_id,
+                             sync_mode="light" if light else "full")
     print("✅ Incremental Omni-Sync Logged in Cloud.")
-    
+    return True
+
+def _store_payload(payload: dict, directory: str):
+    """Keeps the exact payload the LLM saw as <report_date>.json, the corpus benchmarks/llm.py replays."""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{payload.get('report_date')}.json"), "wb") as f:
+            f.write(fast_json.dumps(payload, indent=True))
+    except OSError as e:
+        print(f"⚠️ Could not store the AI payload for benchmarking: {e}")
+
+def _deliver_ceo_briefing(report_date: str, message: str) -> bool:
+    """Sends the CEO WhatsApp briefing and records its delivery for `report_date`."""
+    print("\n📱 Dispatching AI Briefing to WhatsApp...")
+    with telemetry.span("whatsapp") as wa_span:
+        wa_span["bytes"] = len(message.encode("utf-8"))
+        success = send_whatsapp_message(message)
+        if not success:
+            wa_span["status"] = "ERROR"
+    if success:
+        database_client.mark_briefing_delivered(report_date, CEO_RECIPIENT)
+        print("✅ Successfully delivered to WhatsApp.")
+    else:
+        print("❌ WhatsApp delivery failed. Check logs.")
+    return success
+
+def resend_ceo_briefing(report_date: str) -> bool:
+    """
+    Retries the CEO WhatsApp from the message stored for `report_date` — no sync, LLM or rep briefings.
+    Returns True once it has been delivered; False if it fails again or nothing was stored.
+    """
+    stored = database_client.get_briefing_deliveries(report_date).get(CEO_RECIPIENT)
+    if not stored:
+        return False
+    if stored["sent_at"]:
+        return True
+    return _deliver_ceo_briefing(report_date, stored["message"])
+
+def _generate_and_dispatch_briefing() -> bool:
+    """SQL analytics -> LLM briefing -> Supabase log -> WhatsApp. Returns whether the CEO WhatsApp went out."""
     # 3. Pull SQL analytics and Hand to AI
     print("\n🧠 Generating AI Payload from Pipeline DB...")
     payload = build_ai_payload()
-    print("Payload ready for AI:\n", json.dumps(payload, indent=2))
+    print("Payload ready for AI:\n", fast_json.dumps_str(payload, indent=True))
+    if Config.LLM_CORPUS_DIR:
+        _store_payload(payload, Config.LLM_CORPUS_DIR)
         
     print("\n🧠 Handing data to Llama 3.2 (Local Ollama)...")
     summary = get_executive_summary(payload)
         
     if summary:
+        dashboard_report = extract_dashboard_report(summary)
         print("\n========================================")
         print("         📢 DAILY BRIEFING READY        ")
         print("========================================")
-        print(summary)
+        print(dashboard_report)
         print("========================================\n")
         
-        import re
-        dashboard_match = re.search(r'<DASHBOARD_REPORT>\s*(.*?)\s*(?:</DASHBOARD_REPORT>|<WHATSAPP_REPORT>|$)', summary, re.DOTALL | re.IGNORECASE)
-        whatsapp_match = re.search(r'<WHATSAPP_REPORT>\s*(.*?)\s*(?:</WHATSAPP_REPORT>|$)', summary, re.DOTALL | re.IGNORECASE)
-        
-        dashboard_report = dashboard_match.group(1).strip() if dashboard_match else summary.replace('<DASHBOARD_REPORT>', '').replace('</DASHBOARD_REPORT>', '').strip()
-        
-        # Priority: Exact match -> Extract anything after tag -> Fallback to dashboard
-        if whatsapp_match:
-            whatsapp_report = whatsapp_match.group(1).strip()
-        elif "<WHATSAPP_REPORT>" in summary:
-            whatsapp_report = summary.split("<WHATSAPP_REPORT>")[-1].replace("</WHATSAPP_REPORT>", "").strip()
-        else:
-            whatsapp_report = dashboard_report
-            
-        # Clean stray tags if Llama 3.2 malformed them
-        whatsapp_report = re.sub(r'</?(DASHBOARD|WHATSAPP)_REPORT>', '', whatsapp_report).strip()
-        
         # Save to Cloud DB instead of local text file using the dashboard format
         database_client.log_ai_briefing(dashboard_report)
         print("✅ Dashboard Briefing securely logged to Supabase ai_briefings_log table.")
-        
-        # Hard cap at 1500 chars — Twilio WhatsApp limit is 1600
-        MAX_WA_CHARS = 1500
-        if len(whatsapp_report) > MAX_WA_CHARS:
-            # Truncate cleanly at the last newline before the limit
-            truncated = whatsapp_report[:MAX_WA_CHARS]
-            last_newline = truncated.rfind('\n')
-            whatsapp_report = truncated[:last_newline] if last_newline > 0 else truncated
-            whatsapp_report += "\n\n_(Report truncated to fit WhatsApp limit.)_"
-
-        # Dispatch to CEO via WhatsApp using the mobile format
-        print("\n📱 Dispatching AI Briefing to WhatsApp...")
-        success = send_whatsapp_message(whatsapp_report)
-        if success:
-            print("✅ Successfully delivered to WhatsApp.")
-        else:
-            print("❌ WhatsApp delivery failed. Check logs.")
     else:
         print("❌ AI Agent failed to return a summary.")
 
+    # WhatsApp numbers come straight from the payload; the LLM only writes the Signals/Focus bullets
+    print("\n✍️  Writing WhatsApp Signals & Focus...")
+    narrative = get_whatsapp_narrative(payload)
+    if not narrative:
+        print("⚠️ No usable narrative from the LLM; using the pre-computed anomalies instead.")
+    whatsapp_report = render_whatsapp_report(payload, narrative)
+    print(whatsapp_report)
+
+    # Dispatch to CEO via WhatsApp using the mobile format — once per day, however often the pipeline reruns
+    report_date = payload["report_date"]
+    if (database_client.get_briefing_deliveries(report_date).get(CEO_RECIPIENT) or {}).get("sent_at"):
+        print(f"⏭️  The WhatsApp briefing for {report_date} was already delivered; not resending.")
+        success = True
+    else:
+        # Stored first, so a failed send is retried with this exact text (resend_ceo_briefing)
+        database_client.save_briefing_messages(report_date, {CEO_RECIPIENT: whatsapp_report})
+        success = _deliver_ceo_briefing(report_date, whatsapp_report)
+
+    # Per-rep nudges are sliced from the same payload — no extra analytics round trips
+    if Config.REP_BRIEFINGS_ENABLED:
+        print("\n👥 Generating per-rep briefings...")
+        # The CEO briefing has already gone out; a rep failure must not make the caller send it again
+        try:
+            run_rep_briefings(payload)
+        except Exception as e:
+            print(f"❌ Per-rep briefings failed: {e}")
+    return success
+
 if __name__ == "__main__":
-    run_daily_pipeline()
+    try:
+        # Never overlap with the resident scheduler (jobs/scheduler.py) or another cron run
+        with SingleFlightLock(Config.SYNC_LOCK_PATH, wait_s=Config.SYNC_LOCK_WAIT_SECONDS):
+            run_daily_pipeline()
+    except LockHeld as e:
+        print(f"⏭️  Skipping run: {e}")
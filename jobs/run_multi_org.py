@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import traceback
+import multiprocessing
+from datetime import datetime
+from dotenv import load_dotenv
+from core.orgs import load_orgs
+from core.single_flight import SingleFlightLock, LockHeld
+
+# ─────────────────────────────────────────────────────────────
+# MULTI-ORG ORCHESTRATOR
+# Runs the daily pipeline (or an incremental sync) for every org in orgs.json,
+# `--workers` orgs at a time, each in its own freshly spawned process:
+#   • isolation — the org's environment is applied before core.config is imported,
+#     so Config, the Supabase/Zoho clients, token cache, lock, model, LLM cache and
+#     capture files are that org's alone (see PER_ORG_PATHS)
+#   • rate limits — the worker cap bounds shared Supabase/Ollama load; each org can
+#     pace its own Zoho calls with ZOHO_MAX_REQUESTS_PER_MINUTE
+#   • failures — an org that raises, crashes or exceeds --timeout-minutes is
+#     reported and killed without affecting the others; its log is logs/<org>.log
+# Wall time ≈ the slowest org (per wave of workers) instead of the sum of all orgs.
+# ─────────────────────────────────────────────────────────────
+
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT_MINUTES = 30
+LOG_DIR = "logs"
+POLL_SECONDS = 0.5
+
+STATUS_ICONS = {"OK": "✅", "PARTIAL": "⚠️", "SKIPPED": "⏭️", "FAILED": "❌", "TIMEOUT": "❌", "CRASHED": "❌"}
+
+# Files and directories that two orgs must never share: {setting: default when .env doesn't set it}
+PER_ORG_PATHS = {
+    "LEAD_SCORE_MODEL_PATH": "models/lead_scorer.npz",
+    "LLM_CACHE_DIR": "llm_cache",
+    "REP_CONTACTS_FILE": "rep_contacts.json",
+}
+# Only derived per org when .env turns them on
+OPTIONAL_PER_ORG_PATHS = ["PROMETHEUS_TEXTFILE_PATH", "ZOHO_CAPTURE_PATH", "ZOHO_REPLAY_PATH", "LLM_CORPUS_DIR"]
+
+def _org_path(path: str, name: str) -> str:
+    """models/lead_scorer.npz → models/lead_scorer_<org>.npz (multi-part extensions such as .jsonl.gz are kept)."""
+    directory, base = os.path.split(path)
+    stem, dot, ext = base.partition(".")
+    return os.path.join(directory, f"{stem}_{name}{dot}{ext}")
+
+def org_environment(org: dict) -> dict:
+    """The org's overrides plus per-org defaults for files that two orgs must never share."""
+    env = dict(org["env"])
+    env.setdefault("SYNC_LOCK_PATH", f"sync-{org['name']}.lock")
+    for key, default in PER_ORG_PATHS.items():
+        env.setdefault(key, _org_path(os.environ.get(key) or default, org["name"]))
+    for key in OPTIONAL_PER_ORG_PATHS:
+        if os.environ.get(key):
+            env.setdefault(key, _org_path(os.environ[key], org["name"]))
+    return env
+
+def _run_org(name: str, env: dict, mode: str, log_path: str, results):
+    """Child-process entry: binds this interpreter to one org, runs it and reports one result dict."""
+    os.environ.update(env)
+    log = open(log_path, "a", buffering=1, encoding="utf-8")
+    os.dup2(log.fileno(), 1)
+    os.dup2(log.fileno(), 2)
+    sys.stdout = sys.stderr = log
+    print(f"\n===== {name} · {mode} · {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} =====")
+
+    result = {"org": name, "status": "FAILED", "records": 0, "stages": {}, "error": None}
+    t0 = time.perf_counter()
+    try:
+        # Imported only now, so Config and every module-level client read this org's environment
+        from core import telemetry
+        from core.config import Config
+        from jobs.run_daily_sync import run_daily_pipeline, run_incremental_sync
+
+        with SingleFlightLock(Config.SYNC_LOCK_PATH, wait_s=Config.SYNC_LOCK_WAIT_SECONDS):
+            run_daily_pipeline() if mode == "daily" else run_incremental_sync()
+        run = telemetry.last_run()
+        totals = run.stage_totals()
+        result["records"] = totals.get("upsert", {}).get("records", 0)
+        result["stages"] = {stage: round(t["duration_ms"]) for stage, t in totals.items()}
+        if totals.get("token", {}).get("errors"):
+            result["error"] = "Zoho authentication failed"
+        else:
+            result["status"] = "PARTIAL" if run.has_errors else "OK"
+    except LockHeld as e:
+        result["status"], result["error"] = "SKIPPED", str(e)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    result["duration_s"] = time.perf_counter() - t0
+    results.put(result)
+
+def _release_orphaned_lock(path: str, pid: int):
+    """A killed org leaves its lock file behind; remove it only if that process still owns it."""
+    if SingleFlightLock(path).holder().get("pid") == pid:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def run_orgs(orgs: list, mode: str = "daily", workers: int = DEFAULT_WORKERS,
+             timeout_minutes: float = DEFAULT_TIMEOUT_MINUTES, log_dir: str = LOG_DIR) -> list:
+    """Runs every org in its own process, at most `workers` at once. Returns one result dict per org."""
+    ctx = multiprocessing.get_context("spawn")
+    results_queue = ctx.Queue()
+    os.makedirs(log_dir, exist_ok=True)
+    pending = list(orgs)
+    running = {}   # name -> (process, started_at, env)
+    results = {}
+
+    def drain(timeout):
+        try:
+            while True:
+                result = results_queue.get(timeout=timeout)
+                results[result["org"]] = result
+                timeout = 0
+        except queue.Empty:
+            pass
+
+    def finish(name, result):
+        proc, _, _ = running.pop(name)
+        proc.join(5)
+        results[name] = result
+        icon = STATUS_ICONS.get(result["status"], "❔")
+        detail = f" — {result['error']}" if result.get("error") else ""
+        print(f"{icon} {name}: {result['status']} in {result['duration_s']:.1f}s{detail}")
+
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                org = pending.pop(0)
+                env = org_environment(org)
+                log_path = os.path.join(log_dir, f"{org['name']}.log")
+                proc = ctx.Process(target=_run_org, name=f"org-{org['name']}",
+                                   args=(org["name"], env, mode, log_path, results_queue))
+                proc.start()
+                running[org["name"]] = (proc, time.perf_counter(), env)
+                print(f"▶️  {org['name']} started (pid {proc.pid}, log {log_path})")
+
+            drain(POLL_SECONDS)
+            now = time.perf_counter()
+            for name, (proc, started, env) in list(running.items()):
+                if name in results:
+                    finish(name, results[name])
+                elif not proc.is_alive():
+                    drain(POLL_SECONDS)
+                    finish(name, results.get(name) or {
+                        "org": name, "status": "CRASHED", "records": 0, "stages": {},
+                        "error": f"exit code {proc.exitcode}", "duration_s": now - started})
+                elif now - started > timeout_minutes * 60:
+                    proc.terminate()
+                    proc.join(10)
+                    if proc.is_alive():
+                        proc.kill()
+                    _release_orphaned_lock(env["SYNC_LOCK_PATH"], proc.pid)
+                    finish(name, {"org": name, "status": "TIMEOUT", "records": 0, "stages": {},
+                                  "error": f"killed after {timeout_minutes:g} min", "duration_s": now - started})
+    finally:
+        for proc, _, env in running.values():
+            proc.terminate()
+            proc.join(10)
+            _release_orphaned_lock(env["SYNC_LOCK_PATH"], proc.pid)
+    return [results[org["name"]] for org in orgs if org["name"] in results]
+
+def print_summary(results: list, wall_s: float):
+    """Per-org table plus wall time against the sequential (summed) runtime."""
+    print("\n========================================")
+    print("         🏢 MULTI-ORG RUN SUMMARY       ")
+    print("========================================")
+    for r in sorted(results, key=lambda r: r["duration_s"], reverse=True):
+        slowest = max(r["stages"].items(), key=lambda kv: kv[1]) if r["stages"] else None
+        stage = f"slowest stage {slowest[0]} {slowest[1] / 1000:.1f}s" if slowest else (r.get("error") or "")
+        print(f"{STATUS_ICONS.get(r['status'], '❔')} {r['org']:<20} {r['status']:<8} {r['duration_s']:8.1f}s  "
+              f"records={r['records']:<8} {stage}")
+    if results:
+        total = sum(r["duration_s"] for r in results)
+        slowest_org = max(r["duration_s"] for r in results)
+        print(f"\n🏁 {len(results)} org(s) in {wall_s:.1f}s wall — slowest org {slowest_org:.1f}s, "
+              f"sequential sum {total:.1f}s ({total / max(wall_s, 1e-9):.1f}× faster)")
+
+def main(argv=None):
+    # .env supplies shared settings (Twilio, Ollama) and the ${VAR} secrets referenced from orgs.json
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run the CRM sync for every org in orgs.json in parallel processes.")
+    parser.add_argument("--orgs-file", default=os.environ.get("ORGS_FILE", "orgs.json"))
+    parser.add_argument("--mode", choices=["daily", "incremental"], default="daily",
+                        help="daily = full pipeline incl. AI + WhatsApp; incremental = fetch + upsert only.")
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("MULTI_ORG_WORKERS", DEFAULT_WORKERS)),
+                        help="Orgs running at once.")
+    parser.add_argument("--timeout-minutes", type=float,
+                        default=float(os.environ.get("ORG_TIMEOUT_MINUTES", DEFAULT_TIMEOUT_MINUTES)),
+                        help="Kill an org's process after this long.")
+    parser.add_argument("--only", help="Comma-separated org names to run (e.g. to re-run failures).")
+    parser.add_argument("--log-dir", default=LOG_DIR)
+    args = parser.parse_args(argv)
+
+    try:
+        orgs = load_orgs(args.orgs_file, briefing=args.mode == "daily")
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.only:
+        wanted = {name.strip() for name in args.only.split(",") if name.strip()}
+        unknown = wanted - {org["name"] for org in orgs}
+        if unknown:
+            parser.error(f"Unknown or disabled org(s): {', '.join(sorted(unknown))}")
+        orgs = [org for org in orgs if org["name"] in wanted]
+
+    print(f"🏢 Running {len(orgs)} org(s) · mode={args.mode} · workers={max(1, args.workers)}")
+    t0 = time.perf_counter()
+    results = run_orgs(orgs, args.mode, max(1, args.workers), args.timeout_minutes, args.log_dir)
+    print_summary(results, time.perf_counter() - t0)
+
+    failed = [r["org"] for r in results if r["status"] not in ("OK", "SKIPPED")]
+    if failed:
+        print(f"\n↩️  Re-run just these with: python -m jobs.run_multi_org --only {','.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
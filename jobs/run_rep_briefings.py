@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import argparse
+from statistics import mean
+from concurrent.futures import ThreadPoolExecutor
+from core.config import Config
+from core import telemetry
+from ai_agents.analyst_agent import construct_rep_system_prompt, get_rep_focus
+from ai_agents.whatsapp_report import render_rep_report
+from services import database_client
+from services.whatsapp_client import send_whatsapp_message
+
+# ─────────────────────────────────────────────────────────────
+# PER-REP DAILY BRIEFINGS
+# Every rep's message is sliced from the same build_ai_payload dict (one analytics
+# pass, no per-rep RPCs). All LLM requests share one system prompt — the rubric
+# plus team-wide numbers — so Ollama keeps that prefix in its KV cache and only
+# evaluates each rep's few lines of data. Messages go out concurrently, and each
+# delivery is recorded in briefing_deliveries so a rerun skips reps already sent.
+# ─────────────────────────────────────────────────────────────
+
+# Twilio accepts parallel sends; this bounds open connections, not throughput
+DISPATCH_WORKERS = 8
+
+def rep_recipient(rep: str) -> str:
+    """A rep's briefing_deliveries recipient key."""
+    return f"rep:{rep}"
+
+def load_rep_contacts(path: str = None) -> dict:
+    """{rep name exactly as the CRM owner field: WhatsApp number}. Missing file → no rep briefings."""
+    path = path or Config.REP_CONTACTS_FILE
+    if not os.path.exists(path):
+        print(f"⚠️ {path} not found — no rep briefings to send.")
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return {name: number for name, number in json.load(f).items() if number}
+
+def build_rep_slices(payload: dict):
+    """Splits the shared payload into (team_context, {rep: rep_slice}) without touching the database."""
+    matrix = payload.get("rep_pipeline_matrix", {})
+    if not matrix:
+        return {}, {}
+    by_pipeline = sorted(matrix, key=lambda r: matrix[r].get("total_pipeline_value", 0) or 0, reverse=True)
+    avg_leads = round(mean(d.get("active_leads", 0) or 0 for d in matrix.values()))
+    avg_pipeline = round(mean(d.get("total_pipeline_value", 0) or 0 for d in matrix.values()))
+    anomalies = payload.get("anomalies_detected_by_math", [])
+
+    team_context = {
+        "report_date": payload.get("report_date"),
+        "team_size": len(matrix),
+        "team_avg_active_leads": avg_leads,
+        "team_avg_pipeline_value": f"₹{avg_pipeline:,}",
+        "daily_metrics": payload.get("daily_metrics", {}),
+        "channel_alerts": [a for a in anomalies if "CHANNEL" in a],
+    }
+    slices = {}
+    for rank, rep in enumerate(by_pipeline, start=1):
+        data = matrix[rep]
+        slices[rep] = {
+            "rep": rep,
+            "active_leads": data.get("active_leads", 0) or 0,
+            "total_pipeline_value": int(round(data.get("total_pipeline_value", 0) or 0)),
+            "pipeline_rank": rank,
+            "team_size": len(matrix),
+            "team_avg_active_leads": avg_leads,
+            "flags": [a for a in anomalies if rep in a],
+        }
+        rep_forecast = payload.get("revenue_forecast", {}).get("by_owner", {}).get(rep)
+        if rep_forecast:
+            slices[rep]["revenue_forecast"] = rep_forecast
+    return team_context, slices
+
+def generate_rep_briefings(payload: dict, reps: list, workers: int = 2, model_name: str = "llama3.2") -> dict:
+    """Returns {rep: WhatsApp message} for the given reps, `workers` LLM requests at a time."""
+    team_context, slices = build_rep_slices(payload)
+    reps = [r for r in reps if r in slices]
+    if not reps:
+        return {}
+    system_prompt = construct_rep_system_prompt(team_context)
+
+    def build(rep):
+        focus = get_rep_focus(system_prompt, slices[rep], model_name)
+        return rep, render_rep_report(payload.get("report_date", ""), slices[rep], focus)
+
+    # Same-prefix requests in one batch share Ollama's cached prefill; keep workers <= OLLAMA_NUM_PARALLEL
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rep-llm") as pool:
+        return dict(pool.map(build, reps))
+
+def dispatch_rep_briefings(messages: dict, contacts: dict, report_date: str = None) -> dict:
+    """
+    Sends every rep's message concurrently. Returns {rep: delivered}.
+    With `report_date`, each delivery is recorded as soon as it succeeds, so a crash mid-batch
+    does not resend the messages that already went out.
+    """
+    def send(rep):
+        with telemetry.span("whatsapp", rep) as span:
+            span["bytes"] = len(messages[rep].encode("utf-8"))
+            delivered = send_whatsapp_message(messages[rep], to_number=contacts[rep])
+            if not delivered:
+                span["status"] = "ERROR"
+        if delivered and report_date:
+            database_client.mark_briefing_delivered(report_date, rep_recipient(rep))
+        return rep, delivered
+
+    with ThreadPoolExecutor(max_workers=DISPATCH_WORKERS, thread_name_prefix="rep-wa") as pool:
+        return dict(pool.map(send, messages))
+
+def run_rep_briefings(payload: dict, contacts: dict = None, workers: int = None, dry_run: bool = False) -> dict:
+    """
+    Generates and (unless `dry_run`) sends every rep's briefing from an already built payload.
+    Idempotent per report_date: reps already delivered are skipped, and a rep whose message was
+    stored but not delivered gets that stored text again rather than a new LLM run.
+    """
+    contacts = load_rep_contacts() if contacts is None else contacts
+    if not contacts:
+        return {}
+    report_date = payload.get("report_date", "")
+    stored = {} if dry_run else database_client.get_briefing_deliveries(report_date)
+    delivered = {rep for rep in contacts if (stored.get(rep_recipient(rep)) or {}).get("sent_at")}
+    pending = {rep: stored[rep_recipient(rep)]["message"]
+               for rep in contacts if rep not in delivered and rep_recipient(rep) in stored}
+    if delivered:
+        print(f"⏭️  {len(delivered)} rep briefing(s) for {report_date} already delivered; not resending.")
+        if len(delivered) == len(contacts):
+            return {}
+
+    t0 = time.perf_counter()
+    to_generate = [rep for rep in contacts if rep not in delivered and rep not in pending]
+    messages = generate_rep_briefings(payload, to_generate, workers or Config.REP_BRIEFING_WORKERS)
+    skipped = sorted(set(to_generate) - set(messages))
+    print(f"✍️  {len(messages)} rep briefing(s) generated in {time.perf_counter() - t0:.1f}s"
+          f"{f' (no CRM activity: {len(skipped)})' if skipped else ''}.")
+    if dry_run:
+        for message in messages.values():
+            print(f"\n{message}")
+        return {rep: False for rep in messages}
+
+    # Stored before sending, so a failed or interrupted send is retried with the same text
+    database_client.save_briefing_messages(report_date, {rep_recipient(rep): m for rep, m in messages.items()})
+    results = dispatch_rep_briefings({**pending, **messages}, contacts, report_date)
+    failed = [rep for rep, ok in results.items() if not ok]
+    print(f"📱 Rep briefings delivered: {len(results) - len(failed)}/{len(results)}")
+    if failed:
+        print(f"❌ Failed: {', '.join(failed)}")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Send each sales rep a personalized daily WhatsApp briefing.")
+    parser.add_argument("--workers", type=int, default=Config.REP_BRIEFING_WORKERS,
+                        help="Concurrent LLM requests; match OLLAMA_NUM_PARALLEL.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the messages instead of sending them.")
+    args = parser.parse_args(argv)
+
+    # Imported here: run_daily_sync itself calls run_rep_briefings after the CEO briefing
+    from jobs.run_daily_sync import build_ai_payload
+    run = telemetry.start_run()
+    try:
+        run_rep_briefings(build_ai_payload(), workers=max(1, args.workers), dry_run=args.dry_run)
+    finally:
+        telemetry.end_run()
+        telemetry.log_stage_summary(run)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import signal
+import argparse
+import threading
+from datetime import datetime, timedelta
+from core.config import Config
+from core.single_flight import SingleFlightLock
+from services import database_client
+from ai_agents.analyst_agent import warm_up
+from jobs.run_daily_sync import run_incremental_sync, run_daily_pipeline, resend_ceo_briefing, CEO_RECIPIENT
+
+# ─────────────────────────────────────────────────────────────
+# RESIDENT SYNC SCHEDULER
+# One long-lived process instead of a cron-launched script per run: imports, the DNS
+# patch, the Supabase/Zoho HTTP sessions, the Zoho access token and the Ollama model
+# all stay warm between cycles.
+#   • every SYNC_INTERVAL_MINUTES → incremental fetch + upsert (dashboard freshness)
+#   • once a day at BRIEFING_TIME → full pipeline (sync + analytics + LLM + WhatsApp)
+# Ctrl+C / SIGTERM finishes the cycle in progress, then exits.
+# ─────────────────────────────────────────────────────────────
+
+class SyncScheduler:
+    def __init__(self, interval_minutes: int, briefing_time: str, lock_path: str):
+        self.interval = timedelta(minutes=interval_minutes)
+        hour, minute = (int(x) for x in briefing_time.split(":"))
+        self.briefing_hour, self.briefing_minute = hour, minute
+        self.lock = SingleFlightLock(lock_path, wait_s=Config.SYNC_LOCK_WAIT_SECONDS)
+        self.stop_event = threading.Event()
+        self.last_briefing_date = None
+
+    def request_stop(self, signum=None, frame=None):
+        if not self.stop_event.is_set():
+            print("\n🛑 Shutdown requested — finishing the current cycle first...")
+        self.stop_event.set()
+
+    def briefing_due(self, now: datetime) -> bool:
+        briefing_at = now.replace(hour=self.briefing_hour, minute=self.briefing_minute, second=0, microsecond=0)
+        return now >= briefing_at and self.last_briefing_date != now.date()
+
+    def run_briefing(self, now: datetime):
+        """
+        Only a delivered briefing counts; a failure is retried next cycle. Once today's WhatsApp has been
+        rendered and stored, the retry just resends it — the LLM and the rep briefings do not run again.
+        """
+        report_date = now.strftime("%Y-%m-%d")
+        if CEO_RECIPIENT in database_client.get_briefing_deliveries(report_date):
+            run_incremental_sync()
+            delivered = resend_ceo_briefing(report_date)
+        else:
+            delivered = run_daily_pipeline()
+        if delivered:
+            self.last_briefing_date = now.date()
+        else:
+            print("⚠️ Daily briefing not delivered — retrying next cycle.")
+
+    def run_cycle(self):
+        """Runs one cycle under the single-flight lock. Skips (does not queue) if another run holds it."""
+        if not self.lock.acquire():
+            print(f"⏭️  Skipping cycle: another sync is running ({self.lock.holder() or 'unknown holder'}).")
+            return
+        try:
+            now = datetime.now()
+            if self.briefing_due(now):
+                self.run_briefing(now)
+            else:
+                run_incremental_sync()
+        except Exception as e:
+            # One failed cycle must never take the daemon down; the next cycle retries
+            print(f"❌ Cycle failed: {e}")
+        finally:
+            self.lock.release()
+
+    def run_forever(self):
+        # After a restart, don't send a second briefing for a day whose WhatsApp already went out
+        today = datetime.now().strftime("%Y-%m-%d")
+        if (database_client.get_briefing_deliveries(today).get(CEO_RECIPIENT) or {}).get("sent_at"):
+            self.last_briefing_date = datetime.now().date()
+
+        print("========================================")
+        print("🕒 CRM Sync Scheduler running")
+        print(f"   Incremental sync every {int(self.interval.total_seconds() // 60)} min · "
+              f"daily briefing at {self.briefing_hour:02d}:{self.briefing_minute:02d}")
+        print("========================================")
+        warm_up()
+
+        while not self.stop_event.is_set():
+            started = datetime.now()
+            self.run_cycle()
+            # Next incremental cycle, or the briefing if it falls due sooner
+            wake_at = started + self.interval
+            briefing_at = started.replace(hour=self.briefing_hour, minute=self.briefing_minute, second=0, microsecond=0)
+            if self.last_briefing_date != started.date() and started < briefing_at < wake_at:
+                wake_at = briefing_at
+            self.stop_event.wait(max((wake_at - datetime.now()).total_seconds(), 0))
+        print("👋 Scheduler stopped.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident CRM sync scheduler (incremental syncs + daily briefing).")
+    parser.add_argument("--interval-minutes", type=int, default=Config.SYNC_INTERVAL_MINUTES)
+    parser.add_argument("--briefing-time", default=Config.BRIEFING_TIME, help="Local HH:MM for the daily AI + WhatsApp run.")
+    args = parser.parse_args(argv)
+
+    scheduler = SyncScheduler(args.interval_minutes, args.briefing_time, Config.SYNC_LOCK_PATH)
+    signal.signal(signal.SIGINT, scheduler.request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, scheduler.request_stop)
+    scheduler.run_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+from core import lead_scoring
+from core.config import Config
+from services import database_client
+
+# ─────────────────────────────────────────────────────────────
+# LEAD SCORER TRAINING
+# Fits core.lead_scoring on every stored lead whose outcome is settled (junk vs worked), checks it
+# on a 20% holdout and saves it to Config.LEAD_SCORE_MODEL_PATH. The next full sync picks the model
+# up and scores each Leads chunk as it is upserted. --rescore also writes a score onto every stored
+# lead, so history and open leads are scored right away rather than when they next change in Zoho.
+# Run it weekly-ish (junk patterns drift with campaigns). Leads archived by archive_raw_data.py keep
+# only their promoted fields, so they are neither trained on nor rescored; they keep their last score.
+# ─────────────────────────────────────────────────────────────
+
+ENCODE_BLOCK = 10_000
+
+def load_leads(page_size: int) -> tuple:
+    """All leads with a full raw payload: (ids, created_times, statuses, encoded feature matrix)."""
+    ids, created, statuses, blocks, pending = [], [], [], [], []
+    for row in database_client.iter_leads_for_scoring(page_size):
+        # An archived payload would encode to a feature-less row paired with a real status
+        if not row.get("raw_data") or row["raw_data"].get("_archived"):
+            continue
+        ids.append(row["id"])
+        created.append(row["created_time"])
+        statuses.append(row["lead_status"])
+        pending.append(row["raw_data"])
+        if len(pending) == ENCODE_BLOCK:
+            blocks.append(lead_scoring.encode(pending))
+            pending = []
+            print(f"📥 Encoded {len(ids):,} leads...")
+    blocks.append(lead_scoring.encode(pending))
+    return ids, created, statuses, np.concatenate(blocks)
+
+def train(idx: np.ndarray, statuses: list, holdout: float, seed: int = 42) -> tuple:
+    """Fits on the settled leads minus a random holdout. Returns (model, training rows, holdout labels, holdout scores)."""
+    labels = [lead_scoring.label(s) for s in statuses]
+    settled = np.array([i for i, y in enumerate(labels) if y is not None], dtype=np.int64)
+    y = np.array([labels[i] for i in settled], dtype=np.float64)
+    order = np.random.default_rng(seed).permutation(len(settled))
+    cut = int(len(settled) * holdout)
+    test, fit_rows = order[:cut], order[cut:]
+    model = lead_scoring.fit(idx[settled[fit_rows]], y[fit_rows], seed=seed)
+    return model, len(fit_rows), y[test], lead_scoring.predict(model, idx[settled[test]])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the likely-junk lead scorer on settled leads.")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share of settled leads kept for evaluation.")
+    parser.add_argument("--page-size", type=int, default=1000, help="Leads fetched per request.")
+    parser.add_argument("--rescore", action="store_true", help="Also write a junk_score onto every stored lead.")
+    args = parser.parse_args(argv)
+
+    print("🧠 Loading leads for lead scoring...")
+    ids, created, statuses, idx = load_leads(args.page_size)
+    if not any(lead_scoring.label(s) is not None for s in statuses):
+        print("❌ No settled leads (junk or worked) to train on yet.")
+        return
+    model, train_rows, y_test, s_test = train(idx, statuses, args.holdout)
+    holdout_auc = lead_scoring.auc(y_test, s_test)
+    flagged = s_test >= Config.LIKELY_JUNK_THRESHOLD
+    precision = float(y_test[flagged].mean()) if flagged.any() else float("nan")
+    print(f"📊 {len(y_test):,} holdout leads ({y_test.mean():.0%} junk): AUC {holdout_auc:.3f}, "
+          f"{flagged.mean():.0%} flagged at ≥ {Config.LIKELY_JUNK_THRESHOLD}, precision {precision:.0%}")
+
+    path = Config.LEAD_SCORE_MODEL_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    lead_scoring.save_model(model, path, {
+        "trained_at": datetime.now().isoformat(timespec="seconds"),
+        "train_rows": train_rows,
+        "holdout_auc": round(holdout_auc, 4),
+    })
+    print(f"💾 Saved model to {path}")
+
+    if args.rescore:
+        scores = np.round(lead_scoring.predict(model, idx), 4).tolist()
+        written = database_client.save_lead_scores([
+            {"id": i, "created_time": c, "junk_score": s} for i, c, s in zip(ids, created, scores)
+        ])
+        print(f"✅ Scored {written:,} stored leads")
+
+if __name__ == "__main__":
+    main()
@@ -58,6 +58,12 @@ CREATE TABLE IF NOT EXISTS sync_logs (
     status TEXT
 );
 
+-- Links each sync log row to its stage-level metrics
+ALTER TABLE sync_logs ADD COLUMN IF NOT EXISTS run_id TEXT;
+
+-- 'full' (complete payloads incl. raw_data) or 'light' (projected typed columns only, TWO_TIER_SYNC)
+ALTER TABLE sync_logs ADD COLUMN IF NOT EXISTS sync_mode TEXT DEFAULT 'full';
+
 -- 6. AI Briefings Log (Stores historical Markdown AI Reports)
 CREATE TABLE IF NOT EXISTS ai_briefings_log (
     id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
@@ -65,3 +71,242 @@ CREATE TABLE IF NOT EXISTS ai_briefings_log (
     markdown_content TEXT,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
+
+-- Re-upserting an existing report_date (backfill --overwrite, a rerun) moves updated_at, which get_data_version reads
+ALTER TABLE ai_briefings_log ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+CREATE OR REPLACE FUNCTION touch_updated_at()
+RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$;
+DROP TRIGGER IF EXISTS trg_ai_briefings_log_updated_at ON ai_briefings_log;
+CREATE TRIGGER trg_ai_briefings_log_updated_at BEFORE UPDATE ON ai_briefings_log
+FOR EACH ROW EXECUTE FUNCTION touch_updated_at();
+
+-- 7. Sync Stage Metrics (One span per pipeline stage: token, fetch page, map, upsert chunk, RPC, LLM, WhatsApp)
+CREATE TABLE IF NOT EXISTS sync_stage_metrics (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    label TEXT,
+    started_at TEXT,
+    duration_ms REAL DEFAULT 0,
+    records INTEGER DEFAULT 0,
+    bytes BIGINT DEFAULT 0,
+    status TEXT DEFAULT 'OK',
+    error TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_sync_stage_metrics_run ON sync_stage_metrics (run_id);
+
+-- 8. Promoted Fields Registry (Custom Zoho fields extracted from raw_data into indexed columns)
+-- Rows are written by the SQL that `jobs/promote_fields.py` generates from promoted_fields.json;
+-- the analytics RPCs only slice by columns listed here.
+CREATE TABLE IF NOT EXISTS promoted_fields (
+    module TEXT NOT NULL,
+    field TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    data_type TEXT NOT NULL,
+    promoted_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (module, field)
+);
+
+-- Containment lookups on any raw Zoho attribute (raw_data @> '{"City": "Pune"}') without decoding every row
+CREATE INDEX IF NOT EXISTS idx_leads_raw_raw_data_gin ON leads_raw USING GIN (raw_data jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_crm_deals_raw_data_gin ON crm_deals USING GIN (raw_data jsonb_path_ops);
+
+-- 9. Deal Stage History (One row per observed stage change, appended by the upsert path)
+-- from_stage is NULL for the first time a deal is seen; changed_at is Zoho's Modified_Time of the change.
+CREATE TABLE IF NOT EXISTS deal_stage_history (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    deal_id TEXT NOT NULL,
+    from_stage TEXT,
+    to_stage TEXT NOT NULL,
+    owner TEXT,
+    amount REAL DEFAULT 0,
+    changed_at TEXT NOT NULL,
+    recorded_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_deal_stage_history_deal ON deal_stage_history (deal_id, changed_at);
+CREATE INDEX IF NOT EXISTS idx_deal_stage_history_to_stage ON deal_stage_history (to_stage);
+
+-- Record Explorer keyset indexes (expressions must match explore_records' coalesce() sort keys)
+CREATE INDEX IF NOT EXISTS idx_crm_deals_closed_keyset   ON crm_deals ((coalesce(closed_time, '')), id);
+CREATE INDEX IF NOT EXISTS idx_crm_deals_created_keyset  ON crm_deals ((coalesce(created_time, '')), id);
+CREATE INDEX IF NOT EXISTS idx_crm_deals_modified_keyset ON crm_deals ((coalesce(modified_time, '')), id);
+CREATE INDEX IF NOT EXISTS idx_crm_deals_amount_keyset   ON crm_deals ((coalesce(amount, 0)), id);
+CREATE INDEX IF NOT EXISTS idx_leads_raw_created_keyset  ON leads_raw ((coalesce(created_time, '')), id);
+CREATE INDEX IF NOT EXISTS idx_leads_raw_modified_keyset ON leads_raw ((coalesce(modified_time, '')), id);
+-- Newest change per mirror table for get_data_version (Leads / Deals reuse the keyset indexes above)
+CREATE INDEX IF NOT EXISTS idx_crm_contacts_modified ON crm_contacts ((coalesce(modified_time, '')));
+CREATE INDEX IF NOT EXISTS idx_crm_accounts_modified ON crm_accounts ((coalesce(modified_time, '')));
+
+-- 10. Typed Date Columns (Indexed calendar dates for date-range trends — see get_time_series)
+-- Zoho's ISO-8601 text is kept as-is; its first 10 characters are the record's local calendar day.
+-- A text → date cast is not IMMUTABLE (it depends on DateStyle), so generated columns build the
+-- date with make_date; a malformed timestamp yields NULL (and an impossible day such as Feb 30 rolls
+-- into the next month) instead of failing an upsert.
+-- Adding a STORED generated column rewrites the table once; run outside business hours on large tables.
+CREATE OR REPLACE FUNCTION zoho_date(ts text)
+RETURNS date
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE
+AS $$
+    SELECT CASE WHEN ts ~ '^[1-9]\d{3}-(0[1-9]|1[0-2])-\d{2}'
+                THEN make_date(left(ts, 4)::int, substring(ts, 6, 2)::int, 1) + (substring(ts, 9, 2)::int - 1) END;
+$$;
+
+ALTER TABLE leads_raw ADD COLUMN IF NOT EXISTS created_date DATE GENERATED ALWAYS AS (zoho_date(created_time)) STORED;
+ALTER TABLE crm_deals ADD COLUMN IF NOT EXISTS created_date DATE GENERATED ALWAYS AS (zoho_date(created_time)) STORED;
+ALTER TABLE crm_deals ADD COLUMN IF NOT EXISTS closed_date DATE GENERATED ALWAYS AS (zoho_date(closed_time)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_leads_raw_created_date ON leads_raw (created_date);
+CREATE INDEX IF NOT EXISTS idx_crm_deals_created_date ON crm_deals (created_date);
+CREATE INDEX IF NOT EXISTS idx_crm_deals_won_closed_date ON crm_deals (closed_date) WHERE stage = 'Closed Won';
+
+-- 11. Prospect Identity (Duplicate leads and lead ↔ contact matches — see resolve_prospects)
+-- Each Lead / Contact gets match keys from its raw_data: normalized emails ('e:…') and the last 10 digits
+-- of its phone numbers ('p:…'). Records that share a key belong to one prospect cluster, whose
+-- cluster_id is its smallest record id. Keys are blocking keys: candidates are found by hash-index
+-- lookups on match_key, never by comparing records pairwise.
+-- plpgsql rather than sql: a non-inlinable sql function is re-planned on every call inside the resolver's
+-- joins, which made key extraction ~7× slower.
+CREATE OR REPLACE FUNCTION normalize_email(email text)
+RETURNS text
+LANGUAGE plpgsql
+IMMUTABLE PARALLEL SAFE
+AS $$
+DECLARE
+    e text := lower(btrim(email));
+    local_part text;
+    domain text;
+BEGIN
+    IF e !~ '^[^@\s]+@[^@\s]+\.[a-z]{2,}$' THEN RETURN NULL; END IF;
+    -- "+tag" dropped; Gmail ignores dots in the local part
+    local_part := split_part(split_part(e, '@', 1), '+', 1);
+    domain := split_part(e, '@', 2);
+    IF local_part = '' THEN RETURN NULL; END IF;
+    IF domain IN ('gmail.com', 'googlemail.com') THEN RETURN replace(local_part, '.', '') || '@gmail.com'; END IF;
+    RETURN local_part || '@' || domain;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION normalize_phone(phone text)
+RETURNS text
+LANGUAGE plpgsql
+IMMUTABLE PARALLEL SAFE
+AS $$
+DECLARE
+    -- Last 10 digits, so +91 / 0 / spaced / dashed spellings of one number agree
+    n text := right(regexp_replace(phone, '\D', '', 'g'), 10);
+BEGIN
+    -- Placeholders like 9999999999 would merge strangers
+    IF length(n) < 10 OR n ~ '^(\d)\1{9}$' THEN RETURN NULL; END IF;
+    RETURN n;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION prospect_match_keys(raw jsonb)
+RETURNS text[]
+LANGUAGE plpgsql
+IMMUTABLE PARALLEL SAFE
+AS $$
+DECLARE
+    keys text[] := ARRAY[]::text[];
+    k text;
+    field text;
+BEGIN
+    FOREACH field IN ARRAY ARRAY['Email', 'Secondary_Email', 'Phone', 'Mobile'] LOOP
+        k := CASE WHEN field LIKE '%Email' THEN 'e:' || normalize_email(raw ->> field)
+                  ELSE 'p:' || normalize_phone(raw ->> field) END;
+        IF k IS NOT NULL AND NOT k = ANY(keys) THEN keys := keys || k; END IF;
+    END LOOP;
+    RETURN keys;
+END;
+$$;
+
+CREATE TABLE IF NOT EXISTS prospect_keys (
+    module TEXT NOT NULL,          -- 'Leads' or 'Contacts'
+    record_id TEXT NOT NULL,
+    match_key TEXT NOT NULL,
+    PRIMARY KEY (module, record_id, match_key)
+);
+
+CREATE TABLE IF NOT EXISTS prospect_clusters (
+    module TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    cluster_id TEXT NOT NULL,
+    resolved_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (module, record_id)
+);
+
+-- Equality-only lookups: hash indexes stay small and O(1) however many keys there are
+CREATE INDEX IF NOT EXISTS idx_prospect_keys_match_key ON prospect_keys USING HASH (match_key);
+CREATE INDEX IF NOT EXISTS idx_prospect_clusters_cluster ON prospect_clusters USING HASH (cluster_id);
+
+-- 12. Lead Scores (P(lead ends up Junk / Not Qualified), written with each Leads upsert — see core/lead_scoring.py)
+-- NULL until a model has been trained (jobs/train_lead_scorer.py) and the lead was synced or rescored since.
+ALTER TABLE leads_raw ADD COLUMN IF NOT EXISTS junk_score REAL;
+
+-- Same-day flagging reads one day's leads by created_date, then their scores
+CREATE INDEX IF NOT EXISTS idx_leads_raw_created_junk_score ON leads_raw (created_date, junk_score) WHERE junk_score IS NOT NULL;
+
+-- 13. Lead Cohorts (Leads per creation week × source × owner × weeks until their first deal — see refresh_lead_cohorts)
+-- A lead converts when a deal is created, on or after the lead, for a contact in the lead's prospect cluster
+-- (schema.sql §11), which is how Zoho's lead conversion leaves its records. lead_conversions holds each
+-- lead's current cohort cell; lead_cohorts is its running count, updated by deltas for only the leads a
+-- sync chunk touched, so dashboards read a few hundred cells however much history there is.
+CREATE TABLE IF NOT EXISTS lead_conversions (
+    lead_id TEXT PRIMARY KEY,
+    cohort_week DATE NOT NULL,         -- Monday of the lead's creation week
+    created_date DATE NOT NULL,
+    source TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    deal_id TEXT,                      -- first deal of the prospect; NULL = not converted (yet)
+    weeks_to_convert SMALLINT NOT NULL -- whole weeks from lead to deal creation; -1 = not converted (yet)
+);
+
+CREATE TABLE IF NOT EXISTS lead_cohorts (
+    cohort_week DATE NOT NULL,
+    source TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    weeks_to_convert SMALLINT NOT NULL,
+    leads INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (cohort_week, source, owner, weeks_to_convert)
+);
+
+-- A deal's contact (Zoho's Contact_Name lookup) as a typed column, written on every upsert, so the link
+-- survives archive_raw_data slimming raw_data and light syncs that never send it
+ALTER TABLE crm_deals ADD COLUMN IF NOT EXISTS contact_id TEXT;
+UPDATE crm_deals SET contact_id = raw_data -> 'Contact_Name' ->> 'id'
+WHERE contact_id IS NULL AND raw_data -> 'Contact_Name' ->> 'id' IS NOT NULL;
+-- Deals archived before contact_id existed have the link only in the cold archive (supabase_partitioning.sql)
+DO $$
+BEGIN
+    IF to_regclass('crm_raw_archive') IS NOT NULL THEN
+        UPDATE crm_deals d SET contact_id = a.raw_data -> 'Contact_Name' ->> 'id'
+        FROM crm_raw_archive a
+        WHERE a.module = 'Deals' AND a.id = d.id AND a.created_time = d.created_time
+          AND d.contact_id IS NULL AND a.raw_data -> 'Contact_Name' ->> 'id' IS NOT NULL;
+    END IF;
+END;
+$$;
+
+-- A re-synced deal finds the leads it was credited to; a contact's deals are found without scanning crm_deals
+CREATE INDEX IF NOT EXISTS idx_lead_conversions_deal ON lead_conversions USING HASH (deal_id);
+DROP INDEX IF EXISTS idx_crm_deals_contact;
+CREATE INDEX IF NOT EXISTS idx_crm_deals_contact_id ON crm_deals (contact_id);
+
+-- 14. Briefing Deliveries (One row per report_date × WhatsApp recipient — 'ceo' or 'rep:<owner>')
+-- The rendered message is stored before it is sent and sent_at is set once Twilio accepts it, so a retry
+-- resends exactly the stored text to the recipients still pending instead of rerunning the pipeline.
+CREATE TABLE IF NOT EXISTS briefing_deliveries (
+    report_date TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    message TEXT NOT NULL,
+    sent_at TIMESTAMP WITH TIME ZONE,
+    PRIMARY KEY (report_date, recipient)
+);
@@ -0,0 +1,255 @@
+import asyncio
+import time
+import threading
+import weakref
+import httpx
+from datetime import datetime, date, timedelta
+from postgrest import AsyncPostgrestClient
+from core.config import Config
+from core import telemetry
+# Importing the sync client also applies the ISP DNS patch once for the whole process
+from services import database_client
+
+# ─────────────────────────────────────────────────────────────
+# ASYNC SUPABASE ACCESS — CONCURRENT RPC FAN-OUT
+# Every getter mirrors its twin in database_client.py, but runs over one
+# pooled HTTP/2 connection so independent sections are fetched in parallel.
+# ─────────────────────────────────────────────────────────────
+
+MAX_CONNECTIONS = 10
+REQUEST_TIMEOUT_SECONDS = 30
+
+# One PostgREST client per event loop (httpx connections are bound to the loop that opened them)
+_clients = weakref.WeakKeyDictionary()
+_loop = None
+_loop_lock = threading.Lock()
+
+def _get_client() -> AsyncPostgrestClient:
+    """Returns the shared PostgREST client for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+        client = AsyncPostgrestClient(
+            f"{Config.SUPABASE_URL}/rest/v1",
+            schema=Config.SUPABASE_SCHEMA,
+            headers={
+                "apikey": Config.SUPABASE_KEY,
+                "Authorization": f"Bearer {Config.SUPABASE_KEY}",
+            },
+            http_client=http_client,
+        )
+        _clients[loop] = client
+    return client
+
+def _get_loop():
+    """Starts (once) the background event loop that owns the pooled connection for sync callers."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="supabase-async", daemon=True).start()
+    return _loop
+
+async def _rpc(name: str, params: dict = None, default=None):
+    r = await _get_client().rpc(name, params or {}).execute()
+    if r.data:
+        return r.data
+    return {} if default is None else default
+
+async def gather_sections(**sections):
+    """
+    Awaits every keyword coroutine concurrently and returns {name: result}.
+    Total latency tracks the slowest section rather than the sum of all of them.
+    """
+    names = list(sections)
+    results = await asyncio.gather(*(_timed(name, coro) for name, coro in sections.items()))
+    return dict(zip(names, results))
+
+async def _timed(name: str, coro):
+    """Records one `rpc` span per section when a pipeline run is being instrumented."""
+    t0 = time.perf_counter()
+    try:
+        result = await coro
+    except Exception as e:
+        telemetry.record("rpc", name, duration_ms=(time.perf_counter() - t0) * 1000, status="ERROR", error=str(e)[:500])
+        raise
+    records = len(result) if isinstance(result, (list, dict)) else 0
+    telemetry.record("rpc", name, duration_ms=(time.perf_counter() - t0) * 1000, records=records)
+    return result
+
+def fetch_sections(**sections):
+    """
+    Blocking bridge for sync callers (Streamlit, jobs). Runs `gather_sections` on the
+    shared background loop so the HTTP/2 pool stays warm between calls.
+
+    Usage:
+        d = fetch_sections(kpis=get_overview_kpis(), trend=get_lead_volume_trend(days=30))
+    """
+    return asyncio.run_coroutine_threadsafe(gather_sections(**sections), _get_loop()).result()
+
+def fetch_dashboard_data():
+    """
+    Every section the Streamlit dashboard renders, fetched in one concurrent fan-out.
+    Kept here (not in app.py) so jobs and benchmarks can load the same bundle without Streamlit.
+    """
+    # All sections are independent RPCs — fan them out concurrently over one HTTP/2 pool
+    d = fetch_sections(
+        kpis=           get_overview_kpis(),
+        trend=          get_lead_volume_trend(days=30),
+        lead_statuses=  get_lead_status_breakdown(),
+        source_quality= get_source_quality_all_time(),
+        owner_leads=    get_owner_lead_distribution(),
+        deal_stages=    get_deal_stage_breakdown(),
+        deal_by_owner=  get_deal_value_by_owner(),
+        closing_soon=   get_deals_closing_soon_page(days=30),
+        won_vs_lost=    get_won_vs_lost(),
+        contacts_accts= get_contact_and_account_breakdown(),
+        sync_history=   get_sync_history(limit=10),
+        stage_metrics=  get_stage_metrics_summary(runs=10),
+        pipeline=       get_advanced_analytics(),
+        ai_dates=       get_all_briefing_dates(),
+        ai_report=      get_latest_ai_briefing(),
+        period_stats=   get_pipeline_period_stats(),
+        promoted=       get_promoted_fields(),
+        time_in_stage=  get_deal_time_in_stage(),
+        owner_velocity= get_deal_velocity_by_owner(),
+        conversion=     get_stage_conversion(),
+    )
+    contacts_accts = d.pop("contacts_accts")
+    d["contact_owners"] = contacts_accts.get("contact_owners", {})
+    d["industries"] = contacts_accts.get("industries", {})
+    return d
+
+async def get_advanced_analytics(target_date_iso=None):
+    """Async twin of database_client.get_advanced_analytics."""
+    if not target_date_iso:
+        target_date_iso = datetime.now().strftime("%Y-%m-%d")
+    return await _rpc("get_advanced_analytics", {"target_date_iso": target_date_iso})
+
+async def get_overview_kpis():
+    return await _rpc("get_overview_kpis")
+
+async def get_pipeline_period_stats():
+    return await _rpc("get_pipeline_period_stats")
+
+async def get_lead_volume_trend(days: int = 30):
+    return await _rpc("get_lead_volume_trend", {"days": days})
+
+async def get_lead_status_breakdown():
+    return await _rpc("get_lead_status_breakdown")
+
+async def get_owner_lead_distribution():
+    return await _rpc("get_owner_lead_distribution")
+
+async def get_deal_stage_breakdown():
+    return await _rpc("get_deal_stage_breakdown")
+
+async def get_deal_value_by_owner():
+    return await _rpc("get_deal_value_by_owner")
+
+async def get_deals_closing_soon(days: int = 30):
+    return await _rpc("get_deals_closing_soon", {"days": days}, default=[])
+
+async def get_deal_time_in_stage():
+    return await _rpc("get_deal_time_in_stage")
+
+async def get_deal_velocity_by_owner():
+    return await _rpc("get_deal_velocity_by_owner")
+
+async def get_stage_conversion():
+    return await _rpc("get_stage_conversion")
+
+async def get_won_vs_lost():
+    return await _rpc("get_won_vs_lost")
+
+async def get_contact_and_account_breakdown():
+    """Single round trip for both contact owners and account industries."""
+    return await _rpc("get_contact_and_account_breakdown")
+
+async def get_contact_owner_distribution():
+    return (await get_contact_and_account_breakdown()).get("contact_owners", {})
+
+async def get_account_industry_breakdown():
+    return (await get_contact_and_account_breakdown()).get("industries", {})
+
+async def get_source_quality_all_time():
+    return await _rpc("get_source_quality_all_time")
+
+async def get_promoted_fields():
+    """Custom Zoho fields that have been promoted to indexed columns, grouped as {module: [field, ...]}."""
+    res = await _get_client().from_("promoted_fields").select("module, field").order("field").execute()
+    fields = {}
+    for row in res.data or []:
+        fields.setdefault(row["module"], []).append(row["field"])
+    return fields
+
+async def get_custom_field_breakdown(module: str, field: str, top_n: int = 20):
+    return await _rpc("get_custom_field_breakdown", {"module": module, "field": field, "top_n": top_n})
+
+async def get_forecast_inputs():
+    return await _rpc("get_forecast_inputs")
+
+async def get_likely_junk_leads(target_date_iso: str = None, days: int = 1, top_n: int = 20):
+    return await _rpc("get_likely_junk_leads", {"target_date_iso": target_date_iso, "days": days,
+                                                "threshold": Config.LIKELY_JUNK_THRESHOLD, "top_n": top_n})
+
+async def get_lead_cohorts(weeks: int = 12, max_weeks: int = 12, source: str = None, owner: str = None):
+    return await _rpc("get_lead_cohorts", {"weeks": weeks, "max_weeks": max_weeks,
+                                           "source_filter": source, "owner_filter": owner})
+
+async def get_time_series(metric: str, start_date: str = None, end_date: str = None, group_by: str = None,
+                          max_points: int = 120, top_groups: int = 8):
+    return await _rpc("get_time_series", {"metric": metric, "start_date": start_date, "end_date": end_date,
+                                          "group_by": group_by, "max_points": max_points, "top_groups": top_groups})
+
+async def explore_records(module: str, sort_by: str = "created_time", sort_desc: bool = True, page_size: int = 50,
+                          cursor: dict = None, owner: str = None, stage: str = None, source: str = None,
+                          date_column: str = "created_time", date_from: str = None, date_to: str = None,
+                          open_only: bool = False, raw_filter: dict = None):
+    """Async twin of database_client.explore_records."""
+    params = database_client._explore_params(module, sort_by, sort_desc, page_size, cursor, owner, stage,
+                                             source, date_column, date_from, date_to, open_only, raw_filter)
+    return await _rpc("explore_records", params, default=dict(database_client.EMPTY_EXPLORER_PAGE))
+
+async def get_deals_closing_soon_page(days: int = 30, page_size: int = 25):
+    """First page of open deals closing within `days`, soonest first, with the total match count."""
+    today = date.today()
+    return await explore_records("deals", sort_by="closed_time", sort_desc=False, page_size=page_size,
+                                 date_column="closed_time", date_from=today.isoformat(),
+                                 date_to=(today + timedelta(days=days)).isoformat(), open_only=True)
+
+async def get_sync_history(limit: int = 10):
+    """Returns last N sync log records for the System Health tab."""
+    r = await _get_client().from_("sync_logs").select("*").order("id", desc=True).limit(limit).execute()
+    return r.data
+
+async def get_latest_ai_briefing():
+    """Fetches the latest AI briefing from Supabase."""
+    res = await _get_client().from_("ai_briefings_log").select("markdown_content").order("id", desc=True).limit(1).execute()
+    if res.data:
+        return res.data[0]['markdown_content']
+    return None
+
+async def get_all_briefing_dates():
+    """Returns a list of all dates that have AI briefings, newest first."""
+    res = await _get_client().from_("ai_briefings_log").select("report_date").order("report_date", desc=True).execute()
+    if res.data:
+        return [row['report_date'] for row in res.data]
+    return []
+
+async def get_briefing_by_date(report_date: str):
+    """Fetches the AI briefing for a specific date."""
+    res = await _get_client().from_("ai_briefings_log").select("markdown_content").eq("report_date", report_date).execute()
+    if res.data:
+        return res.data[0]['markdown_content']
+    return None
+
+async def get_stage_metrics_summary(runs: int = 10):
+    """Per-run, per-stage totals for the last N instrumented runs (System Health tab)."""
+    return await _rpc("get_stage_metrics_summary", {"runs": runs}, default=[])
@@ -1,6 +1,10 @@
-from supabase import create_client, Client
-from datetime import datetime, timedelta
+from supabase import create_client, Client, ClientOptions
+from postgrest.exceptions import APIError
+from datetime import datetime, timedelta, timezone
 from core.config import Config
+from core import telemetry, fast_json, lead_scoring
+import itertools
+import requests
 import socket
 import urllib.request
 import json
@@ -33,69 +37,295 @@ def _bypass_isp_dns_block():
 
 _bypass_isp_dns_block()
 
-supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY)
+supabase: Client = create_client(Config.SUPABASE_URL, Config.SUPABASE_KEY, options=ClientOptions(schema=Config.SUPABASE_SCHEMA))
 
-def upsert_module_data(module_name: str, records: list):
+# Rows per upsert request — keeps each PostgREST body well under the request size limit
+UPSERT_CHUNK_SIZE = 500
+
+# Partitioned tables are keyed by (id, created_time): the partition key must be part of every unique index
+PARTITIONED_TABLES = {"leads_raw", "crm_deals"}
+
+# Zoho module → mirror table
+MODULE_TABLES = {"Leads": "leads_raw", "Deals": "crm_deals", "Contacts": "crm_contacts", "Accounts": "crm_accounts"}
+
+# The Zoho fields _map_record reads into typed columns — all a light (projected) sync requests
+TYPED_COLUMN_FIELDS = {
+    "Leads": ["Owner", "Created_Time", "Modified_Time", "Full_Name", "Lead_Source", "Lead_Status", "Annual_Revenue"],
+    "Deals": ["Owner", "Created_Time", "Modified_Time", "Deal_Name", "Stage", "Lead_Source", "Amount", "Closing_Date",
+              "Contact_Name"],
+    "Contacts": ["Owner", "Created_Time", "Modified_Time", "Full_Name", "Email"],
+    "Accounts": ["Owner", "Created_Time", "Modified_Time", "Account_Name", "Industry"],
+}
+
+# Mirror tables whose rows are matched into prospect clusters after every full upsert chunk (resolve_prospects)
+PROSPECT_MODULES = {"leads_raw": "Leads", "crm_contacts": "Contacts"}
+# Tables whose changes can move a lead between cohort cells (see refresh_lead_cohorts)
+COHORT_MODULES = {"leads_raw": "Leads", "crm_deals": "Deals", "crm_contacts": "Contacts"}
+
+# Bulk writes skip supabase-py: bodies are encoded once with fast_json and PostgREST answers with no body
+UPSERT_TIMEOUT_SECONDS = 120
+_rest_session = requests.Session()
+_rest_session.headers.update({
+    "apikey": Config.SUPABASE_KEY,
+    "Authorization": f"Bearer {Config.SUPABASE_KEY}",
+    "Content-Type": "application/json",
+    "Content-Profile": Config.SUPABASE_SCHEMA,
+})
+
+def _post_rows(table: str, rows: list, on_conflict: str = None) -> int:
+    """Inserts (or, with `on_conflict`, upserts) rows via PostgREST with return=minimal. Returns the body size."""
+    body = fast_json.dumps(rows)
+    params, prefer = {}, "return=minimal"
+    if on_conflict:
+        params["on_conflict"] = on_conflict
+        prefer += ",resolution=merge-duplicates"
+    response = _rest_session.post(f"{Config.SUPABASE_URL}/rest/v1/{table}", params=params, data=body,
+                                  headers={"Prefer": prefer}, timeout=UPSERT_TIMEOUT_SECONDS)
+    if response.status_code >= 300:
+        raise APIError({"message": f"{table} write failed (HTTP {response.status_code})",
+                        "code": str(response.status_code), "details": response.text[:500], "hint": None})
+    return len(body)
+
+def _map_record(module_name: str, rec: dict):
+    """Zoho record → mirror-table row (indexed columns + the untouched payload). None if it has no ID."""
+    rec_id = rec.get('id')
+    if not rec_id: return None
+
+    owner_obj = rec.get('Owner')
+    owner = owner_obj.get('name', 'Unassigned') if isinstance(owner_obj, dict) else 'Unassigned'
+
+    row = {
+        "id": rec_id,
+        "owner": owner,
+        "created_time": rec.get('Created_Time'),
+        "modified_time": rec.get('Modified_Time'),
+        "raw_data": rec  # JSONB insertion
+    }
+
+    if module_name == "Leads":
+        row["full_name"] = rec.get('Full_Name', 'Unknown')
+        row["lead_source"] = rec.get('Lead_Source', 'Unknown')
+        row["lead_status"] = rec.get('Lead_Status', 'New Lead')
+        row["annual_revenue"] = float(rec.get('Annual_Revenue', 0) or 0)
+    elif module_name == "Deals":
+        row["deal_name"] = rec.get('Deal_Name', 'Unknown')
+        row["stage"] = rec.get('Stage', 'Unknown')
+        row["source"] = rec.get('Lead_Source', 'Unknown')
+        row["amount"] = float(rec.get('Amount', 0) or 0)
+        row["closed_time"] = rec.get('Closing_Date')
+        contact = rec.get('Contact_Name')
+        row["contact_id"] = contact.get('id') if isinstance(contact, dict) else None
+    elif module_name == "Contacts":
+        row["full_name"] = rec.get('Full_Name', 'Unknown')
+        row["email"] = rec.get('Email', 'Unknown')
+    elif module_name == "Accounts":
+        row["account_name"] = rec.get('Account_Name', 'Unknown')
+        row["industry"] = rec.get('Industry', 'Unknown')
+    return row
+
+def upsert_module_data(module_name: str, records, light: bool = False) -> int:
     """
     Inserts or updates raw CRM records in Supabase (Cloud PostgreSQL).
     Safely stores the entire unfiltered exact payload in the `raw_data` JSONB column.
+    `records` may be a list or a stream (zoho_client.iter_incremental_module): records are mapped and
+    written UPSERT_CHUNK_SIZE at a time, so only one chunk is ever held in memory. Returns the rows written.
+    `light=True` (projected records) writes the typed columns only and leaves the stored raw_data untouched.
+    With a trained lead scoring model, every full Leads chunk carries each lead's junk_score in the same upsert.
+    Leads and Contacts chunks are then resolved into prospect clusters — on full upserts only, since a
+    light chunk carries no emails or phones; the next full pass resolves what light runs skipped.
+    Last, every Leads / Deals / Contacts chunk moves the leads it affects into their current lead cohort.
     """
-    if not records: return
-    formatted_data = []
-    table = None
-    
-    for rec in records:
-        rec_id = rec.get('id')
-        if not rec_id: continue
-        
-        owner_obj = rec.get('Owner')
-        owner = owner_obj.get('name', 'Unassigned') if isinstance(owner_obj, dict) else 'Unassigned'
-        
-        row = {
-            "id": rec_id,
-            "owner": owner,
-            "created_time": rec.get('Created_Time'),
-            "modified_time": rec.get('Modified_Time'),
-            "raw_data": rec  # JSONB insertion
-        }
-        
-        if module_name == "Leads":
-            row["full_name"] = rec.get('Full_Name', 'Unknown')
-            row["lead_source"] = rec.get('Lead_Source', 'Unknown')
-            row["lead_status"] = rec.get('Lead_Status', 'New Lead')
-            row["annual_revenue"] = float(rec.get('Annual_Revenue', 0) or 0)
-            table = "leads_raw"
-        elif module_name == "Deals":
-            row["deal_name"] = rec.get('Deal_Name', 'Unknown')
-            row["stage"] = rec.get('Stage', 'Unknown')
-            row["source"] = rec.get('Lead_Source', 'Unknown')
-            row["amount"] = float(rec.get('Amount', 0) or 0)
-            row["closed_time"] = rec.get('Closing_Date')
-            table = "crm_deals"
-        elif module_name == "Contacts":
-            row["full_name"] = rec.get('Full_Name', 'Unknown')
-            row["email"] = rec.get('Email', 'Unknown')
-            table = "crm_contacts"
-        elif module_name == "Accounts":
-            row["account_name"] = rec.get('Account_Name', 'Unknown')
-            row["industry"] = rec.get('Industry', 'Unknown')
-            table = "crm_accounts"
-            
-        formatted_data.append(row)
-        
-    if formatted_data and table:
-        supabase.table(table).upsert(formatted_data).execute()
-
-def log_sync(records_fetched: int):
+    table = MODULE_TABLES.get(module_name)
+    if not table: return 0
+
+    partitioned = Config.CRM_PARTITIONED and table in PARTITIONED_TABLES
+    on_conflict = "id,created_time" if partitioned else "id"
+
+    # Light chunks lack most scoring features, so they keep the score of the last full pass
+    scorer = lead_scoring.load_model(Config.LEAD_SCORE_MODEL_PATH) if module_name == "Leads" and not light else None
+
+    written = dropped = 0
+    for chunk_no, batch in enumerate(_batched(records, UPSERT_CHUNK_SIZE), start=1):
+        with telemetry.span("map", f"{module_name} #{chunk_no}") as map_span:
+            map_span["records"] = len(batch)
+            chunk = [row for row in (_map_record(module_name, rec) for rec in batch) if row]
+            if light:
+                for row in chunk:
+                    del row["raw_data"]
+        if scorer and chunk:
+            with telemetry.span("score", f"{module_name} #{chunk_no}") as score_span:
+                score_span["records"] = len(chunk)
+                for row, score in zip(chunk, lead_scoring.score_records(scorer, [row["raw_data"] for row in chunk])):
+                    row["junk_score"] = score
+        if partitioned:
+            # created_time is the partition key (NOT NULL); one bad row would otherwise fail its whole chunk
+            kept = [row for row in chunk if row["created_time"]]
+            dropped += len(chunk) - len(kept)
+            chunk = kept
+        if chunk:
+            _upsert_chunk(table, chunk, on_conflict, chunk_no, resolve=not light)
+            written += len(chunk)
+
+    if dropped:
+        logging.warning(f"Skipping {dropped} {module_name} record(s) without Created_Time (partition key).")
+    return written
+
+def _batched(records, size: int):
+    """Lists of up to `size` items, pulled lazily from any iterable."""
+    iterator = iter(records)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+def _upsert_chunk(table: str, chunk: list, on_conflict: str, chunk_no: int, resolve: bool = True):
+    transitions = _diff_deal_stages(chunk) if table == "crm_deals" else []
+    with telemetry.span("upsert", f"{table} #{chunk_no}") as upsert_span:
+        upsert_span["records"] = len(chunk)
+        upsert_span["bytes"] = _post_rows(table, chunk, on_conflict)
+    # Appended only after the upsert landed, so history never runs ahead of crm_deals
+    if transitions:
+        with telemetry.span("stage_history", f"{table} #{chunk_no}") as history_span:
+            history_span["records"] = len(transitions)
+            history_span["bytes"] = _post_rows("deal_stage_history", transitions)
+    # Also after the upsert: resolve_prospects reads the stored raw_data of the chunk's rows
+    if resolve and table in PROSPECT_MODULES:
+        with telemetry.span("resolve", f"{table} #{chunk_no}") as resolve_span:
+            resolved = resolve_prospects(PROSPECT_MODULES[table], [row["id"] for row in chunk])
+            resolve_span["records"] = resolved.get("records", 0)
+    # Last: cluster merges from the resolve step can link a lead to a deal
+    if table in COHORT_MODULES:
+        with telemetry.span("cohorts", f"{table} #{chunk_no}") as cohort_span:
+            refreshed = refresh_lead_cohorts(COHORT_MODULES[table], [row["id"] for row in chunk])
+            cohort_span["records"] = refreshed.get("leads", 0)
+
+def _diff_deal_stages(chunk: list) -> list:
+    """
+    Compares a chunk of mapped deal rows against their stored stage with one bulk lookup and
+    returns the deal_stage_history rows to append: new deals and deals whose stage changed.
+    """
+    with telemetry.span("stage_diff", f"{len(chunk)} deals") as diff_span:
+        r = supabase.rpc("get_deal_stages", {"deal_ids": [row["id"] for row in chunk]}).execute()
+        stored = r.data or {}
+        transitions = []
+        for row in chunk:
+            previous = stored.get(row["id"])
+            if previous == row["stage"]:
+                continue
+            transitions.append({
+                "deal_id": row["id"],
+                "from_stage": previous,
+                "to_stage": row["stage"],
+                "owner": row["owner"],
+                "amount": row["amount"],
+                # A first-seen deal entered its stage no later than its creation; a change, at its last modification
+                "changed_at": (row["created_time"] if previous is None else row["modified_time"]) or datetime.now().isoformat(),
+            })
+        diff_span["records"] = len(transitions)
+    return transitions
+
+def resolve_prospects(module: str, record_ids: list):
+    """
+    Matches stored Leads / Contacts into prospect clusters by normalized email and phone.
+    Returns {"records", "clusters_merged", "records_relabeled"}.
+    """
+    r = supabase.rpc("resolve_prospects", {"module_name": module, "record_ids": record_ids}).execute()
+    return r.data if r.data else {}
+
+def backfill_prospects(module: str, after_id: str = "", batch_size: int = 5000):
+    """Resolves the next `batch_size` Leads / Contacts with ids after `after_id`. Adds "last_id" to the result."""
+    r = supabase.rpc("backfill_prospects", {"module_name": module, "after_id": after_id, "batch_size": batch_size}).execute()
+    return r.data if r.data else {}
+
+def refresh_lead_cohorts(module: str, record_ids: list):
+    """
+    Moves the leads a Leads / Deals / Contacts chunk can affect into their current cohort cell.
+    Returns {"leads", "converted", "cells_touched"}.
+    """
+    r = supabase.rpc("refresh_lead_cohorts", {"module_name": module, "record_ids": record_ids}).execute()
+    return r.data if r.data else {}
+
+def backfill_lead_cohorts(after_id: str = "", batch_size: int = 5000):
+    """Refreshes the cohorts of the next `batch_size` leads with ids after `after_id`. Adds "last_id" to the result."""
+    r = supabase.rpc("backfill_lead_cohorts", {"after_id": after_id, "batch_size": batch_size}).execute()
+    return r.data if r.data else {}
+
+def get_lead_cohorts(weeks: int = 12, max_weeks: int = 12, source: str = None, owner: str = None):
+    """Cumulative lead → deal conversions by creation week (see get_lead_cohorts in supabase_analytics.sql)."""
+    r = supabase.rpc("get_lead_cohorts", {"weeks": weeks, "max_weeks": max_weeks,
+                                          "source_filter": source, "owner_filter": owner}).execute()
+    return r.data if r.data else {}
+
+def iter_leads_for_scoring(page_size: int = 1000):
+    """Every stored lead as {"id", "created_time", "lead_status", "raw_data"}, in id order, one page per request."""
+    after_id = ""
+    while True:
+        res = (supabase.table("leads_raw").select("id, created_time, lead_status, raw_data")
+               .gt("id", after_id).order("id").limit(page_size).execute())
+        rows = res.data or []
+        yield from rows
+        if len(rows) < page_size:
+            break
+        after_id = rows[-1]["id"]
+
+def save_lead_scores(rows: list) -> int:
+    """Writes {"id", "created_time", "junk_score"} rows onto existing leads (other columns untouched). Returns rows written."""
+    partitioned = Config.CRM_PARTITIONED and "leads_raw" in PARTITIONED_TABLES
+    for chunk in _batched(rows, UPSERT_CHUNK_SIZE):
+        if not partitioned:
+            chunk = [{"id": row["id"], "junk_score": row["junk_score"]} for row in chunk]
+        with telemetry.span("upsert", f"leads_raw scores ({len(chunk)})") as upsert_span:
+            upsert_span["records"] = len(chunk)
+            upsert_span["bytes"] = _post_rows("leads_raw", chunk, "id,created_time" if partitioned else "id")
+    return len(rows)
+
+def get_likely_junk_leads(target_date_iso: str = None, days: int = 1, top_n: int = 20):
+    """Unworked leads created in the `days` up to the target date that the model scores as likely junk."""
+    r = supabase.rpc("get_likely_junk_leads", {"target_date_iso": target_date_iso, "days": days,
+                                               "threshold": Config.LIKELY_JUNK_THRESHOLD, "top_n": top_n}).execute()
+    return r.data if r.data else {}
+
+def ensure_partitions(months_ahead: int = 3):
+    """Creates any missing monthly partitions up to `months_ahead` months from now (no-op when unpartitioned)."""
+    r = supabase.rpc("ensure_crm_partitions", {"months_ahead": months_ahead}).execute()
+    return r.data if r.data else {}
+
+def archive_raw_data(months: int = 12, batch_size: int = 5000):
+    """Moves one batch of raw_data older than `months` into crm_raw_archive. Returns {"cutoff", "moved": {module: n}}."""
+    r = supabase.rpc("archive_raw_data", {"months": months, "batch_size": batch_size}).execute()
+    return r.data if r.data else {}
+
+def get_archived_raw_data(module: str, record_id: str):
+    """Full original Zoho payload of an archived Leads/Deals record, or None."""
+    r = supabase.rpc("get_archived_raw_data", {"module": module, "record_id": record_id}).execute()
+    return r.data
+
+def log_sync(records_fetched: int, status: str = "SUCCESS", run_id: str = None, sync_mode: str = "full"):
     supabase.table("sync_logs").insert({
         "sync_time": datetime.now().isoformat(),
         "records_fetched": records_fetched,
-        "status": "SUCCESS"
+        "status": status,
+        "run_id": run_id,
+        "sync_mode": sync_mode
     }).execute()
 
-def get_last_sync_time():
-    """Returns the ISO timestamp of the last successful sync, or None."""
-    response = supabase.table("sync_logs").select("sync_time").eq("status", "SUCCESS").order("id", desc=True).limit(1).execute()
+def log_stage_metrics(spans: list):
+    """Persists the per-stage spans of a pipeline run into `sync_stage_metrics`."""
+    if not spans: return
+    supabase.table("sync_stage_metrics").insert(spans).execute()
+
+def get_stage_metrics_summary(runs: int = 10):
+    """Per-run, per-stage totals for the last N instrumented runs (System Health tab)."""
+    r = supabase.rpc("get_stage_metrics_summary", {"runs": runs}).execute()
+    return r.data if r.data else []
+
+def get_last_sync_time(full_only: bool = False):
+    """
+    Returns the ISO timestamp of the last successful sync, or None.
+    `full_only` ignores light (projected) syncs — the watermark for refreshing raw_data.
+    """
+    query = supabase.table("sync_logs").select("sync_time").eq("status", "SUCCESS")
+    if full_only:
+        query = query.eq("sync_mode", "full")
+    response = query.order("id", desc=True).limit(1).execute()
     data = response.data
     return data[0]['sync_time'] if data else None
 
@@ -109,6 +339,14 @@ def get_advanced_analytics(target_date_iso=None):
     r = supabase.rpc("get_advanced_analytics", {"target_date_iso": target_date_iso}).execute()
     return r.data if r.data else {}
 
+def get_advanced_analytics_range(start_date: str, end_date: str):
+    """
+    One RPC for a whole date range: {"YYYY-MM-DD": get_advanced_analytics payload + pipeline_today,
+    won/lost counts and values}. Used by the briefing backfill; ranges are capped at 731 days.
+    """
+    r = supabase.rpc("get_advanced_analytics_range", {"start_date": start_date, "end_date": end_date}).execute()
+    return r.data if r.data else {}
+
 # ─────────────────────────────────────────────────────────────
 # PHASE 12: COMPREHENSIVE ANALYTICS — ALL TABLES 
 # (NOW POWERED BY POSTGRESQL NATIVE COMPUTATION)
@@ -146,6 +384,18 @@ def get_deals_closing_soon(days: int = 30):
     r = supabase.rpc("get_deals_closing_soon", {"days": days}).execute()
     return r.data if r.data else []
 
+def get_deal_time_in_stage():
+    r = supabase.rpc("get_deal_time_in_stage").execute()
+    return r.data if r.data else {}
+
+def get_deal_velocity_by_owner():
+    r = supabase.rpc("get_deal_velocity_by_owner").execute()
+    return r.data if r.data else {}
+
+def get_stage_conversion():
+    r = supabase.rpc("get_stage_conversion").execute()
+    return r.data if r.data else {}
+
 def get_won_vs_lost():
     r = supabase.rpc("get_won_vs_lost").execute()
     return r.data if r.data else {}
@@ -162,19 +412,101 @@ def get_source_quality_all_time():
     r = supabase.rpc("get_source_quality_all_time").execute()
     return r.data if r.data else {}
 
+def get_promoted_fields():
+    """Custom Zoho fields that have been promoted to indexed columns, grouped as {module: [field, ...]}."""
+    res = supabase.table("promoted_fields").select("module, field").order("field").execute()
+    fields = {}
+    for row in res.data or []:
+        fields.setdefault(row["module"], []).append(row["field"])
+    return fields
+
+def get_custom_field_breakdown(module: str, field: str, top_n: int = 20):
+    """Leads (pipeline vs junk) or Deals (count, open and won value) grouped by a promoted custom field."""
+    r = supabase.rpc("get_custom_field_breakdown", {"module": module, "field": field, "top_n": top_n}).execute()
+    return r.data if r.data else {}
+
+def get_forecast_inputs():
+    """Open deals as parallel arrays {"stage", "amount", "close_month", "owner"} plus closed-deal outcomes per stage (core/forecast.py)."""
+    r = supabase.rpc("get_forecast_inputs").execute()
+    return r.data if r.data else {}
+
+TIME_SERIES_METRICS = ["leads", "pipeline_created", "won_value"]
+TIME_SERIES_GROUPS = ["owner", "source", "stage"]
+
+def get_time_series(metric: str, start_date: str = None, end_date: str = None, group_by: str = None,
+                    max_points: int = 120, top_groups: int = 8):
+    """
+    One metric bucketed server-side by day, week or month — whichever keeps the range within `max_points`.
+    Dates are "YYYY-MM-DD" (None = from the first record / today). Returns {"granularity", "start_date",
+    "end_date", "buckets": [...], "series": {group: [value per bucket]}}; small groups fold into "Other".
+    """
+    r = supabase.rpc("get_time_series", {"metric": metric, "start_date": start_date, "end_date": end_date,
+                                         "group_by": group_by, "max_points": max_points,
+                                         "top_groups": top_groups}).execute()
+    return r.data if r.data else {}
+
+EMPTY_EXPLORER_PAGE = {"rows": [], "total": 0, "has_more": False, "next_cursor": None}
+
+def _explore_params(module, sort_by, sort_desc, page_size, cursor, owner, stage, source,
+                    date_column, date_from, date_to, open_only, raw_filter=None):
+    """Builds the explore_records RPC payload. `cursor` is the previous page's `next_cursor` (None for page one)."""
+    return {
+        "module": module,
+        "sort_by": sort_by,
+        "sort_desc": sort_desc,
+        "page_size": page_size,
+        "cursor_value": cursor["value"] if cursor else None,
+        "cursor_id": cursor["id"] if cursor else None,
+        "owner_filter": owner,
+        "stage_filter": stage,
+        "source_filter": source,
+        "date_column": date_column,
+        "date_from": date_from,
+        "date_to": date_to,
+        "open_only": open_only,
+        "raw_filter": raw_filter,
+    }
+
+def explore_records(module: str, sort_by: str = "created_time", sort_desc: bool = True, page_size: int = 50,
+                    cursor: dict = None, owner: str = None, stage: str = None, source: str = None,
+                    date_column: str = "created_time", date_from: str = None, date_to: str = None,
+                    open_only: bool = False, raw_filter: dict = None):
+    """
+    One keyset-paginated page of crm_deals ("deals") or leads_raw ("leads"), sorted and filtered in Postgres.
+    `raw_filter` matches raw Zoho attributes by containment, e.g. {"City": "Pune"}.
+    Returns {"rows", "total" (first page only), "has_more", "next_cursor"}.
+    """
+    r = supabase.rpc("explore_records", _explore_params(module, sort_by, sort_desc, page_size, cursor, owner, stage,
+                                                        source, date_column, date_from, date_to, open_only,
+                                                        raw_filter)).execute()
+    return r.data if r.data else dict(EMPTY_EXPLORER_PAGE)
+
+def get_data_version():
+    """Returns an opaque token that changes whenever new sync data or a new AI briefing is written."""
+    r = supabase.rpc("get_data_version").execute()
+    return str(r.data) if r.data is not None else "0"
+
 def get_sync_history(limit: int = 10):
     """Returns last N sync log records for the System Health tab."""
     r = supabase.table("sync_logs").select("*").order("id", desc=True).limit(limit).execute()
     return r.data
 
-def log_ai_briefing(markdown_content: str):
-    """Saves the AI Briefing to the cloud database."""
-    today = datetime.now().strftime("%Y-%m-%d")
+def log_ai_briefing(markdown_content: str, report_date: str = None):
+    """Saves the AI Briefing to the cloud database (today's date unless `report_date` is given)."""
     supabase.table("ai_briefings_log").upsert({
-        "report_date": today,
+        "report_date": report_date or datetime.now().strftime("%Y-%m-%d"),
         "markdown_content": markdown_content
     }, on_conflict="report_date").execute()
 
+def log_ai_briefings_bulk(briefings: dict):
+    """Upserts many {report_date: markdown_content} briefings, UPSERT_CHUNK_SIZE rows per request."""
+    rows = [{"report_date": d, "markdown_content": md} for d, md in sorted(briefings.items())]
+    for i in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[i:i + UPSERT_CHUNK_SIZE]
+        with telemetry.span("upsert", f"ai_briefings_log [{i}:{i + len(chunk)}]") as span:
+            span["records"] = len(chunk)
+            supabase.table("ai_briefings_log").upsert(chunk, on_conflict="report_date").execute()
+
 def get_latest_ai_briefing():
     """Fetches the latest AI briefing from Supabase."""
     res = supabase.table("ai_briefings_log").select("markdown_content").order("id", desc=True).limit(1).execute()
@@ -189,9 +521,39 @@ def get_all_briefing_dates():
         return [row['report_date'] for row in res.data]
     return []
 
+def get_briefing_dates_between(start_date: str, end_date: str, page_size: int = 1000) -> list:
+    """Dates in [start_date, end_date] that have an AI briefing, oldest first, one keyset page per request."""
+    dates, after = [], None
+    while True:
+        query = supabase.table("ai_briefings_log").select("report_date").gte("report_date", start_date).lte("report_date", end_date)
+        if after:
+            query = query.gt("report_date", after)
+        rows = query.order("report_date").limit(page_size).execute().data or []
+        dates.extend(row["report_date"] for row in rows)
+        if len(rows) < page_size:
+            return dates
+        after = rows[-1]["report_date"]
+
 def get_briefing_by_date(report_date: str):
     """Fetches the AI briefing for a specific date."""
     res = supabase.table("ai_briefings_log").select("markdown_content").eq("report_date", report_date).execute()
     if res.data:
         return res.data[0]['markdown_content']
     return None
+
+def get_briefing_deliveries(report_date: str) -> dict:
+    """Returns {recipient: {"message", "sent_at"}} of the WhatsApp briefings stored for `report_date`."""
+    res = supabase.table("briefing_deliveries").select("recipient, message, sent_at").eq("report_date", report_date).execute()
+    return {row["recipient"]: {"message": row["message"], "sent_at": row["sent_at"]} for row in res.data or []}
+
+def save_briefing_messages(report_date: str, messages: dict):
+    """Stores {recipient: message} before sending; an existing row keeps its sent_at."""
+    if not messages:
+        return
+    rows = [{"report_date": report_date, "recipient": r, "message": m} for r, m in messages.items()]
+    supabase.table("briefing_deliveries").upsert(rows, on_conflict="report_date,recipient").execute()
+
+def mark_briefing_delivered(report_date: str, recipient: str):
+    """Records that `recipient`'s briefing for `report_date` went out."""
+    sent_at = datetime.now(timezone.utc).isoformat()
+    supabase.table("briefing_deliveries").update({"sent_at": sent_at}).eq("report_date", report_date).eq("recipient", recipient).execute()
@@ -1,8 +1,67 @@
+import time
+import threading
+from datetime import datetime, timedelta, timezone
 import requests
 from core.config import Config
+from core import telemetry, fast_json
+from services.zoho_traffic import TrafficRecorder, TrafficReplayer
 
-def get_access_token():
-    """Generates a short-lived Access Token using the permanent Refresh Token."""
+# Zoho CRM v2 caps list responses at 200 records per page
+PAGE_SIZE = 200
+
+# Every module the pipeline mirrors into Supabase (polled by the sync, watched by the push receiver)
+SYNC_MODULES = ["Leads", "Deals", "Contacts", "Accounts"]
+
+# Refresh a cached access token this long before Zoho's stated expiry
+TOKEN_EXPIRY_MARGIN_SECONDS = 300
+
+# One keep-alive session for every Zoho call; long-running callers skip TCP/TLS setup per request
+_session = requests.Session()
+_token_cache = {"token": None, "expires_at": 0.0}
+
+# Zoho meters API credits per org; ZOHO_MAX_REQUESTS_PER_MINUTE spaces data requests evenly (0 = no pacing)
+_min_request_interval = 60.0 / Config.ZOHO_MAX_REQUESTS_PER_MINUTE if Config.ZOHO_MAX_REQUESTS_PER_MINUTE > 0 else 0.0
+_pace = {"next_at": 0.0}
+_pace_lock = threading.Lock()
+
+_recorder = TrafficRecorder(Config.ZOHO_CAPTURE_PATH) if Config.ZOHO_CAPTURE_PATH else None
+_replayer = TrafficReplayer(Config.ZOHO_REPLAY_PATH, Config.ZOHO_REPLAY_LATENCY_MS) if Config.ZOHO_REPLAY_PATH else None
+
+def _api_get(url, headers, params):
+    """
+    Single choke point for Zoho data requests: serves from a replay archive when
+    ZOHO_REPLAY_PATH is set, and appends to a capture archive when ZOHO_CAPTURE_PATH is set.
+    """
+    if _replayer:
+        return _replayer.get(url, params)
+    if _min_request_interval:
+        _wait_for_request_slot()
+    t0 = time.perf_counter()
+    response = _session.get(url, headers=headers, params=params)
+    if _recorder:
+        _recorder.record(url, params, headers, response, (time.perf_counter() - t0) * 1000)
+    return response
+
+def _wait_for_request_slot():
+    """Reserves the next free request slot and sleeps until it arrives."""
+    with _pace_lock:
+        now = time.monotonic()
+        slot = max(now, _pace["next_at"])
+        _pace["next_at"] = slot + _min_request_interval
+    if slot > now:
+        time.sleep(slot - now)
+
+def get_access_token(force_refresh: bool = False):
+    """
+    Generates a short-lived Access Token using the permanent Refresh Token.
+    The token is cached until shortly before it expires (Zoho issues them for an hour),
+    so a resident scheduler exchanges tokens at most once per hour instead of once per cycle.
+    """
+    if _replayer:
+        print("▶️  Replay mode: skipping Zoho token exchange.")
+        return "replay-token"
+    if not force_refresh and _token_cache["token"] and time.time() < _token_cache["expires_at"]:
+        return _token_cache["token"]
     print("Fetching new Access Token from Zoho...")
     url = f"{Config.ZOHO_ACCOUNTS_URL}/oauth/v2/token"
     # Note: For grabbing an access token from a refresh token, we pass the refresh token
@@ -14,11 +73,13 @@ def get_access_token():
         "refresh_token": Config.ZOHO_REFRESH_TOKEN
     }
     
-    response = requests.post(url, data=data)
+    response = _session.post(url, data=data)
     result = response.json()
     
     if "access_token" in result:
         print("✅ Access Token acquired successfully!")
+        _token_cache["token"] = result["access_token"]
+        _token_cache["expires_at"] = time.time() + int(result.get("expires_in", 3600)) - TOKEN_EXPIRY_MARGIN_SECONDS
         return result["access_token"]
     else:
         print("❌ Failed to get Access Token:")
@@ -29,8 +90,19 @@ def fetch_incremental_module(access_token, module_name="Leads", last_sync_iso=No
     """
     Fetches all records created or modified after the last_sync_iso date for ANY module.
     Pulls completely unfiltered JSON payloads for infinite JSONB scalability.
+    Returns the whole module as one list — the sync streams with iter_incremental_module instead.
+    """
+    return list(iter_incremental_module(access_token, module_name, last_sync_iso))
+
+def iter_incremental_module(access_token, module_name="Leads", last_sync_iso=None, fields=None):
     """
-    print(f"\nFetching incremental {module_name} from Zoho CRM (Since: {last_sync_iso or 'Beginning of Time'})...")
+    Yields every record created or modified after last_sync_iso, one page at a time.
+    Follows `info.more_records` so every page is retrieved, not just the first 200 records.
+    Only the current page is ever held in memory, and its raw body is released before its records are yielded.
+    `fields` projects each record to those API names (plus `id`); by default the complete record is pulled.
+    """
+    print(f"\nFetching incremental {module_name}{' (projected)' if fields else ''} from Zoho CRM "
+          f"(Since: {last_sync_iso or 'Beginning of Time'})...")
     url = f"{Config.ZOHO_API_URL}/crm/v2/{module_name}"
     
     headers = {
@@ -40,21 +112,98 @@ def fetch_incremental_module(access_token, module_name="Leads", last_sync_iso=No
     if last_sync_iso:
         headers["If-Modified-Since"] = last_sync_iso
     
-    # Intentionally removed the 'fields' parameter constraint to fetch the complete data object
-    params = {}
-    
-    response = requests.get(url, headers=headers, params=params)
+    fetched = 0
+    page = 1
+    while True:
+        # Without `fields` Zoho returns the complete data object (the raw_data payload)
+        params = {"page": page, "per_page": PAGE_SIZE}
+        if fields:
+            params["fields"] = ",".join(fields)
+        page_records = []
+        
+        with telemetry.span("fetch", f"{module_name} p{page}") as span:
+            response = _api_get(url, headers, params)
+            span["bytes"] = len(response.content)
+            
+            if response.status_code == 200:
+                data = fast_json.loads(response.content)
+                page_records = data.get("data", [])
+                span["records"] = len(page_records)
+                more_records = data.get("info", {}).get("more_records", False)
+            elif response.status_code == 204 or response.status_code == 304:
+                more_records = False
+            else:
+                span["status"] = "ERROR"
+                span["error"] = f"HTTP {response.status_code}: {response.text[:300]}"
+                print(f"❌ Failed to fetch {module_name} page {page} (Status {response.status_code}):")
+                print(response.text)
+                return
+        
+        response = data = None
+        fetched += len(page_records)
+        yield from page_records
+        page_records = None
+
+        if not more_records:
+            break
+        page += 1
     
-    if response.status_code == 200:
-        data = response.json()
-        records = data.get("data", [])
-        print(f"✅ Successfully fetched {len(records)} updated/new {module_name}!")
-        return records
-    elif response.status_code == 204 or response.status_code == 304:
-        print(f"✅ No new {module_name} modified since last sync.")
-        return []
+    if fetched:
+        print(f"✅ Successfully fetched {fetched} updated/new {module_name} across {page} page(s)!")
     else:
-        print(f"❌ Failed to fetch {module_name} (Status {response.status_code}):")
-        print(response.text)
-        return []
+        print(f"✅ No new {module_name} modified since last sync.")
+
+# Zoho's `ids` filter on the list endpoint accepts at most 100 record IDs per request
+IDS_PER_REQUEST = 100
 
+def fetch_records_by_ids(access_token, module_name, ids):
+    """
+    Fetches full records for specific IDs (e.g. those named in push notifications),
+    up to 100 per request. Deleted or inaccessible IDs are simply absent from the result.
+    """
+    url = f"{Config.ZOHO_API_URL}/crm/v2/{module_name}"
+    headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
+    ids = list(dict.fromkeys(ids))
+
+    records = []
+    for i in range(0, len(ids), IDS_PER_REQUEST):
+        batch = ids[i:i + IDS_PER_REQUEST]
+        params = {"ids": ",".join(batch)}
+        with telemetry.span("fetch", f"{module_name} ids[{i // IDS_PER_REQUEST + 1}]") as span:
+            response = _api_get(url, headers, params)
+            span["bytes"] = len(response.content)
+            if response.status_code == 200:
+                page_records = fast_json.loads(response.content).get("data", [])
+                span["records"] = len(page_records)
+                records.extend(page_records)
+            elif response.status_code != 204:
+                span["status"] = "ERROR"
+                span["error"] = f"HTTP {response.status_code}: {response.text[:300]}"
+                print(f"❌ Failed to fetch {len(batch)} {module_name} by ID (Status {response.status_code}):")
+                print(response.text)
+    return records
+
+def enable_notifications(access_token, notify_url, channel_id, modules, token, expiry_hours=24):
+    """
+    Subscribes (or renews) a Zoho Notification API watch channel so every create/edit/delete
+    in `modules` is POSTed to `notify_url`. Zoho expires channels, so callers renew before `expiry_hours`.
+    """
+    url = f"{Config.ZOHO_API_URL}/crm/v2/actions/watch"
+    headers = {"Authorization": f"Zoho-oauthtoken {access_token}"}
+    expiry = (datetime.now(timezone.utc) + timedelta(hours=expiry_hours)).replace(microsecond=0)
+    body = {"watch": [{
+        "channel_id": str(channel_id),
+        "events": [f"{module}.all" for module in modules],
+        "notify_url": notify_url,
+        "token": token,
+        "channel_expiry": expiry.isoformat(),
+    }]}
+    response = _session.post(url, headers=headers, json=body)
+    result = response.json() if response.content else {}
+    statuses = [w.get("status") for w in result.get("watch", [])]
+    if response.status_code in (200, 201) and statuses and all(s == "success" for s in statuses):
+        print(f"✅ Zoho notifications enabled for {', '.join(modules)} → {notify_url} (until {expiry.isoformat()})")
+        return True
+    print(f"❌ Failed to enable Zoho notifications (Status {response.status_code}):")
+    print(result or response.text)
+    return False
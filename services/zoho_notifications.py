@@ -0,0 +1,208 @@
+import json
+import time
+import socket
+import logging
+import ipaddress
+import threading
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+# ─────────────────────────────────────────────────────────────
+# ZOHO NOTIFICATION (PUSH) RECEIVER
+# Zoho's Notification API POSTs {"module", "ids", "operation", "token", ...} to our
+# notify URL whenever a watched record changes. Events are acknowledged immediately
+# and their IDs are coalesced for a short window, so a burst of edits becomes one
+# bulk fetch-by-ID per module instead of one API call per event.
+# ─────────────────────────────────────────────────────────────
+
+NOTIFY_PATH = "/zoho/notify"
+
+def is_loopback(host: str) -> bool:
+    """True when `host` only accepts connections from this machine."""
+    try:
+        return all(ipaddress.ip_address(info[4][0]).is_loopback
+                   for info in socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP))
+    except (OSError, ValueError):
+        return False
+
+class NotificationBuffer:
+    """
+    Thread-safe per-module set of changed record IDs. The first event into an empty buffer
+    opens a coalescing window; everything that arrives before it closes is flushed together.
+    """
+
+    def __init__(self, window_seconds: float = 5.0, max_ids: int = 2000):
+        self.window_seconds = window_seconds
+        self.max_ids = max_ids
+        self.stats = {"events": 0, "ids": 0, "duplicates": 0, "deletes": 0, "rejected": 0, "batches": 0}
+        self._pending = {}
+        self._window_opened_at = None
+        self._cond = threading.Condition()
+
+    def add(self, module: str, ids: list, operation: str = "update"):
+        with self._cond:
+            self.stats["events"] += 1
+            pending = self._pending.setdefault(module, {})
+            if operation == "delete":
+                # Nothing to fetch; the sync has never removed rows, so deletes are only counted
+                self.stats["deletes"] += len(ids)
+                for record_id in ids:
+                    pending.pop(str(record_id), None)
+                return
+            for record_id in ids:
+                record_id = str(record_id)
+                if record_id in pending:
+                    self.stats["duplicates"] += 1
+                else:
+                    pending[record_id] = time.monotonic()
+                    self.stats["ids"] += 1
+            if self._window_opened_at is None:
+                self._window_opened_at = time.monotonic()
+            self._cond.notify_all()
+
+    def reject(self):
+        with self._cond:
+            self.stats["rejected"] += 1
+
+    def wake(self):
+        """Interrupts a blocked `take_batch` so it can observe a stop request."""
+        with self._cond:
+            self._cond.notify_all()
+
+    def size(self) -> int:
+        with self._cond:
+            return self._size()
+
+    def _size(self) -> int:
+        return sum(len(ids) for ids in self._pending.values())
+
+    def take_batch(self, stop_event: threading.Event) -> dict:
+        """
+        Blocks until the window closes, the buffer reaches `max_ids`, or `stop_event` is set.
+        Returns {module: {record_id: first_seen_monotonic}}; {} when stopping with nothing pending.
+        """
+        with self._cond:
+            while True:
+                if self._window_opened_at is not None:
+                    remaining = self.window_seconds - (time.monotonic() - self._window_opened_at)
+                    if remaining <= 0 or self._size() >= self.max_ids or stop_event.is_set():
+                        break
+                    self._cond.wait(remaining)
+                elif stop_event.is_set():
+                    return {}
+                else:
+                    self._cond.wait(0.5)
+            batch = {module: ids for module, ids in self._pending.items() if ids}
+            self._pending = {}
+            self._window_opened_at = None
+            if batch:
+                self.stats["batches"] += 1
+            return batch
+
+class _NotificationHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, Nagle + delayed ACK add ~40ms per event
+    disable_nagle_algorithm = True
+    receiver = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            return self._reply(200, {"pending": self.receiver.buffer.size(), **self.receiver.buffer.stats})
+        self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0) or 0)
+        raw = self.rfile.read(length)
+        if urlparse(self.path).path != NOTIFY_PATH:
+            return self._reply(404, {"error": "not found"})
+        try:
+            event = json.loads(raw or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "invalid JSON"})
+
+        receiver = self.receiver
+        if receiver.token and event.get("token") != receiver.token:
+            receiver.buffer.reject()
+            return self._reply(401, {"error": "invalid token"})
+        module, ids = event.get("module"), event.get("ids") or []
+        if module not in receiver.modules or not isinstance(ids, list):
+            receiver.buffer.reject()
+            return self._reply(400, {"error": f"unsupported module {module!r}"})
+
+        # Acknowledge first; Zoho retries (and eventually disables the channel) on slow responses
+        receiver.buffer.add(module, ids, event.get("operation", "update"))
+        self._reply(200, {"status": "queued", "ids": len(ids)})
+
+class NotificationReceiver:
+    """
+    HTTP endpoint + flusher thread. `flush(batch)` receives {module: [record_ids]} once per
+    coalescing window and is called from a single thread, so batches never overlap.
+    """
+
+    def __init__(self, flush, modules, window_seconds: float = 5.0, host: str = "0.0.0.0",
+                 port: int = 8765, token: str = None, max_ids: int = 2000):
+        # Without a token anyone who can reach the port could make us fetch and upsert arbitrary IDs
+        if not token and not is_loopback(host):
+            raise ValueError(f"Refusing to listen on {host} without a token; set ZOHO_NOTIFY_TOKEN "
+                             "or bind a loopback address such as 127.0.0.1.")
+        self.flush = flush
+        self.modules = set(modules)
+        self.token = token
+        self.buffer = NotificationBuffer(window_seconds, max_ids)
+        self.lag_ms = deque(maxlen=10000)    # event-to-flushed latency of recent IDs
+        self._stop = threading.Event()
+        handler = type("BoundNotificationHandler", (_NotificationHandler,), {"receiver": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.url = f"http://{host if host != '0.0.0.0' else '127.0.0.1'}:{self.httpd.server_address[1]}{NOTIFY_PATH}"
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self.httpd.serve_forever, daemon=True, name="notify-http"),
+            threading.Thread(target=self._flush_loop, daemon=True, name="notify-flush"),
+        ]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        """Stops accepting events, flushes whatever is still buffered, then returns."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._stop.set()
+        self.buffer.wake()
+        self._threads[1].join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _flush_loop(self):
+        while True:
+            batch = self.buffer.take_batch(self._stop)
+            if not batch:
+                if self._stop.is_set():
+                    return
+                continue
+            try:
+                self.flush({module: list(ids) for module, ids in batch.items()})
+            except Exception as e:
+                # The IDs are not retried here; the scheduled poll picks the changes up
+                logging.error(f"❌ Notification flush failed ({sum(len(i) for i in batch.values())} IDs): {e}")
+                continue
+            now = time.monotonic()
+            self.lag_ms.extend((now - seen) * 1000 for ids in batch.values() for seen in ids.values())
@@ -0,0 +1,114 @@
+import os
+import gzip
+import json
+import time
+import logging
+import threading
+from collections import defaultdict, deque
+from datetime import datetime
+from urllib.parse import urlparse
+
+# ─────────────────────────────────────────────────────────────
+# ZOHO TRAFFIC CAPTURE & REPLAY
+# Capture appends every Zoho API response page (status, headers, body, timing) to a
+# gzip-compressed JSON-lines archive during a normal run. Replay serves those pages back
+# to zoho_client in place of the network, so the fetch → map → upsert path can be
+# profiled deterministically and offline.
+# ─────────────────────────────────────────────────────────────
+
+# Never persist credentials into an archive
+_REDACTED_HEADERS = {"authorization", "set-cookie"}
+
+def _request_key(url: str, params: dict) -> str:
+    """Identifies a request by path + query params (host and auth are irrelevant for replay)."""
+    path = urlparse(url).path
+    query = "&".join(f"{k}={params[k]}" for k in sorted(params or {}))
+    return f"{path}?{query}"
+
+class TrafficRecorder:
+    """Appends one archive entry per response. Each write is its own gzip member, so a crashed run leaves a readable archive."""
+
+    def __init__(self, archive_path: str):
+        self.archive_path = archive_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(archive_path)), exist_ok=True)
+
+    def record(self, url: str, params: dict, request_headers: dict, response, elapsed_ms: float):
+        entry = {
+            "key": _request_key(url, params),
+            "url": url,
+            "params": params or {},
+            "request_headers": {k: v for k, v in request_headers.items() if k.lower() not in _REDACTED_HEADERS},
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in _REDACTED_HEADERS},
+            "body": response.text,
+            "elapsed_ms": round(elapsed_ms, 2),
+            "captured_at": datetime.now().isoformat(),
+        }
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock, gzip.open(self.archive_path, "ab") as f:
+            f.write(line)
+
+class ReplayResponse:
+    """The subset of `requests.Response` that zoho_client reads."""
+
+    def __init__(self, status_code: int, headers: dict, body: str):
+        self.status_code = status_code
+        self.headers = headers
+        self.text = body
+        self.content = body.encode("utf-8")
+
+    def json(self):
+        return json.loads(self.text)
+
+def _parse_latency(latency):
+    """Validates ZOHO_REPLAY_LATENCY_MS up front: None, "recorded", or a non-negative number of milliseconds."""
+    if latency is None or str(latency).strip() == "":
+        return None
+    if str(latency).strip().lower() == "recorded":
+        return "recorded"
+    try:
+        ms = float(latency)
+    except (TypeError, ValueError):
+        ms = None
+    if ms is None or not 0 <= ms < float("inf"):
+        raise ValueError(f"ZOHO_REPLAY_LATENCY_MS must be a number of milliseconds (e.g. 50) or \"recorded\", got {latency!r}")
+    return ms
+
+class TrafficReplayer:
+    """
+    Serves captured responses in capture order per request key. When the same page was captured
+    more than once, consecutive requests get consecutive captures; the last one repeats after that.
+
+    latency: None for no delay, a number of milliseconds per response, or "recorded" to
+    reproduce each page's original response time.
+    """
+
+    def __init__(self, archive_path: str, latency=None):
+        self.archive_path = archive_path
+        self.latency = _parse_latency(latency)
+        self._entries = defaultdict(deque)
+        self._lock = threading.Lock()
+        with gzip.open(archive_path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+        logging.info(f"▶️  Replaying {sum(len(q) for q in self._entries.values())} captured Zoho responses from {archive_path}")
+
+    def get(self, url: str, params: dict) -> ReplayResponse:
+        key = _request_key(url, params)
+        with self._lock:
+            queue = self._entries.get(key)
+            if not queue:
+                logging.warning(f"No captured response for {key}; replaying as 204 No Content.")
+                return ReplayResponse(204, {}, "")
+            entry = queue.popleft() if len(queue) > 1 else queue[0]
+        self._sleep(entry)
+        return ReplayResponse(entry["status"], entry["headers"], entry["body"])
+
+    def _sleep(self, entry: dict):
+        if self.latency == "recorded":
+            time.sleep(entry.get("elapsed_ms", 0) / 1000)
+        elif self.latency:
+            time.sleep(self.latency / 1000)
@@ -13,6 +13,7 @@ AS $$
 DECLARE
     result json;
     t_leads int;
+    t_prospects int;
     t_deals int;
     t_contacts int;
     t_accounts int;
@@ -23,6 +24,8 @@ DECLARE
     junk_pct int;
 BEGIN
     SELECT count(*) INTO t_leads FROM leads_raw;
+    SELECT count(DISTINCT coalesce(pc.cluster_id, l.id)) INTO t_prospects
+    FROM leads_raw l LEFT JOIN prospect_clusters pc ON pc.module = 'Leads' AND pc.record_id = l.id;
     SELECT count(*) INTO t_deals FROM crm_deals;
     SELECT count(*) INTO t_contacts FROM crm_contacts;
     SELECT count(*) INTO t_accounts FROM crm_accounts;
@@ -39,6 +42,7 @@ BEGIN
 
     SELECT json_build_object(
         'total_leads', t_leads,
+        'unique_prospects', t_prospects,
         'total_deals', t_deals,
         'total_contacts', t_contacts,
         'total_accounts', t_accounts,
@@ -240,6 +244,7 @@ DECLARE
     target_end text;
     seven_days_ago text;
     new_leads_today int;
+    unique_leads_today int;
     seven_day_avg int;
     pct_change float;
     pct_change_str text;
@@ -262,6 +267,10 @@ BEGIN
     
     -- 1. Leads
     SELECT count(*) INTO new_leads_today FROM leads_raw WHERE created_time >= target_start AND created_time <= target_end;
+    -- Repeat inquiries from one prospect (same email / phone, see resolve_prospects) count once
+    SELECT count(DISTINCT coalesce(pc.cluster_id, l.id)) INTO unique_leads_today
+    FROM leads_raw l LEFT JOIN prospect_clusters pc ON pc.module = 'Leads' AND pc.record_id = l.id
+    WHERE l.created_time >= target_start AND l.created_time <= target_end;
     SELECT round(count(*) / 7.0) INTO seven_day_avg FROM leads_raw WHERE created_time >= seven_days_ago AND created_time < target_start;
     
     IF coalesce(seven_day_avg, 0) = 0 THEN
@@ -284,7 +293,9 @@ BEGIN
     -- 3. Source Breakdown Today
     SELECT json_object_agg(src, cnt) INTO src_brk FROM (
         SELECT src, sum(cnt) as cnt FROM (
-            SELECT coalesce(lead_source, 'Unknown') AS src, count(*) AS cnt FROM leads_raw WHERE created_time >= target_start AND created_time <= target_end GROUP BY 1
+            SELECT coalesce(l.lead_source, 'Unknown') AS src, count(DISTINCT coalesce(pc.cluster_id, l.id)) AS cnt
+            FROM leads_raw l LEFT JOIN prospect_clusters pc ON pc.module = 'Leads' AND pc.record_id = l.id
+            WHERE l.created_time >= target_start AND l.created_time <= target_end GROUP BY 1
             UNION ALL
             SELECT coalesce(source, 'Unknown') AS src, count(*) AS cnt FROM crm_deals WHERE created_time >= target_start AND created_time <= target_end GROUP BY 1
         ) combined GROUP BY 1
@@ -307,12 +318,14 @@ BEGIN
         FROM 
             (SELECT owner, count(*) as cnt, sum(amount) as rev FROM crm_deals WHERE stage != 'Closed Lost' GROUP BY 1) d
         FULL OUTER JOIN 
-            (SELECT owner, count(*) as cnt FROM leads_raw GROUP BY 1) l
+            (SELECT l.owner, count(DISTINCT coalesce(pc.cluster_id, l.id)) as cnt FROM leads_raw l
+             LEFT JOIN prospect_clusters pc ON pc.module = 'Leads' AND pc.record_id = l.id GROUP BY 1) l
         ON d.owner = l.owner
     ) t_r;
     
     SELECT json_build_object(
         'new_leads_today', new_leads_today,
+        'duplicate_leads_today', new_leads_today - unique_leads_today,
         'seven_day_avg', coalesce(seven_day_avg, 0),
         'percent_change_leads', pct_change_str,
         'pipeline_statuses', coalesce(pipe_status, '{}'::json),
@@ -325,3 +338,924 @@ BEGIN
     RETURN result;
 END;
 $$;
+
+-- 13. Stage Metrics Summary (Per-run, per-stage totals for the last N instrumented runs)
+CREATE OR REPLACE FUNCTION get_stage_metrics_summary(runs int DEFAULT 10)
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    WITH recent_runs AS (
+        SELECT run_id, min(started_at) AS run_started
+        FROM sync_stage_metrics
+        GROUP BY run_id
+        ORDER BY max(id) DESC
+        LIMIT runs
+    )
+    SELECT coalesce(json_agg(row_to_json(t) ORDER BY t.run_started, t.stage), '[]'::json)
+    FROM (
+        SELECT r.run_id, r.run_started, m.stage,
+               round(sum(m.duration_ms)::numeric, 1) AS duration_ms,
+               sum(m.records) AS records,
+               sum(m.bytes) AS bytes,
+               count(*) AS spans,
+               count(*) FILTER (WHERE m.status != 'OK') AS errors
+        FROM recent_runs r
+        JOIN sync_stage_metrics m ON m.run_id = r.run_id
+        GROUP BY r.run_id, r.run_started, m.stage
+    ) t;
+$$;
+
+-- 14. Data Version (Changes whenever a sync run, a push-ingested record or an AI briefing lands; keys the
+-- dashboard's data and figure caches)
+-- Push batches skip log_sync, so the newest modified_time of each mirror table is part of the version;
+-- each max() is one backward probe of a coalesce(modified_time, '') index (schema.sql).
+CREATE OR REPLACE FUNCTION get_data_version()
+RETURNS text
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    SELECT (SELECT coalesce(max(id), 0) FROM sync_logs)::text
+           || '.' ||
+           (SELECT coalesce(extract(epoch FROM max(updated_at))::bigint, 0) FROM ai_briefings_log)::text
+           || '.' ||
+           left(md5(concat_ws('|',
+               (SELECT max(coalesce(modified_time, '')) FROM leads_raw),
+               (SELECT max(coalesce(modified_time, '')) FROM crm_deals),
+               (SELECT max(coalesce(modified_time, '')) FROM crm_contacts),
+               (SELECT max(coalesce(modified_time, '')) FROM crm_accounts))), 12);
+$$;
+
+-- 15. Record Explorer (Keyset-paginated browse of crm_deals / leads_raw with server-side sort + filters)
+-- Returns one page plus an opaque cursor; the next page is fetched with (cursor_value, cursor_id)
+-- instead of OFFSET, so every page costs the same regardless of how deep the user has scrolled.
+-- raw_filter is a JSONB containment match on raw_data (served by the jsonb_path_ops GIN indexes).
+-- Earlier signature without raw_filter; dropped so PostgREST never sees two overloads
+DROP FUNCTION IF EXISTS explore_records(text, text, boolean, int, text, text, text, text, text, text, text, text, boolean);
+CREATE OR REPLACE FUNCTION explore_records(
+    module text,
+    sort_by text DEFAULT 'created_time',
+    sort_desc boolean DEFAULT true,
+    page_size int DEFAULT 50,
+    cursor_value text DEFAULT NULL,
+    cursor_id text DEFAULT NULL,
+    owner_filter text DEFAULT NULL,
+    stage_filter text DEFAULT NULL,
+    source_filter text DEFAULT NULL,
+    date_column text DEFAULT 'created_time',
+    date_from text DEFAULT NULL,
+    date_to text DEFAULT NULL,
+    open_only boolean DEFAULT false,
+    raw_filter jsonb DEFAULT NULL
+)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    tbl text;
+    cols text;
+    stage_col text;
+    source_col text;
+    sortable text[];
+    numeric_cols text[];
+    sort_expr text;
+    cursor_expr text;
+    dir text := CASE WHEN sort_desc THEN 'DESC' ELSE 'ASC' END;
+    where_sql text := 'TRUE';
+    lim int := least(greatest(page_size, 1), 500);
+    page json;
+    total bigint;
+    has_more boolean;
+BEGIN
+    IF module = 'deals' THEN
+        tbl := 'crm_deals';
+        cols := 'id, deal_name, stage, source, owner, amount, created_time, modified_time, closed_time';
+        stage_col := 'stage';
+        source_col := 'source';
+        sortable := ARRAY['closed_time', 'created_time', 'modified_time', 'amount', 'deal_name', 'owner', 'stage'];
+        numeric_cols := ARRAY['amount'];
+    ELSIF module = 'leads' THEN
+        tbl := 'leads_raw';
+        cols := 'id, full_name, lead_source, lead_status, owner, annual_revenue, created_time, modified_time';
+        stage_col := 'lead_status';
+        source_col := 'lead_source';
+        sortable := ARRAY['created_time', 'modified_time', 'annual_revenue', 'full_name', 'owner', 'lead_status'];
+        numeric_cols := ARRAY['annual_revenue'];
+    ELSE
+        RAISE EXCEPTION 'Unknown module: %', module;
+    END IF;
+
+    -- Identifiers are whitelisted; values are quoted with %L
+    IF NOT sort_by = ANY(sortable) THEN
+        RAISE EXCEPTION 'Cannot sort % by %', module, sort_by;
+    END IF;
+    IF NOT date_column = ANY(ARRAY['created_time', 'modified_time', 'closed_time']) OR (module = 'leads' AND date_column = 'closed_time') THEN
+        RAISE EXCEPTION 'Cannot filter % by %', module, date_column;
+    END IF;
+
+    -- NULL sort keys would drop out of the row comparison, so they sort as '' / 0 (matches the expression indexes in schema.sql)
+    IF sort_by = ANY(numeric_cols) THEN
+        sort_expr := format('coalesce(%I, 0)', sort_by);
+        cursor_expr := format('%L::real', cursor_value);
+    ELSE
+        sort_expr := format('coalesce(%I, %L)', sort_by, '');
+        cursor_expr := format('%L', cursor_value);
+    END IF;
+
+    IF owner_filter IS NOT NULL THEN where_sql := where_sql || format(' AND owner = %L', owner_filter); END IF;
+    IF stage_filter IS NOT NULL THEN where_sql := where_sql || format(' AND %I = %L', stage_col, stage_filter); END IF;
+    IF source_filter IS NOT NULL THEN where_sql := where_sql || format(' AND %I = %L', source_col, source_filter); END IF;
+    IF date_from IS NOT NULL THEN where_sql := where_sql || format(' AND %I >= %L', date_column, date_from); END IF;
+    -- Inclusive end date that also covers ISO timestamps on that day
+    IF date_to IS NOT NULL THEN where_sql := where_sql || format(' AND %I < %L', date_column, to_char(date_to::date + 1, 'YYYY-MM-DD')); END IF;
+    IF open_only AND module = 'deals' THEN where_sql := where_sql || ' AND stage NOT IN (''Closed Won'', ''Closed Lost'')'; END IF;
+    IF raw_filter IS NOT NULL THEN where_sql := where_sql || format(' AND raw_data @> %L::jsonb', raw_filter); END IF;
+
+    -- Total is only computed for the first page; later pages reuse the caller's value
+    IF cursor_id IS NULL THEN
+        EXECUTE format('SELECT count(*) FROM %I WHERE %s', tbl, where_sql) INTO total;
+    ELSE
+        where_sql := where_sql || format(' AND (%s, id) %s (%s, %L)',
+                                         sort_expr, CASE WHEN sort_desc THEN '<' ELSE '>' END, cursor_expr, cursor_id);
+    END IF;
+
+    -- One extra row tells us whether another page exists
+    EXECUTE format(
+        'SELECT coalesce(json_agg(row_to_json(t) ORDER BY t.sort_key %s, t.id %s), ''[]''::json)
+         FROM (SELECT %s, %s AS sort_key FROM %I WHERE %s ORDER BY %s %s, id %s LIMIT %s) t',
+        dir, dir, cols, sort_expr, tbl, where_sql, sort_expr, dir, dir, lim + 1
+    ) INTO page;
+
+    has_more := json_array_length(page) > lim;
+    IF has_more THEN
+        SELECT json_agg(e ORDER BY i) INTO page
+        FROM json_array_elements(page) WITH ORDINALITY AS x(e, i)
+        WHERE i <= lim;
+    END IF;
+
+    RETURN json_build_object(
+        'rows', page,
+        'total', total,
+        'has_more', has_more,
+        'next_cursor', CASE WHEN has_more THEN json_build_object(
+            'value', page -> (lim - 1) ->> 'sort_key',
+            'id', page -> (lim - 1) ->> 'id'
+        ) END
+    );
+END;
+$$;
+
+-- 16. Custom Field Breakdown (Slices Leads or Deals by a promoted custom field — see jobs/promote_fields.py)
+-- Only columns registered in promoted_fields can be used, so the dynamic SQL never sees caller-supplied identifiers.
+CREATE OR REPLACE FUNCTION get_custom_field_breakdown(module text, field text, top_n int DEFAULT 20)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    col text;
+    result json;
+BEGIN
+    SELECT pf.column_name INTO col FROM promoted_fields pf WHERE pf.module = get_custom_field_breakdown.module AND pf.field = get_custom_field_breakdown.field;
+    IF col IS NULL THEN
+        RAISE EXCEPTION 'Field %.% has not been promoted', module, field;
+    END IF;
+
+    IF module = 'Leads' THEN
+        EXECUTE format(
+            'SELECT coalesce(json_object_agg(val, json_build_object(''total_leads'', t, ''junk_or_unqualified'', j, ''in_pipeline'', t - j)), ''{}''::json)
+             FROM (
+                 SELECT coalesce(%1$I::text, ''Unknown'') AS val, count(*) AS t,
+                        count(*) FILTER (WHERE lead_status IN (''Junk Lead'', ''Not Qualified'', ''Not Qualified Lead'')) AS j
+                 FROM leads_raw GROUP BY 1 ORDER BY 2 DESC LIMIT %2$s
+             ) s', col, least(greatest(top_n, 1), 100)) INTO result;
+    ELSIF module = 'Deals' THEN
+        EXECUTE format(
+            'SELECT coalesce(json_object_agg(val, json_build_object(''deal_count'', c, ''open_value'', o, ''won_value'', w)), ''{}''::json)
+             FROM (
+                 SELECT coalesce(%1$I::text, ''Unknown'') AS val, count(*) AS c,
+                        coalesce(sum(amount) FILTER (WHERE stage NOT IN (''Closed Won'', ''Closed Lost'')), 0) AS o,
+                        coalesce(sum(amount) FILTER (WHERE stage = ''Closed Won''), 0) AS w
+                 FROM crm_deals GROUP BY 1 ORDER BY 2 DESC LIMIT %2$s
+             ) s', col, least(greatest(top_n, 1), 100)) INTO result;
+    ELSE
+        RAISE EXCEPTION 'Custom field breakdowns support Leads and Deals, not %', module;
+    END IF;
+
+    RETURN result;
+END;
+$$;
+
+-- 17. Current Deal Stages (Bulk lookup for the upsert path's stage diff — ids travel in the POST body, not the URL)
+CREATE OR REPLACE FUNCTION get_deal_stages(deal_ids text[])
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    SELECT coalesce(json_object_agg(id, stage), '{}'::json)
+    FROM crm_deals
+    WHERE id = ANY(deal_ids);
+$$;
+
+-- 18. Time in Stage (Average / median days a deal spends in each stage before moving on)
+-- Only intervals that start with an observed transition count; a deal's first-seen stage may have
+-- been entered long before the first sync saw it.
+CREATE OR REPLACE FUNCTION get_deal_time_in_stage()
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    WITH intervals AS (
+        SELECT from_stage IS NULL AS first_seen, to_stage AS stage,
+               changed_at::timestamptz AS entered,
+               lead(changed_at::timestamptz) OVER (PARTITION BY deal_id ORDER BY changed_at, id) AS left_at
+        FROM deal_stage_history
+    )
+    SELECT coalesce(json_object_agg(stage, json_build_object(
+               'avg_days', avg_days, 'median_days', median_days, 'transitions', n)), '{}'::json)
+    FROM (
+        SELECT stage,
+               round((avg(extract(epoch FROM left_at - entered)) / 86400)::numeric, 1) AS avg_days,
+               round((percentile_cont(0.5) WITHIN GROUP (ORDER BY extract(epoch FROM left_at - entered)) / 86400)::numeric, 1) AS median_days,
+               count(*) AS n
+        FROM intervals
+        WHERE left_at IS NOT NULL AND NOT first_seen
+        GROUP BY stage
+    ) t;
+$$;
+
+-- 19. Deal Velocity by Owner (Days from deal creation to Closed Won, plus stage moves per rep)
+CREATE OR REPLACE FUNCTION get_deal_velocity_by_owner()
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    WITH won AS (
+        SELECT h.deal_id, coalesce(h.owner, 'Unassigned') AS owner,
+               min(h.changed_at::timestamptz) AS won_at
+        FROM deal_stage_history h
+        WHERE h.to_stage = 'Closed Won'
+        GROUP BY 1, 2
+    ), moves AS (
+        SELECT coalesce(owner, 'Unassigned') AS owner, count(*) AS stage_moves
+        FROM deal_stage_history
+        WHERE from_stage IS NOT NULL
+        GROUP BY 1
+    )
+    SELECT coalesce(json_object_agg(m.owner, json_build_object(
+               'won_deals', coalesce(v.won_deals, 0),
+               'avg_days_to_win', v.avg_days_to_win,
+               'stage_moves', m.stage_moves)), '{}'::json)
+    FROM moves m
+    LEFT JOIN (
+        SELECT w.owner, count(*) AS won_deals,
+               round((avg(extract(epoch FROM w.won_at - d.created_time::timestamptz)) / 86400)::numeric, 1) AS avg_days_to_win
+        FROM won w
+        JOIN crm_deals d ON d.id = w.deal_id
+        GROUP BY w.owner
+    ) v ON v.owner = m.owner;
+$$;
+
+-- 20. Stage Conversion (Share of deals that entered each stage and later reached Closed Won, plus transition counts)
+CREATE OR REPLACE FUNCTION get_stage_conversion()
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    WITH entered AS (
+        SELECT DISTINCT deal_id, to_stage AS stage FROM deal_stage_history
+    ), won AS (
+        SELECT DISTINCT deal_id FROM deal_stage_history WHERE to_stage = 'Closed Won'
+    )
+    SELECT json_build_object(
+        'stages', (
+            SELECT coalesce(json_object_agg(stage, json_build_object(
+                       'entered', n, 'won', w,
+                       'win_rate_pct', CASE WHEN n > 0 THEN round(w * 100.0 / n) ELSE 0 END)), '{}'::json)
+            FROM (
+                SELECT e.stage, count(*) AS n, count(won.deal_id) AS w
+                FROM entered e LEFT JOIN won ON won.deal_id = e.deal_id
+                GROUP BY e.stage
+            ) s
+        ),
+        'transitions', (
+            SELECT coalesce(json_agg(json_build_object('from', from_stage, 'to', to_stage, 'count', n) ORDER BY n DESC), '[]'::json)
+            FROM (
+                SELECT from_stage, to_stage, count(*) AS n
+                FROM deal_stage_history
+                WHERE from_stage IS NOT NULL
+                GROUP BY 1, 2
+            ) t
+        )
+    );
+$$;
+
+-- 21. Advanced Analytics for a Date Range (One call returns every day's get_advanced_analytics payload
+-- plus pipeline generated and won/lost totals; feeds jobs/backfill_briefings.py)
+-- Day-level figures (new leads, 7-day average, sources, quality matrix, pipeline generated) are exact for
+-- each date. Snapshot figures (funnel, pipeline value, rep matrix, won/lost) count records created up to
+-- that date at their current stage. Each snapshot is a running sum over one grouped pass of the tables,
+-- so a year costs about as much as one all-time query. Ranges are capped at 731 days.
+CREATE OR REPLACE FUNCTION get_advanced_analytics_range(start_date text, end_date text)
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    WITH bounds AS (
+        SELECT start_date::date AS d0, least(end_date::date, start_date::date + 730) AS d1
+    ), first_day AS (
+        SELECT to_char(d0, 'YYYY-MM-DD') AS day0,
+               to_char(d0 - 7, 'YYYY-MM-DD') AS day_m7,
+               to_char(d1 + 1, 'YYYY-MM-DD') AS day_end
+        FROM bounds
+    ), days AS (
+        SELECT to_char(d, 'YYYY-MM-DD') AS day FROM bounds, generate_series(d0, d1, interval '1 day') d
+    ),
+    -- A rep's load counts each prospect once: only its first lead with that owner adds to the running total
+    lead_prospects AS (
+        SELECT l.created_time, l.owner,
+               row_number() OVER (PARTITION BY coalesce(pc.cluster_id, l.id), l.owner ORDER BY l.created_time, l.id) = 1 AS first_for_owner
+        FROM leads_raw l LEFT JOIN prospect_clusters pc ON pc.module = 'Leads' AND pc.record_id = l.id
+    ),
+    -- Snapshot facts; records created before the range are folded into its first day
+    snap AS (
+        SELECT greatest(left(l.created_time, 10), f.day0) AS day, 'status' AS kind, l.lead_status AS key, 1 AS cnt, 0::numeric AS amount
+        FROM leads_raw l, first_day f WHERE l.created_time < f.day_end
+        UNION ALL
+        SELECT greatest(left(d.created_time, 10), f.day0), 'status', d.stage, 1, 0
+        FROM crm_deals d, first_day f WHERE d.created_time < f.day_end
+        UNION ALL
+        SELECT greatest(left(l.created_time, 10), f.day0), 'rep', coalesce(l.owner, 'Unassigned'), 1, 0
+        FROM lead_prospects l, first_day f WHERE l.created_time < f.day_end AND l.first_for_owner
+        UNION ALL
+        SELECT greatest(left(d.created_time, 10), f.day0), 'rep', coalesce(d.owner, 'Unassigned'), 1, coalesce(d.amount, 0)
+        FROM crm_deals d, first_day f WHERE d.created_time < f.day_end AND d.stage != 'Closed Lost'
+        UNION ALL
+        -- A deal counts as won / lost from the day it closed (its creation day if Zoho has no Closing_Date)
+        SELECT greatest(c.day, f.day0), 'closed', c.stage, 1, c.amount
+        FROM (SELECT coalesce(to_char(d.closed_date, 'YYYY-MM-DD'), left(d.created_time, 10)) AS day, d.stage,
+                     coalesce(d.amount, 0) AS amount
+              FROM crm_deals d WHERE d.stage IN ('Closed Won', 'Closed Lost')) c, first_day f
+        WHERE c.day < f.day_end
+    ), snap_daily AS (
+        SELECT day, kind, key, sum(cnt) AS cnt, sum(amount) AS amount FROM snap WHERE key IS NOT NULL GROUP BY 1, 2, 3
+    ), snap_cum AS (
+        SELECT g.day, g.kind, g.key,
+               sum(coalesce(s.cnt, 0)) OVER w AS cnt,
+               sum(coalesce(s.amount, 0)) OVER w AS amount
+        FROM (SELECT d.day, k.kind, k.key FROM days d CROSS JOIN (SELECT DISTINCT kind, key FROM snap_daily) k) g
+        LEFT JOIN snap_daily s ON s.day = g.day AND s.kind = g.kind AND s.key = g.key
+        WINDOW w AS (PARTITION BY g.kind, g.key ORDER BY g.day)
+    ), snap_json AS (
+        SELECT day,
+               json_object_agg(key, cnt) FILTER (WHERE kind = 'status' AND cnt > 0) AS pipeline_statuses,
+               sum(amount) FILTER (WHERE kind = 'rep') AS pipeline_value,
+               json_object_agg(key, json_build_object('active_leads', cnt, 'total_pipeline_value', amount))
+                   FILTER (WHERE kind = 'rep' AND cnt > 0) AS rep_pipeline_matrix,
+               sum(cnt) FILTER (WHERE kind = 'closed' AND key = 'Closed Won') AS won_count,
+               sum(amount) FILTER (WHERE kind = 'closed' AND key = 'Closed Won') AS won_value,
+               sum(cnt) FILTER (WHERE kind = 'closed' AND key = 'Closed Lost') AS lost_count,
+               sum(amount) FILTER (WHERE kind = 'closed' AND key = 'Closed Lost') AS lost_value
+        FROM snap_cum GROUP BY day
+    ),
+    -- Day-level facts (the 7 days before the range are only needed for the first rolling averages)
+    lead_days AS (
+        SELECT left(l.created_time, 10) AS day, coalesce(l.lead_source, 'Unknown') AS src, l.lead_status,
+               coalesce(pc.cluster_id, l.id) AS prospect
+        FROM leads_raw l
+        JOIN first_day f ON l.created_time >= f.day_m7 AND l.created_time < f.day_end
+        LEFT JOIN prospect_clusters pc ON pc.module = 'Leads' AND pc.record_id = l.id
+    ), lead_counts AS (
+        SELECT day, count(*) AS cnt, count(*) - count(DISTINCT prospect) AS duplicates FROM lead_days GROUP BY 1
+    ), pulse AS (
+        SELECT d.day,
+               coalesce(c.cnt, 0) AS new_leads,
+               coalesce(c.duplicates, 0) AS duplicates,
+               round(coalesce(sum(c.cnt) OVER (ORDER BY d.day ROWS BETWEEN 7 PRECEDING AND 1 PRECEDING), 0) / 7.0)::int AS avg7
+        FROM (SELECT to_char(d, 'YYYY-MM-DD') AS day FROM bounds, generate_series(d0 - 7, d1, interval '1 day') d) d
+        LEFT JOIN lead_counts c ON c.day = d.day
+    ), source_json AS (
+        SELECT day, json_object_agg(src, cnt) AS source_breakdown FROM (
+            SELECT day, src, sum(cnt) AS cnt FROM (
+                SELECT day, src, count(DISTINCT prospect) AS cnt FROM lead_days GROUP BY 1, 2
+                UNION ALL
+                SELECT left(d.created_time, 10), coalesce(d.source, 'Unknown'), 1
+                FROM crm_deals d, first_day f WHERE d.created_time >= f.day0 AND d.created_time < f.day_end
+            ) s GROUP BY 1, 2
+        ) t GROUP BY day
+    ), quality_json AS (
+        SELECT day, json_object_agg(src, json_build_object('total_leads', t, 'junk_or_unqualified', j, 'in_pipeline', p,
+                   'junk_pct', CASE WHEN t > 0 THEN round((j::float / t::float) * 100)::text || '%' ELSE '0%' END)) AS source_quality_matrix
+        FROM (
+            SELECT day, src, count(*) AS t,
+                   count(*) FILTER (WHERE lead_status IN ('Junk Lead', 'Not Qualified')) AS j,
+                   count(*) FILTER (WHERE lead_status NOT IN ('Junk Lead', 'Not Qualified')) AS p
+            FROM lead_days GROUP BY 1, 2
+        ) q GROUP BY day
+    ), generated AS (
+        SELECT left(d.created_time, 10) AS day, sum(d.amount) AS pipeline_today
+        FROM crm_deals d, first_day f
+        WHERE d.created_time >= f.day0 AND d.created_time < f.day_end AND d.stage != 'Closed Lost'
+        GROUP BY 1
+    )
+    SELECT coalesce(json_object_agg(d.day, json_build_object(
+               'new_leads_today', p.new_leads,
+               'duplicate_leads_today', p.duplicates,
+               'seven_day_avg', p.avg7,
+               'percent_change_leads', CASE
+                   WHEN p.avg7 = 0 THEN '0%'
+                   WHEN p.new_leads > p.avg7 THEN '+' || round((p.new_leads - p.avg7) * 100.0 / p.avg7)::text || '%'
+                   ELSE round((p.new_leads - p.avg7) * 100.0 / p.avg7)::text || '%' END,
+               'pipeline_statuses', coalesce(s.pipeline_statuses, '{}'::json),
+               'source_breakdown', coalesce(src.source_breakdown, '{}'::json),
+               'pipeline_value', coalesce(s.pipeline_value, 0),
+               'source_quality_matrix', coalesce(q.source_quality_matrix, '{}'::json),
+               'rep_pipeline_matrix', coalesce(s.rep_pipeline_matrix, '{}'::json),
+               'pipeline_today', coalesce(g.pipeline_today, 0),
+               'won_count', coalesce(s.won_count, 0),
+               'won_value', coalesce(s.won_value, 0),
+               'lost_count', coalesce(s.lost_count, 0),
+               'lost_value', coalesce(s.lost_value, 0)
+           ) ORDER BY d.day), '{}'::json)
+    FROM days d
+    JOIN pulse p ON p.day = d.day
+    LEFT JOIN snap_json s ON s.day = d.day
+    LEFT JOIN source_json src ON src.day = d.day
+    LEFT JOIN quality_json q ON q.day = d.day
+    LEFT JOIN generated g ON g.day = d.day;
+$$;
+
+-- 22. Time Series (One metric over any date range, bucketed by day / week / month on the server)
+-- metric: 'leads' (count by created_date), 'pipeline_created' (non-lost deal value by created_date) or
+-- 'won_value' (Closed Won value by closed_date); group_by: NULL, 'owner', 'source' or 'stage'.
+-- Granularity is the finest of day / week / month that fits in max_points buckets; a range too long even
+-- for months keeps its latest max_points months. The top_groups largest groups are kept and the rest
+-- fold into 'Other', so the payload is at most (top_groups + 1) × max_points numbers for any range.
+-- start_date NULL = from the metric's first record; end_date NULL = today. Reads the indexed typed
+-- date columns from schema.sql section 10, so multi-year ranges never parse timestamp text.
+CREATE OR REPLACE FUNCTION get_time_series(metric text, start_date date DEFAULT NULL, end_date date DEFAULT NULL,
+                                           group_by text DEFAULT NULL, max_points int DEFAULT 120, top_groups int DEFAULT 8)
+RETURNS json
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+AS $$
+DECLARE
+    d0 date := start_date;
+    d1 date := coalesce(end_date, CURRENT_DATE);
+    cap int := least(greatest(coalesce(max_points, 120), 2), 1000);
+    top_n int := least(greatest(coalesce(top_groups, 8), 1), 50);
+    gran text;
+    result json;
+BEGIN
+    IF metric NOT IN ('leads', 'pipeline_created', 'won_value') THEN
+        RAISE EXCEPTION 'Unknown metric %: use leads, pipeline_created or won_value', metric;
+    END IF;
+    IF group_by IS NOT NULL AND group_by NOT IN ('owner', 'source', 'stage') THEN
+        RAISE EXCEPTION 'Unknown group_by %: use owner, source or stage', group_by;
+    END IF;
+
+    IF d0 IS NULL THEN
+        d0 := CASE metric
+            WHEN 'leads' THEN (SELECT min(created_date) FROM leads_raw)
+            WHEN 'pipeline_created' THEN (SELECT min(created_date) FROM crm_deals)
+            ELSE (SELECT min(closed_date) FROM crm_deals WHERE stage = 'Closed Won') END;
+        d0 := least(coalesce(d0, d1), d1);
+    END IF;
+    IF d0 > d1 THEN
+        RAISE EXCEPTION 'start_date % is after end_date %', d0, d1;
+    END IF;
+
+    IF d1 - d0 + 1 <= cap THEN
+        gran := 'day';
+    ELSIF (date_trunc('week', d1)::date - date_trunc('week', d0)::date) / 7 + 1 <= cap THEN
+        gran := 'week';
+    ELSE
+        gran := 'month';
+        d0 := greatest(d0, (date_trunc('month', d1) - make_interval(months => cap - 1))::date);
+    END IF;
+
+    WITH facts AS (
+        SELECT l.created_date AS d, 1::numeric AS val,
+               CASE group_by WHEN 'owner' THEN coalesce(l.owner, 'Unassigned')
+                             WHEN 'source' THEN coalesce(l.lead_source, 'Unknown')
+                             WHEN 'stage' THEN coalesce(l.lead_status, 'Unknown')
+                             ELSE 'Total' END AS grp
+        FROM leads_raw l
+        WHERE metric = 'leads' AND l.created_date BETWEEN d0 AND d1
+        UNION ALL
+        SELECT d.created_date, coalesce(d.amount, 0)::numeric,
+               CASE group_by WHEN 'owner' THEN coalesce(d.owner, 'Unassigned')
+                             WHEN 'source' THEN coalesce(d.source, 'Unknown')
+                             WHEN 'stage' THEN coalesce(d.stage, 'Unknown')
+                             ELSE 'Total' END
+        FROM crm_deals d
+        WHERE metric = 'pipeline_created' AND d.created_date BETWEEN d0 AND d1 AND d.stage IS DISTINCT FROM 'Closed Lost'
+        UNION ALL
+        SELECT d.closed_date, coalesce(d.amount, 0)::numeric,
+               CASE group_by WHEN 'owner' THEN coalesce(d.owner, 'Unassigned')
+                             WHEN 'source' THEN coalesce(d.source, 'Unknown')
+                             WHEN 'stage' THEN coalesce(d.stage, 'Unknown')
+                             ELSE 'Total' END
+        FROM crm_deals d
+        WHERE metric = 'won_value' AND d.stage = 'Closed Won' AND d.closed_date BETWEEN d0 AND d1
+    ), bucketed AS (
+        SELECT date_trunc(gran, d)::date AS bucket, grp, sum(val) AS val FROM facts GROUP BY 1, 2
+    ), ranked AS (
+        SELECT grp, row_number() OVER (ORDER BY sum(val) DESC, grp) AS rn FROM bucketed GROUP BY grp
+    ), folded AS (
+        SELECT b.bucket, CASE WHEN r.rn <= top_n THEN b.grp ELSE 'Other' END AS grp,
+               least(r.rn, top_n + 1) AS rn, b.val
+        FROM bucketed b JOIN ranked r ON r.grp = b.grp
+    ), agg AS (
+        SELECT bucket, grp, min(rn) AS rn, sum(val) AS val FROM folded GROUP BY 1, 2
+    ), buckets AS (
+        SELECT b::date AS bucket FROM generate_series(date_trunc(gran, d0), date_trunc(gran, d1), ('1 ' || gran)::interval) b
+    ), groups AS (
+        SELECT grp, min(rn) AS rn FROM agg GROUP BY grp
+    ), series AS (
+        SELECT g.grp, g.rn, json_agg(coalesce(a.val, 0) ORDER BY b.bucket) AS vals
+        FROM groups g CROSS JOIN buckets b
+        LEFT JOIN agg a ON a.grp = g.grp AND a.bucket = b.bucket
+        GROUP BY g.grp, g.rn
+    )
+    SELECT json_build_object(
+        'metric', metric,
+        'group_by', group_by,
+        'granularity', gran,
+        'start_date', to_char(d0, 'YYYY-MM-DD'),
+        'end_date', to_char(d1, 'YYYY-MM-DD'),
+        'buckets', (SELECT json_agg(to_char(bucket, 'YYYY-MM-DD') ORDER BY bucket) FROM buckets),
+        'series', coalesce((SELECT json_object_agg(grp, vals ORDER BY rn) FROM series), '{}'::json)
+    ) INTO result;
+
+    RETURN result;
+END;
+$$;
+
+-- 23. Forecast Inputs (Open deals as parallel arrays + closed-deal outcomes per stage; feeds core/forecast.py)
+-- A stage's outcome counts every closed deal that ever passed through it, so its win rate is
+-- P(won | reached this stage). Zero-value deals are left out — they cannot move a revenue forecast.
+CREATE OR REPLACE FUNCTION get_forecast_inputs()
+RETURNS json
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH open_deals AS (
+        SELECT id, coalesce(stage, 'Unknown') AS stage, amount,
+               to_char(closed_date, 'YYYY-MM') AS close_month, coalesce(owner, 'Unassigned') AS owner
+        FROM crm_deals
+        WHERE stage IS DISTINCT FROM 'Closed Won' AND stage IS DISTINCT FROM 'Closed Lost' AND amount > 0
+    ), closed AS (
+        SELECT id, stage = 'Closed Won' AS won FROM crm_deals WHERE stage IN ('Closed Won', 'Closed Lost')
+    ), stage_outcomes AS (
+        SELECT h.to_stage AS stage, count(*) AS closed, count(*) FILTER (WHERE c.won) AS won
+        FROM (SELECT DISTINCT deal_id, to_stage FROM deal_stage_history
+              WHERE to_stage NOT IN ('Closed Won', 'Closed Lost')) h
+        JOIN closed c ON c.id = h.deal_id
+        GROUP BY 1
+    )
+    SELECT json_build_object(
+        'deals', (
+            SELECT json_build_object(
+                'stage', coalesce(json_agg(stage ORDER BY id), '[]'::json),
+                'amount', coalesce(json_agg(amount ORDER BY id), '[]'::json),
+                'close_month', coalesce(json_agg(close_month ORDER BY id), '[]'::json),
+                'owner', coalesce(json_agg(owner ORDER BY id), '[]'::json))
+            FROM open_deals
+        ),
+        'stage_outcomes', (
+            SELECT coalesce(json_object_agg(stage, json_build_object('closed', closed, 'won', won)), '{}'::json)
+            FROM stage_outcomes
+        ),
+        'won_count', (SELECT count(*) FILTER (WHERE won) FROM closed),
+        'closed_count', (SELECT count(*) FROM closed)
+    );
+$$;
+
+-- 24. Resolve Prospects (Called by the upsert path after each Leads / Contacts chunk lands — see schema.sql §11)
+-- Refreshes the chunk's match keys, then merges every cluster that shares a key with a chunk record.
+-- Clusters are kept closed under shared keys, so only the clusters reachable through the chunk's own
+-- keys can merge; a 500-row chunk costs a few hundred hash-index probes, however large the tables are.
+-- A key held by more than max_fanout records (a shared office line, a dummy email) is not used to
+-- merge: it would chain unrelated people into one cluster. Clusters only ever merge; a record whose
+-- email changes keeps its cluster until the next backfill over a truncated prospect_clusters.
+-- Rows without a usable payload (light syncs, archived raw_data) keep their current keys.
+CREATE OR REPLACE FUNCTION resolve_prospects(module_name text, record_ids text[], max_fanout int DEFAULT 50)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    changed int;
+    relabeled int;
+    merged int;
+BEGIN
+    IF module_name NOT IN ('Leads', 'Contacts') THEN
+        RAISE EXCEPTION 'Prospect resolution supports Leads and Contacts, not %', module_name;
+    END IF;
+    -- One resolver at a time (daily sync, push receiver), so two chunks never merge halves of a cluster
+    PERFORM pg_advisory_xact_lock(hashtext('resolve_prospects'));
+
+    -- 1. Current match keys of the chunk
+    CREATE TEMP TABLE IF NOT EXISTS _prospect_chunk (record_id text, keys text[]) ON COMMIT DROP;
+    TRUNCATE _prospect_chunk;
+    IF module_name = 'Leads' THEN
+        INSERT INTO _prospect_chunk
+        SELECT id, prospect_match_keys(raw_data) FROM leads_raw
+        WHERE id = ANY(record_ids) AND raw_data IS NOT NULL AND NOT raw_data ? '_archived';
+    ELSE
+        INSERT INTO _prospect_chunk
+        SELECT id, prospect_match_keys(raw_data) FROM crm_contacts
+        WHERE id = ANY(record_ids) AND raw_data IS NOT NULL;
+    END IF;
+
+    DELETE FROM prospect_keys k USING _prospect_chunk c
+    WHERE k.module = module_name AND k.record_id = c.record_id AND NOT k.match_key = ANY(c.keys);
+    INSERT INTO prospect_keys (module, record_id, match_key)
+    SELECT module_name, c.record_id, k FROM _prospect_chunk c, unnest(c.keys) k
+    ON CONFLICT DO NOTHING;
+
+    -- 2. New records start as their own cluster
+    INSERT INTO prospect_clusters (module, record_id, cluster_id)
+    SELECT module_name, record_id, record_id FROM _prospect_chunk
+    ON CONFLICT DO NOTHING;
+
+    -- 3. Cluster graph around the chunk: an edge wherever a chunk key is shared with another cluster
+    CREATE TEMP TABLE IF NOT EXISTS _prospect_edges (a text, b text) ON COMMIT DROP;
+    CREATE TEMP TABLE IF NOT EXISTS _prospect_labels (node text PRIMARY KEY, label text) ON COMMIT DROP;
+    TRUNCATE _prospect_edges, _prospect_labels;
+    -- Cluster ids are scalar subqueries so each is one primary-key probe; as joins the planner may hash
+    -- the whole prospect_clusters table for every chunk
+    INSERT INTO _prospect_edges
+    SELECT DISTINCT a, b FROM (
+        SELECT (SELECT c.cluster_id FROM prospect_clusters c WHERE c.module = mk.module AND c.record_id = mk.record_id) AS a,
+               (SELECT c.cluster_id FROM prospect_clusters c WHERE c.module = ok.module AND c.record_id = ok.record_id) AS b
+        FROM prospect_keys mk
+        JOIN prospect_keys ok ON ok.match_key = mk.match_key
+        WHERE mk.module = module_name AND mk.record_id = ANY(record_ids)
+          AND (SELECT count(*) FROM (SELECT 1 FROM prospect_keys h WHERE h.match_key = mk.match_key
+                                     LIMIT max_fanout + 1) hub) <= max_fanout
+    ) pairs
+    WHERE a <> b;
+    INSERT INTO _prospect_edges SELECT b, a FROM _prospect_edges;
+    INSERT INTO _prospect_labels SELECT DISTINCT a, a FROM _prospect_edges;
+
+    -- 4. Connected components by min-label propagation, then relabel every member of a merged cluster
+    LOOP
+        UPDATE _prospect_labels l SET label = m.label
+        FROM (SELECT e.a AS node, min(n.label) AS label
+              FROM _prospect_edges e JOIN _prospect_labels n ON n.node = e.b GROUP BY e.a) m
+        WHERE l.node = m.node AND m.label < l.label;
+        GET DIAGNOSTICS changed = ROW_COUNT;
+        EXIT WHEN changed = 0;
+    END LOOP;
+
+    SELECT count(*) INTO merged FROM _prospect_labels WHERE label < node;
+    UPDATE prospect_clusters p SET cluster_id = l.label, resolved_at = now()
+    FROM _prospect_labels l
+    WHERE p.cluster_id = l.node AND l.label < l.node;
+    GET DIAGNOSTICS relabeled = ROW_COUNT;
+
+    RETURN json_build_object('records', (SELECT count(*) FROM _prospect_chunk),
+                             'clusters_merged', merged, 'records_relabeled', relabeled);
+END;
+$$;
+
+-- 25. Backfill Prospects (Resolves existing Leads / Contacts in id order, one batch per call — see jobs/resolve_prospects.py)
+CREATE OR REPLACE FUNCTION backfill_prospects(module_name text, after_id text DEFAULT '', batch_size int DEFAULT 5000)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    ids text[];
+BEGIN
+    IF module_name = 'Leads' THEN
+        SELECT array_agg(id ORDER BY id) INTO ids
+        FROM (SELECT id FROM leads_raw WHERE id > after_id ORDER BY id LIMIT least(greatest(batch_size, 1), 50000)) b;
+    ELSIF module_name = 'Contacts' THEN
+        SELECT array_agg(id ORDER BY id) INTO ids
+        FROM (SELECT id FROM crm_contacts WHERE id > after_id ORDER BY id LIMIT least(greatest(batch_size, 1), 50000)) b;
+    ELSE
+        RAISE EXCEPTION 'Prospect resolution supports Leads and Contacts, not %', module_name;
+    END IF;
+
+    IF ids IS NULL THEN
+        RETURN json_build_object('records', 0, 'clusters_merged', 0, 'records_relabeled', 0, 'last_id', after_id);
+    END IF;
+    RETURN (resolve_prospects(module_name, ids)::jsonb || jsonb_build_object('last_id', ids[cardinality(ids)]))::json;
+END;
+$$;
+
+-- 26. Likely Junk Leads (Leads created in the `days` up to the target date whose junk_score is at least
+-- `threshold` and that nobody has marked junk yet; feeds the briefing and the Lead Intelligence tab)
+CREATE OR REPLACE FUNCTION get_likely_junk_leads(target_date_iso text DEFAULT NULL, days int DEFAULT 1,
+                                                 threshold real DEFAULT 0.7, top_n int DEFAULT 20)
+RETURNS json
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH bounds AS (
+        SELECT coalesce(target_date_iso::date, CURRENT_DATE) AS d1
+    ), scored AS (
+        SELECT l.id, l.full_name, coalesce(l.lead_source, 'Unknown') AS source, coalesce(l.owner, 'Unassigned') AS owner,
+               l.lead_status, l.created_time, l.junk_score
+        FROM leads_raw l, bounds b
+        WHERE l.created_date BETWEEN b.d1 - (greatest(days, 1) - 1) AND b.d1 AND l.junk_score IS NOT NULL
+    ), flagged AS (
+        SELECT * FROM scored
+        WHERE junk_score >= threshold AND coalesce(lead_status, '') NOT IN ('Junk Lead', 'Not Qualified', 'Not Qualified Lead')
+    )
+    SELECT json_build_object(
+        'threshold', threshold,
+        'scored', (SELECT count(*) FROM scored),
+        'likely_junk', (SELECT count(*) FROM flagged),
+        'by_source', (SELECT coalesce(json_object_agg(source, n ORDER BY n DESC), '{}'::json)
+                      FROM (SELECT source, count(*) AS n FROM flagged GROUP BY 1) s),
+        'by_owner', (SELECT coalesce(json_object_agg(owner, n ORDER BY n DESC), '{}'::json)
+                     FROM (SELECT owner, count(*) AS n FROM flagged GROUP BY 1) o),
+        'leads', (SELECT coalesce(json_agg(t ORDER BY t.junk_score DESC, t.id), '[]'::json)
+                  FROM (SELECT id, full_name, source, owner, lead_status, created_time, junk_score
+                        FROM flagged ORDER BY junk_score DESC, id LIMIT greatest(top_n, 0)) t)
+    );
+$$;
+
+-- 27. Refresh Lead Cohorts (Called by the upsert path after each Leads / Deals / Contacts chunk — see schema.sql §13)
+-- Re-derives the cohort cell of every lead the chunk can affect: the chunk's leads, the leads in the
+-- prospect clusters of its leads / contacts / deal contacts, and the leads already credited with its deals.
+-- Each lead's old cell is decremented and its new cell incremented, so only the touched cohorts change.
+CREATE OR REPLACE FUNCTION refresh_lead_cohorts(module_name text, record_ids text[])
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    touched int;
+BEGIN
+    IF module_name NOT IN ('Leads', 'Deals', 'Contacts') THEN
+        RAISE EXCEPTION 'Lead cohorts track Leads, Deals and Contacts, not %', module_name;
+    END IF;
+    -- Deltas are read-then-write; two concurrent refreshes of one lead would count it twice
+    PERFORM pg_advisory_xact_lock(hashtext('refresh_lead_cohorts'));
+
+    -- 1. Leads the chunk can affect, and their prospect cluster. Cluster ids are scalar subqueries so
+    -- each is one primary-key probe (as joins the planner may hash all of prospect_clusters).
+    CREATE TEMP TABLE IF NOT EXISTS _cohort_leads (lead_id text PRIMARY KEY, cluster_id text, fresh boolean) ON COMMIT DROP;
+    TRUNCATE _cohort_leads;
+    IF module_name = 'Deals' THEN
+        INSERT INTO _cohort_leads (lead_id, cluster_id)
+        SELECT m.record_id, m.cluster_id
+        FROM (SELECT DISTINCT (SELECT c.cluster_id FROM prospect_clusters c
+                               WHERE c.module = 'Contacts' AND c.record_id = d.contact_id) AS cluster_id
+              FROM crm_deals d WHERE d.id = ANY(record_ids)) k
+        JOIN prospect_clusters m ON m.cluster_id = k.cluster_id AND m.module = 'Leads'
+        ON CONFLICT DO NOTHING;
+        INSERT INTO _cohort_leads (lead_id)
+        SELECT lead_id FROM lead_conversions WHERE deal_id = ANY(record_ids)
+        ON CONFLICT DO NOTHING;
+    ELSE
+        INSERT INTO _cohort_leads (lead_id, cluster_id)
+        SELECT m.record_id, m.cluster_id
+        FROM (SELECT DISTINCT (SELECT c.cluster_id FROM prospect_clusters c
+                               WHERE c.module = module_name AND c.record_id = r.id) AS cluster_id
+              FROM unnest(record_ids) r(id)) k
+        JOIN prospect_clusters m ON m.cluster_id = k.cluster_id AND m.module = 'Leads'
+        ON CONFLICT DO NOTHING;
+        IF module_name = 'Leads' THEN
+            -- Leads without match keys (or synced light) have no cluster yet
+            INSERT INTO _cohort_leads (lead_id, fresh) SELECT unnest(record_ids), true
+            ON CONFLICT (lead_id) DO UPDATE SET fresh = true;
+        END IF;
+    END IF;
+    -- Creation week, source and owner are re-read from leads_raw only for the chunk's own leads and leads
+    -- not tracked yet; cluster-mates keep the ones on record (an id-only lookup visits every monthly partition)
+    UPDATE _cohort_leads a SET fresh = true
+    WHERE fresh IS NULL AND NOT EXISTS (SELECT 1 FROM lead_conversions c WHERE c.lead_id = a.lead_id);
+    UPDATE _cohort_leads a SET cluster_id = (SELECT c.cluster_id FROM prospect_clusters c WHERE c.module = 'Leads' AND c.record_id = a.lead_id)
+    WHERE cluster_id IS NULL;
+    -- Temp tables have no statistics until analyzed: unanalyzed, a 500-lead chunk was planned like a
+    -- full table and hashed every leads_raw partition
+    ANALYZE _cohort_leads;
+
+    -- 2. Their current cell: the first deal created on or after the lead for a contact in its cluster
+    CREATE TEMP TABLE IF NOT EXISTS _cohort_new (LIKE lead_conversions) ON COMMIT DROP;
+    TRUNCATE _cohort_new;
+    INSERT INTO _cohort_new
+    WITH deals AS MATERIALIZED (
+        SELECT m.cluster_id, d.id, d.created_date
+        FROM (SELECT DISTINCT cluster_id FROM _cohort_leads WHERE cluster_id IS NOT NULL) k
+        JOIN prospect_clusters m ON m.cluster_id = k.cluster_id AND m.module = 'Contacts'
+        JOIN crm_deals d ON d.contact_id = m.record_id
+        WHERE d.created_date IS NOT NULL
+    ), cells AS (
+        SELECT a.lead_id, a.cluster_id, l.created_date, coalesce(l.lead_source, 'Unknown') AS source,
+               coalesce(l.owner, 'Unassigned') AS owner
+        FROM _cohort_leads a JOIN leads_raw l ON l.id = a.lead_id
+        WHERE a.fresh AND l.created_date IS NOT NULL
+        UNION ALL
+        SELECT a.lead_id, a.cluster_id, c.created_date, c.source, c.owner
+        FROM _cohort_leads a JOIN lead_conversions c ON c.lead_id = a.lead_id
+        WHERE a.fresh IS NULL
+    )
+    SELECT c.lead_id, date_trunc('week', c.created_date)::date, c.created_date, c.source, c.owner,
+           conv.id, coalesce((conv.created_date - c.created_date) / 7, -1)
+    FROM cells c
+    LEFT JOIN LATERAL (
+        SELECT d.id, d.created_date FROM deals d
+        WHERE d.cluster_id = c.cluster_id AND d.created_date >= c.created_date
+        ORDER BY d.created_date, d.id
+        LIMIT 1
+    ) conv ON true;
+
+    -- 3. Old cells −1, new cells +1; unchanged leads cancel out and touch nothing
+    CREATE TEMP TABLE IF NOT EXISTS _cohort_deltas (cohort_week date, source text, owner text,
+                                                    weeks_to_convert smallint, leads int) ON COMMIT DROP;
+    TRUNCATE _cohort_deltas;
+    INSERT INTO _cohort_deltas
+    SELECT cohort_week, source, owner, weeks_to_convert, sum(delta)
+    FROM (
+        SELECT c.cohort_week, c.source, c.owner, c.weeks_to_convert, -1 AS delta
+        FROM _cohort_leads a JOIN lead_conversions c ON c.lead_id = a.lead_id
+        UNION ALL
+        SELECT cohort_week, source, owner, weeks_to_convert, 1 FROM _cohort_new
+    ) d
+    GROUP BY 1, 2, 3, 4
+    HAVING sum(delta) <> 0;
+    GET DIAGNOSTICS touched = ROW_COUNT;
+
+    INSERT INTO lead_cohorts AS t (cohort_week, source, owner, weeks_to_convert, leads)
+    SELECT * FROM _cohort_deltas
+    ON CONFLICT (cohort_week, source, owner, weeks_to_convert) DO UPDATE SET leads = t.leads + excluded.leads;
+    DELETE FROM lead_cohorts t USING _cohort_deltas d
+    WHERE t.cohort_week = d.cohort_week AND t.source = d.source AND t.owner = d.owner
+      AND t.weeks_to_convert = d.weeks_to_convert AND t.leads <= 0;
+
+    DELETE FROM lead_conversions c USING _cohort_leads a WHERE c.lead_id = a.lead_id;
+    INSERT INTO lead_conversions SELECT * FROM _cohort_new;
+
+    RETURN json_build_object('leads', (SELECT count(*) FROM _cohort_new),
+                             'converted', (SELECT count(*) FROM _cohort_new WHERE deal_id IS NOT NULL),
+                             'cells_touched', touched);
+END;
+$$;
+
+-- 28. Backfill Lead Cohorts (Refreshes existing Leads in id order, one batch per call — see jobs/build_lead_cohorts.py)
+CREATE OR REPLACE FUNCTION backfill_lead_cohorts(after_id text DEFAULT '', batch_size int DEFAULT 5000)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    ids text[];
+BEGIN
+    SELECT array_agg(id ORDER BY id) INTO ids
+    FROM (SELECT id FROM leads_raw WHERE id > after_id ORDER BY id LIMIT least(greatest(batch_size, 1), 50000)) b;
+    IF ids IS NULL THEN
+        RETURN json_build_object('leads', 0, 'converted', 0, 'cells_touched', 0, 'last_id', after_id);
+    END IF;
+    RETURN (refresh_lead_cohorts('Leads', ids)::jsonb || jsonb_build_object('last_id', ids[cardinality(ids)]))::json;
+END;
+$$;
+
+-- 29. Lead Cohort Matrix (Cumulative conversions 0..max_weeks after creation for the last `weeks` creation
+-- weeks, optionally for one source / owner). Reads only the window's lead_cohorts cells. A cohort's list
+-- stops at the current week: later offsets haven't happened yet.
+CREATE OR REPLACE FUNCTION get_lead_cohorts(weeks int DEFAULT 12, max_weeks int DEFAULT 12,
+                                            source_filter text DEFAULT NULL, owner_filter text DEFAULT NULL)
+RETURNS json
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH bounds AS (
+        SELECT date_trunc('week', CURRENT_DATE)::date AS this_week
+    ), window_cells AS (
+        SELECT c.* FROM lead_cohorts c, bounds b
+        WHERE c.cohort_week > b.this_week - 7 * greatest(weeks, 1)
+    ), cells AS (
+        SELECT cohort_week, weeks_to_convert, sum(leads) AS leads
+        FROM window_cells
+        WHERE (source_filter IS NULL OR source = source_filter) AND (owner_filter IS NULL OR owner = owner_filter)
+        GROUP BY 1, 2
+    ), cohorts AS (
+        SELECT cohort_week, sum(leads) AS leads FROM cells GROUP BY 1
+    )
+    SELECT json_build_object(
+        'cohorts', (SELECT coalesce(json_agg(json_build_object(
+                        'week', w.cohort_week,
+                        'leads', w.leads,
+                        'converted_by_week', (
+                            SELECT json_agg((SELECT coalesce(sum(c.leads), 0) FROM cells c
+                                             WHERE c.cohort_week = w.cohort_week AND c.weeks_to_convert BETWEEN 0 AND n)
+                                            ORDER BY n)
+                            FROM generate_series(0, least(greatest(max_weeks, 0), (CURRENT_DATE - w.cohort_week) / 7)) n)
+                    ) ORDER BY w.cohort_week), '[]'::json)
+                    FROM cohorts w),
+        'sources', (SELECT coalesce(json_agg(DISTINCT source), '[]'::json) FROM window_cells),
+        'owners', (SELECT coalesce(json_agg(DISTINCT owner), '[]'::json) FROM window_cells)
+    );
+$$;
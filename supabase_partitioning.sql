@@ -0,0 +1,169 @@
+-- ═══════════════════════════════════════════════════════════════════════════════
+-- MONTHLY PARTITIONING + COLD ARCHIVAL FOR leads_raw / crm_deals  (opt-in)
+-- Run once in the Supabase SQL Editor AFTER schema.sql and supabase_analytics.sql,
+-- then set CRM_PARTITIONED=true so upserts conflict on (id, created_time).
+-- Take a backup first: section 3 rewrites both tables inside one transaction.
+-- ═══════════════════════════════════════════════════════════════════════════════
+
+-- 1. Partition Maintenance (Creates one partition per created_time month, plus a DEFAULT catch-all)
+-- created_time is Zoho's ISO-8601 text, so 'YYYY-MM-01' string bounds order exactly like timestamps.
+CREATE OR REPLACE FUNCTION ensure_crm_partitions(months_ahead int DEFAULT 3, since date DEFAULT NULL)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    tbl text;
+    first_month date;
+    m date;
+    part text;
+    created int := 0;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['leads_raw', 'crm_deals'] LOOP
+        -- Only tables that have been converted by section 3
+        CONTINUE WHEN NOT EXISTS (SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid
+                                  WHERE c.relname = tbl AND c.relnamespace = 'public'::regnamespace);
+
+        EXECUTE format('SELECT date_trunc(''month'', min(left(created_time, 10))::date)::date FROM %I', tbl) INTO first_month;
+        first_month := least(coalesce(first_month, date_trunc('month', CURRENT_DATE)::date),
+                             coalesce(date_trunc('month', since)::date, 'infinity'::date));
+        m := first_month;
+        WHILE m <= (date_trunc('month', CURRENT_DATE) + make_interval(months => months_ahead))::date LOOP
+            part := format('%s_%s', tbl, to_char(m, 'YYYY_MM'));
+            IF to_regclass('public.' || part) IS NULL THEN
+                EXECUTE format('CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                               part, tbl, to_char(m, 'YYYY-MM-DD'), to_char((m + interval '1 month')::date, 'YYYY-MM-DD'));
+                created := created + 1;
+            END IF;
+            m := (m + interval '1 month')::date;
+        END LOOP;
+
+        IF to_regclass('public.' || tbl || '_default') IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF %I DEFAULT', tbl || '_default', tbl);
+        END IF;
+    END LOOP;
+    RETURN json_build_object('partitions_created', created);
+END;
+$$;
+
+-- 2. Cold Archive (Full raw_data payloads of old records, compressed with lz4 and kept out of the hot tables)
+CREATE TABLE IF NOT EXISTS crm_raw_archive (
+    module TEXT NOT NULL,
+    id TEXT NOT NULL,
+    created_time TEXT NOT NULL,
+    raw_data JSONB,
+    archived_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (module, id, created_time)
+);
+ALTER TABLE crm_raw_archive ALTER COLUMN raw_data SET COMPRESSION lz4;
+
+-- 3. One-time Conversion (Copies each table into a month-partitioned twin and swaps the names)
+-- The primary key becomes (id, created_time) because a partitioned table's unique keys must
+-- include the partition key. Generated cf_ columns (promoted fields) are carried over.
+DO $$
+DECLARE
+    tbl text;
+    cols text;
+    since date;
+    old_count bigint;
+    new_count bigint;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['leads_raw', 'crm_deals'] LOOP
+        CONTINUE WHEN EXISTS (SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid
+                              WHERE c.relname = tbl AND c.relnamespace = 'public'::regnamespace);
+
+        EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS)
+                        PARTITION BY RANGE (created_time)', tbl || '_partitioned', tbl);
+        EXECUTE format('ALTER TABLE %I ALTER COLUMN created_time SET NOT NULL', tbl || '_partitioned');
+        EXECUTE format('ALTER TABLE %I ADD PRIMARY KEY (id, created_time)', tbl || '_partitioned');
+
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', tbl, tbl || '_unpartitioned');
+        EXECUTE format('ALTER TABLE %I RENAME TO %I', tbl || '_partitioned', tbl);
+        -- Partitions must cover the oldest existing row before the copy, or history lands in DEFAULT
+        EXECUTE format('SELECT min(left(created_time, 10))::date FROM %I', tbl || '_unpartitioned') INTO since;
+        PERFORM ensure_crm_partitions(3, since);
+
+        -- Generated columns are recomputed on insert, so copy only the stored ones
+        SELECT string_agg(quote_ident(column_name), ', ' ORDER BY ordinal_position) INTO cols
+        FROM information_schema.columns
+        WHERE table_schema = 'public' AND table_name = tbl || '_unpartitioned' AND is_generated = 'NEVER';
+        EXECUTE format('INSERT INTO %I (%s) SELECT %s FROM %I WHERE created_time IS NOT NULL',
+                       tbl, cols, cols, tbl || '_unpartitioned');
+
+        EXECUTE format('SELECT count(*) FROM %I WHERE created_time IS NOT NULL', tbl || '_unpartitioned') INTO old_count;
+        EXECUTE format('SELECT count(*) FROM %I', tbl) INTO new_count;
+        IF old_count != new_count THEN
+            RAISE EXCEPTION '% copy mismatch: % rows before, % after', tbl, old_count, new_count;
+        END IF;
+        EXECUTE format('DROP TABLE %I', tbl || '_unpartitioned');
+    END LOOP;
+END;
+$$;
+
+-- Indexes from schema.sql / promoted_fields.sql are dropped with the old tables; re-run both
+-- files now — their CREATE INDEX IF NOT EXISTS statements recreate every index on each partition.
+
+-- 4. Archive Old raw_data (Moves payloads older than N months into crm_raw_archive, in batches)
+-- Hot rows keep every typed column plus the top-level keys that promoted cf_ columns are
+-- generated from, so dashboards, RPCs and custom-field breakdowns are unaffected. Deals also keep
+-- Contact_Name, which links them to prospect clusters for the lead cohorts.
+-- Archived Leads lose the fields that lead scoring and prospect keys are built from. Their stored
+-- junk_score and cluster are kept, but they are skipped when the scorer is retrained, and a
+-- from-scratch prospect rebuild no longer sees their emails and phones.
+CREATE OR REPLACE FUNCTION archive_raw_data(months int DEFAULT 12, batch_size int DEFAULT 5000)
+RETURNS json
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    tbl text;
+    module_name text;
+    keep_keys text[];
+    cutoff text := to_char(date_trunc('month', CURRENT_DATE) - make_interval(months => months), 'YYYY-MM-DD');
+    moved int;
+    result jsonb := '{}'::jsonb;
+BEGIN
+    FOR tbl, module_name, keep_keys IN SELECT * FROM (VALUES
+        ('leads_raw', 'Leads', ARRAY[]::text[]),
+        ('crm_deals', 'Deals', ARRAY['Contact_Name'])
+    ) v LOOP
+        SELECT keep_keys || coalesce(array_agg(DISTINCT split_part(field, '.', 1)), ARRAY[]::text[]) INTO keep_keys
+        FROM promoted_fields WHERE module = module_name;
+
+        -- The slim payload marks the row as archived ('_archived'), so each batch picks up new rows only
+        EXECUTE format(
+            'WITH batch AS (
+                 SELECT id, created_time, raw_data FROM %1$I
+                 WHERE created_time < %2$L AND raw_data IS NOT NULL AND NOT raw_data ? ''_archived''
+                 LIMIT %3$s
+             ), archived AS (
+                 INSERT INTO crm_raw_archive (module, id, created_time, raw_data)
+                 SELECT %4$L, id, created_time, raw_data FROM batch
+                 ON CONFLICT (module, id, created_time) DO UPDATE SET raw_data = EXCLUDED.raw_data, archived_at = now()
+                 RETURNING id, created_time
+             )
+             UPDATE %1$I t
+             SET raw_data = (SELECT coalesce(jsonb_object_agg(e.key, e.value), ''{}''::jsonb)
+                             FROM jsonb_each(t.raw_data) e WHERE e.key = ANY(%5$L::text[]))
+                            || jsonb_build_object(''_archived'', true)
+             FROM archived a
+             WHERE t.id = a.id AND t.created_time = a.created_time',
+            tbl, cutoff, least(greatest(batch_size, 1), 50000), module_name, keep_keys);
+        GET DIAGNOSTICS moved = ROW_COUNT;
+        result := result || jsonb_build_object(module_name, moved);
+    END LOOP;
+    RETURN json_build_object('cutoff', cutoff, 'moved', result);
+END;
+$$;
+
+-- 5. Archived Payload Lookup (Full original Zoho record for one archived row)
+CREATE OR REPLACE FUNCTION get_archived_raw_data(module text, record_id text)
+RETURNS json
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    SELECT a.raw_data::json FROM crm_raw_archive a
+    WHERE a.module = get_archived_raw_data.module AND a.id = record_id
+    ORDER BY a.archived_at DESC
+    LIMIT 1;
+$$;